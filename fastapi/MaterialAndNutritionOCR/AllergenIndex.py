@@ -0,0 +1,304 @@
+from collections import deque
+
+from MaterialAndNutritionOCR.HangulSimilarity import decompose_hangul
+
+# 알레르기 유발 성분 -> 원재료 표기에서 찾을 동의어 목록
+ALLERGEN_MAPPING = {
+    "밀": ["밀", "밀가루", "통밀", "소맥분", "wheat", "글루텐", "gluten"],
+    "우유": ["우유", "milk", "유제품", "dairy", "유청", "카제인", "lactose"],
+    "대두": ["대두", "soy", "soybean", "콩", "콩기름", "콩가루", "두부"],
+    "돼지고기": ["돼지고기", "pork", "돈육"],
+    "쇠고기": ["쇠고기", "beef", "우육"],
+    "아황산류": ["아황산류", "sulfite", "아황산"],
+    "계란": ["계란", "egg", "난류", "난백", "난황"],
+    "땅콩": ["땅콩", "peanut"],
+    "견과류": ["견과류", "호두", "아몬드", "캐슈넛", "피스타치오", "잣", "nut"],
+    "갑각류": ["새우", "게", "게살", "꽃게", "대게", "shrimp", "crab", "갑각류"],
+    "조개류": ["조개", "굴", "굴소스", "홍합", "전복", "오징어", "clam", "oyster"],
+    "생선": ["고등어", "연어", "참치", "fish"],
+    "메밀": ["메밀", "buckwheat"],
+    "토마토": ["토마토", "tomato"],
+    "복숭아": ["복숭아", "peach"],
+}
+
+def _is_latin(ch: str) -> bool:
+    return "a" <= ch.lower() <= "z"
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣" or "ㄱ" <= ch <= "ㅣ"
+
+def _normalize(text: str) -> tuple[str, list[int]]:
+    """
+    한글은 자모로 분해하고 영문은 소문자로 바꾼 검색용 문자열과, 각 자모의 원본 문자 위치를 반환
+    공백 / 숫자 / 문장부호는 건너뛰므로 "돼지 고기"처럼 띄어 쓴 표기도 찾을 수 있음
+    """
+    chars, offsets = [], []
+
+    for i, ch in enumerate(text):
+        if _is_latin(ch):
+            chars.append(ch.lower())
+            offsets.append(i)
+        elif _is_hangul(ch):
+            for jamo in decompose_hangul(ch):
+                chars.append(jamo)
+                offsets.append(i)
+
+    return "".join(chars), offsets
+
+def _edit_distance_substring(pattern: str, text: str) -> tuple[int, int, int]:
+    """
+    text의 부분 문자열 중 pattern과 편집 거리가 가장 작은 것을 찾음 (pattern 전체 vs text 일부)
+
+    Returns:
+        tuple: (편집 거리, 시작 위치, 끝 위치)
+    """
+    # 이전 행의 (거리, 시작 위치) - 빈 pattern은 text의 어느 위치에서 시작해도 거리 0
+    previous = [(0, j) for j in range(len(text) + 1)]
+
+    for i in range(1, len(pattern) + 1):
+        current = [(i, 0)]
+        for j in range(1, len(text) + 1):
+            cost = 0 if pattern[i - 1] == text[j - 1] else 1
+            substitute = (previous[j - 1][0] + cost, previous[j - 1][1])
+            delete = (previous[j][0] + 1, previous[j][1])
+            insert = (current[j - 1][0] + 1, current[j - 1][1])
+            current.append(min(substitute, delete, insert, key=lambda x: x[0]))
+        previous = current
+
+    # 거리가 같으면 더 짧은 구간을 선택 (앞뒤 글자를 치환으로 끌어들이지 않도록)
+    end = min(range(len(text) + 1), key=lambda j: (previous[j][0], j - previous[j][1]))
+    return previous[end][0], previous[end][1], end
+
+def _edit_distance(a: str, b: str) -> int:
+    """a 전체와 b 전체의 편집 거리"""
+    previous = list(range(len(b) + 1))
+
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current.append(min(previous[j - 1] + cost, previous[j] + 1, current[j - 1] + 1))
+        previous = current
+
+    return previous[-1]
+
+class AllergenHit:
+    """원재료 문자열에서 찾은 알레르기 유발 성분"""
+    def __init__(self, allergen: str, term: str, start: int, end: int, score: float):
+        self.allergen = allergen # 대표 성분명 (ALLERGEN_MAPPING의 키)
+        self.term = term # 일치한 동의어
+        self.start = start # 원본 문자열에서의 시작 위치
+        self.end = end # 원본 문자열에서의 끝 위치 (미포함)
+        self.score = score # 1 - 편집 거리 / 동의어 자모 길이 (완전 일치는 1.0)
+
+    def __repr__(self):
+        return f"AllergenHit({self.allergen!r}, {self.term!r}, {self.start}, {self.end}, {self.score:.2f})"
+
+class AllergenIndex:
+    """
+    알레르기 동의어 전체를 자모 단위 Aho–Corasick 오토마톤 하나로 묶어 원재료 문자열을 한 번만 훑는 인덱스.
+
+    - 편집을 k번까지 허용하는 동의어는 k+1 조각으로 나눠서 조각을 오토마톤에 넣는다.
+      편집이 k번 이하인 출현은 조각 중 하나를 반드시 그대로 포함하므로(비둘기집 원리),
+      조각이 걸린 위치 주변만 편집 거리로 확인하면 된다.
+    - k는 자모 길이 * (1 - min_score)이고, 자모가 fuzzy_min_length개보다 짧은 동의어는 완전 일치만 허용한다.
+      ("콩", "우유"뿐 아니라 "난백"처럼 두 글자 동의어도 "단백" 같은 흔한 단어와 한 자모 차이이므로)
+    - 한글 동의어는 글자(음절) 경계에서 시작하고 끝나는 것만 인정한다.
+      자모로 훑으므로 경계를 보지 않으면 "코코아"의 "코" + "아"의 ㅇ이 "콩"으로, "우육"의 앞부분이 "우유"로 걸림.
+      근사 일치는 찾은 구간을 글자 경계까지 넓힌 뒤 편집 거리를 다시 계산한다.
+    - 한 글자 한글 동의어("게", "굴", "잣", "콩", "밀")는 앞뒤에 한글이 없는 단독 표기에서만 인정하고
+      ("맛있게"의 "게", "밀가루"의 "밀"은 제외), 자주 쓰는 합성어("밀가루", "게살")는 따로 동의어로 둔다.
+    - 영문 동의어는 "nut"가 "nutrition"에 걸리지 않도록 단어 경계에서만 인정한다.
+    - 겹치는 검출 결과는 점수가 높은 것, 점수가 같으면 자모가 더 긴 동의어만 남긴다. ("땅콩" 속 "콩", "메밀" 속 "밀")
+    """
+    def __init__(self, mapping: dict = ALLERGEN_MAPPING, min_score: float = 0.8, fuzzy_min_length: int = 7):
+        self.__min_score = min_score
+        self.__terms = [] # (대표 성분명, 동의어, 자모 문자열, 허용 편집 수)
+
+        # Aho–Corasick 오토마톤: 상태별 전이 / 실패 링크 / 출력 (동의어 인덱스, 조각 시작 위치, 조각 길이)
+        self.__goto = [{}]
+        self.__fail = [0]
+        self.__output = [[]]
+
+        for allergen, terms in mapping.items():
+            for term in terms:
+                key, _ = _normalize(term)
+                max_edits = int(len(key) * (1 - min_score) + 1e-9) if len(key) >= fuzzy_min_length else 0
+                term_index = len(self.__terms)
+                self.__terms.append((allergen, term, key, max_edits))
+
+                for piece_start, piece in self.__pieces(key, max_edits):
+                    self.__add(piece, (term_index, piece_start, len(piece)))
+
+        self.__build_fail_links()
+
+    def __pieces(self, key: str, max_edits: int) -> list[tuple[int, str]]:
+        """동의어를 max_edits + 1개의 겹치지 않는 조각으로 나눔"""
+        count = max_edits + 1
+        bounds = [round(len(key) * i / count) for i in range(count + 1)]
+        return [(bounds[i], key[bounds[i]:bounds[i + 1]]) for i in range(count)]
+
+    def __add(self, piece: str, output: tuple):
+        state = 0
+        for ch in piece:
+            if ch not in self.__goto[state]:
+                self.__goto.append({})
+                self.__fail.append(0)
+                self.__output.append([])
+                self.__goto[state][ch] = len(self.__goto) - 1
+            state = self.__goto[state][ch]
+        self.__output[state].append(output)
+
+    def __build_fail_links(self):
+        queue = deque(self.__goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.__goto[state].items():
+                queue.append(next_state)
+
+                fail = self.__fail[state]
+                while fail and ch not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                self.__fail[next_state] = self.__goto[fail].get(ch, 0)
+
+                # 실패 링크 쪽에서 끝나는 조각도 이 상태에서 함께 출력
+                self.__output[next_state] = self.__output[next_state] + self.__output[self.__fail[next_state]]
+
+    def find(self, text: str) -> list[AllergenHit]:
+        """
+        원재료 문자열에서 알레르기 유발 성분을 모두 찾음
+
+        Returns:
+            list[AllergenHit]: 시작 위치 순으로 정렬된 검출 결과
+        """
+        key, offsets = _normalize(text)
+        candidates = {} # (동의어 인덱스, 시작, 끝) -> 점수
+        verified = set()
+
+        state = 0
+        for position, ch in enumerate(key):
+            while state and ch not in self.__goto[state]:
+                state = self.__fail[state]
+            state = self.__goto[state].get(ch, 0)
+
+            for term_index, piece_start, piece_length in self.__output[state]:
+                # 조각 위치로부터 동의어 전체가 있을 수 있는 구간을 계산
+                _, _, term_key, max_edits = self.__terms[term_index]
+                start = position + 1 - piece_length - piece_start
+
+                if max_edits == 0:
+                    candidates[(term_index, start, start + len(term_key))] = 1.0
+                    continue
+
+                window_start = max(0, start - max_edits)
+                window_end = min(len(key), start + len(term_key) + max_edits)
+                if (term_index, window_start) in verified:
+                    continue
+                verified.add((term_index, window_start))
+
+                distance, hit_start, hit_end = _edit_distance_substring(term_key, key[window_start:window_end])
+                if 1 - distance / len(term_key) < self.__min_score:
+                    continue
+
+                # 찾은 구간을 글자 경계까지 넓혀서 (받침이 하나 더 붙은 오인식 등) 다시 계산
+                hit_start, hit_end = self.__syllable_span(offsets, window_start + hit_start, window_start + hit_end)
+                score = 1 - _edit_distance(term_key, key[hit_start:hit_end]) / len(term_key)
+                if score >= self.__min_score:
+                    span = (term_index, hit_start, hit_end)
+                    candidates[span] = max(score, candidates.get(span, 0))
+
+        hits = []
+        for (term_index, start, end), score in candidates.items():
+            if end <= start or not self.__on_syllable_boundary(offsets, start, end):
+                continue
+            allergen, term, term_key, _ = self.__terms[term_index]
+            hit = AllergenHit(allergen, term, offsets[start], offsets[end - 1] + 1, score)
+
+            if _is_latin(term[0]) and not self.__on_word_boundary(text, hit, _is_latin):
+                continue
+            if len(term) == 1 and _is_hangul(term) and not self.__on_word_boundary(text, hit, _is_hangul):
+                continue
+            hits.append((hit, len(term_key)))
+
+        return sorted(self.__remove_overlapping(hits), key=lambda hit: (hit.start, hit.allergen))
+
+    def __on_syllable_boundary(self, offsets: list[int], start: int, end: int) -> bool:
+        """자모 구간 [start, end)가 글자의 첫 자모에서 시작하고 마지막 자모에서 끝나는지"""
+        starts = start == 0 or offsets[start - 1] != offsets[start]
+        ends = end == len(offsets) or offsets[end] != offsets[end - 1]
+        return starts and ends
+
+    def __syllable_span(self, offsets: list[int], start: int, end: int) -> tuple[int, int]:
+        """자모 구간 [start, end)를 글자 경계까지 넓힘"""
+        while start > 0 and offsets[start - 1] == offsets[start]:
+            start -= 1
+        while end < len(offsets) and offsets[end] == offsets[end - 1]:
+            end += 1
+        return start, end
+
+    def __on_word_boundary(self, text: str, hit: AllergenHit, same_word) -> bool:
+        """검출 구간 앞뒤 글자가 같은 단어로 이어지는 글자(same_word)가 아닌지"""
+        before = text[hit.start - 1] if hit.start > 0 else " "
+        after = text[hit.end] if hit.end < len(text) else " "
+        return not same_word(before) and not same_word(after)
+
+    def __remove_overlapping(self, hits: list[tuple[AllergenHit, int]]) -> list[AllergenHit]:
+        """
+        점수가 높은 것, 점수가 같으면 자모가 긴 동의어부터 남기면서 이미 남긴 검출 결과와 겹치는 결과를 제거
+        ("땅콩" 속 "콩", "피스타치오" 근사 일치와 겹치는 짧은 일치)
+
+        Args:
+            hits: (검출 결과, 동의어 자모 길이)
+        """
+        kept = []
+
+        for hit, _ in sorted(hits, key=lambda item: (-item[0].score, -item[1], item[0].start)):
+            if not any(hit.start < other.end and other.start < hit.end for other in kept):
+                kept.append(hit)
+
+        return kept
+
+    def allergens(self, texts: list[str]) -> list[str]:
+        """여러 문자열에서 찾은 대표 성분명을 처음 나온 순서대로 중복 없이 반환"""
+        result = []
+        for text in texts:
+            for hit in self.find(text):
+                if hit.allergen not in result:
+                    result.append(hit.allergen)
+        return result
+
+if(__name__ == "__main__"):
+    # 사용 예) fastapi 폴더에서 원재료 표기의 검출 결과 확인 (인자가 없으면 오검출 / 미검출 회귀 사례를 확인)
+    # python -m MaterialAndNutritionOCR.AllergenIndex "밀가루, 대두, 우유"
+    import sys
+
+    index = AllergenIndex()
+
+    if len(sys.argv) > 1:
+        for text in sys.argv[1:]:
+            print(text, index.find(text))
+    else:
+        cases = {
+            "코코아분말": [], # 코 + 아의 ㅇ -> 콩
+            "자스민차": [], # 자 + 스의 ㅅ -> 잣
+            "미르": [], # 미 + 르의 ㄹ -> 밀
+            "맛있게 드세요": [], # 맛있게의 게
+            "우육엑기스": ["쇠고기"], # 우육의 앞부분 -> 우유
+            "우유(국산), 난백": ["우유", "계란"], # 우유 + 국의 ㄱ -> 우육
+            "밀가루, 대두, 땅콩": ["밀", "대두", "땅콩"],
+            "밀(미국산), 메밀": ["밀", "메밀"],
+            "게살, 굴소스, 잣": ["갑각류", "조개류", "견과류"],
+            "돼지 고기": ["돼지고기"],
+            "피스타치옥": ["견과류"], # 받침이 더 붙은 오인식
+            "nutrition facts": []
+        }
+
+        failed = 0
+        for text, expected in cases.items():
+            found = sorted({hit.allergen for hit in index.find(text)})
+            ok = found == sorted(expected)
+            failed += not ok
+            print("OK  " if ok else "FAIL", text, found)
+
+        sys.exit(1 if failed else 0)
@@ -0,0 +1,121 @@
+import threading
+import weakref
+
+import numpy as np
+
+class BufferPool:
+    """
+    요청마다 새로 만들던 중간 이미지(검출용 축소 프레임, 색 변환 결과 등)를 재사용하는 버퍼 풀.
+
+    - 버퍼는 용량(2의 거듭제곱 바이트, 최소 min_bytes)별로 모아 두고, 요청한 shape / dtype의 view로 돌려준다.
+      (업로드 해상도가 조금씩 달라도 같은 용량 칸의 버퍼를 다시 쓸 수 있음)
+    - 쓰고 나면 release()로 돌려준다. 풀에 보관하는 버퍼가 max_bytes를 넘으면 돌려받은 버퍼는 버린다.
+      release()는 그 배열(과 view)을 읽거나 쓰는 작업이 모두 끝난 뒤에만 호출해야 한다.
+      (다른 스레드 / 프로세스에서 아직 실행 중인 작업이 있는데 돌려주면, 다음 요청이 같은 메모리에 쓰면서 그 작업의 입력이 깨짐)
+    - 이 풀에서 만들지 않은 배열을 release()하면 무시하므로, 풀 버퍼인지 아닌지 구분하지 않고 돌려줘도 된다.
+    - 이미 돌려준 버퍼를 다시 release()하면 무시하고 double_releases로 집계한다. (같은 메모리를 두 요청에 내주지 않도록)
+    - 사용 중인 버퍼는 약한 참조로만 추적하므로, 돌려주지 않고 버린 버퍼는 GC될 때 집계에서 빠진다. (leaked로 집계)
+    - 재사용 횟수, 새로 할당한 바이트, 동시에 사용 중인 바이트의 최대값을 집계한다.
+    """
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, min_bytes: int = 64 * 1024):
+        self.__max_bytes = max_bytes
+        self.__min_bytes = min_bytes
+
+        # 사용 중인 버퍼가 GC될 때의 콜백이 잠금을 잡은 같은 스레드에서 실행될 수 있으므로 RLock
+        self.__lock = threading.RLock()
+        self.__free = {} # 용량 -> 반납된 1차원 uint8 버퍼 리스트
+        self.__in_use = {} # id(버퍼) -> 버퍼의 약한 참조 (사용 중인 버퍼, 돌려받은 배열이 풀 버퍼인지 확인)
+        self.__pooled_bytes = 0 # 반납되어 풀에 보관 중인 바이트
+
+        self.__counts = {
+            "acquired": 0, "reused": 0, "allocated_bytes": 0, "in_use_bytes": 0, "peak_in_use_bytes": 0,
+            "dropped": 0, "double_releases": 0, "leaked": 0
+        }
+
+    def acquire(self, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        """shape / dtype 크기의 배열을 풀에서 꺼내거나 새로 만들어 반환 (내용은 초기화되지 않음)"""
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        capacity = self.__capacity(nbytes)
+
+        with self.__lock:
+            free = self.__free.get(capacity)
+            buffer = free.pop() if free else None
+
+            if buffer is not None:
+                self.__pooled_bytes -= capacity
+                self.__counts["reused"] += 1
+            else:
+                buffer = np.empty(capacity, dtype=np.uint8)
+                self.__counts["allocated_bytes"] += capacity
+
+            self.__track(buffer)
+            self.__counts["acquired"] += 1
+            self.__counts["in_use_bytes"] += capacity
+            self.__counts["peak_in_use_bytes"] = max(self.__counts["peak_in_use_bytes"], self.__counts["in_use_bytes"])
+
+        # 반환하는 view의 base가 버퍼를 참조하므로, 사용 중에는 풀이 참조를 들고 있지 않아도 버퍼가 유지됨
+        return buffer[:nbytes].view(dtype).reshape(shape)
+
+    def release(self, array: np.ndarray):
+        """
+        acquire()로 받은 배열을 풀에 돌려줌 (풀에서 만들지 않은 배열이면 무시, 이미 돌려준 버퍼면 무시하고 집계)
+        배열을 쓰는 작업(다른 스레드의 추론 등)이 모두 끝난 뒤에 호출해야 함
+        """
+        if array is None:
+            return
+
+        # view -> reshape -> slice로 이어진 base를 따라가서 원래 버퍼를 찾음
+        buffer = array
+        while buffer.base is not None and isinstance(buffer.base, np.ndarray):
+            buffer = buffer.base
+
+        capacity = buffer.nbytes
+
+        with self.__lock:
+            reference = self.__in_use.get(id(buffer))
+            if reference is None or reference() is not buffer:
+                if any(free is buffer for free in self.__free.get(capacity, ())):
+                    self.__counts["double_releases"] += 1
+                return
+
+            del self.__in_use[id(buffer)]
+            self.__counts["in_use_bytes"] -= capacity
+
+            if self.__pooled_bytes + capacity > self.__max_bytes:
+                self.__counts["dropped"] += 1
+                return
+
+            self.__free.setdefault(capacity, []).append(buffer)
+            self.__pooled_bytes += capacity
+
+    def __track(self, buffer: np.ndarray):
+        """사용 중인 버퍼로 등록 (돌려받지 못하고 GC되면 콜백에서 집계를 정리)"""
+        key, capacity = id(buffer), buffer.nbytes
+        self.__in_use[key] = weakref.ref(buffer, lambda reference: self.__forget(key, capacity, reference))
+
+    def __forget(self, key: int, capacity: int, reference: weakref.ref):
+        """release() 없이 버려진 사용 중 버퍼의 집계를 정리"""
+        with self.__lock:
+            # GC되기 전에 같은 id로 다른 버퍼가 등록되었으면 그 등록은 건드리지 않음
+            if self.__in_use.get(key) is not reference:
+                return
+
+            del self.__in_use[key]
+            self.__counts["in_use_bytes"] -= capacity
+            self.__counts["leaked"] += 1
+
+    def stats(self) -> dict:
+        with self.__lock:
+            stats = dict(self.__counts)
+            stats["pooled_bytes"] = self.__pooled_bytes
+
+        stats["reuse_ratio"] = stats["reused"] / stats["acquired"] if stats["acquired"] else 0.0
+        return stats
+
+    def __capacity(self, nbytes: int) -> int:
+        """nbytes 이상인 가장 작은 2의 거듭제곱 (최소 min_bytes)"""
+        capacity = self.__min_bytes
+        while capacity < nbytes:
+            capacity *= 2
+        return capacity
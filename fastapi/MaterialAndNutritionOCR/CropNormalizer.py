@@ -0,0 +1,277 @@
+import sys
+import threading
+import time
+from difflib import SequenceMatcher
+
+import cv2
+import numpy as np
+
+class CropNormalizer:
+    """
+    YOLO crop을 EasyOCR에 넣기 전에 인식기가 잘 읽는 크기 / 모양으로 맞추는 단계.
+
+    YOLO crop은 20px 높이의 표 셀부터 원재료 문단 전체까지 크기가 제각각이라
+    작은 crop은 텍스트 검출기가 글자를 놓치고, 큰 crop은 텍스트 검출기가 필요 이상으로 큰 입력을 처리한다.
+    1) 크기: 글자 줄 높이가 [min_line_height, max_line_height] 안에 들어오도록 crop을 resize
+       (인식기는 줄을 64px 높이로 다시 맞추므로 max_line_height가 64 근처이면 줄 이미지의 resize도 거의 일어나지 않음)
+    2) (선택) 기울기 보정: 가로 투영으로 추정한 글자 줄의 기울기가 max_skew(도) 이하일 때 수평으로 회전
+    3) (선택) 대비 정규화: 흑백 이미지에 CLAHE 적용
+    4) 긴 줄 분할: 인식기 입력 높이로 맞춘 줄 이미지가 strip_width보다 길면 단어 사이의 빈 열에서 잘라
+       폭이 비슷한 조각(strip)으로 만듦 (같은 배치의 짧은 줄들이 긴 줄의 폭만큼 패딩되지 않음)
+    """
+    def __init__(self, min_line_height: int = 32, max_line_height: int = 64, max_scale: float = 4.0,
+                 max_skew: float = 0.0, contrast: bool = False, strip_width: int = 512, min_gap: float = 0.3):
+        self.__min_line_height = min_line_height
+        self.__max_line_height = max_line_height
+        self.__max_scale = max_scale # 한 번에 키우거나 줄일 최대 배율
+        self.__max_skew = max_skew # 0이면 기울기 보정을 하지 않음
+        self.__clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)) if contrast else None
+        self.__strip_width = strip_width # 0이면 긴 줄을 나누지 않음
+        self.__min_gap = min_gap # 단어 사이로 볼 빈 열의 최소 폭 (글자 높이 대비, 한글 자모 사이의 좁은 틈에서는 자르지 않음)
+
+        self.__lock = threading.Lock()
+        self.__counts = {"crops": 0, "upscaled": 0, "downscaled": 0, "deskewed": 0, "lines": 0, "split_lines": 0, "strips": 0}
+
+    def normalize(self, img: np.ndarray, img_cv_grey: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        crop의 (텍스트 검출기 입력, 흑백 이미지)를 같은 배율 / 각도로 정규화
+
+        Args:
+            img (np.ndarray): 텍스트 검출기에 넣을 crop (None이면 흑백 이미지만 정규화)
+            img_cv_grey (np.ndarray): 인식기에 넣을 흑백 crop
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: 정규화된 (텍스트 검출기 입력, 흑백 이미지), 바꿀 필요가 없으면 입력을 그대로 반환
+        """
+        counts = {"crops": 1}
+
+        angle = self.__skew_angle(img_cv_grey) if self.__max_skew > 0 else 0.0
+        if angle != 0.0:
+            img, img_cv_grey = self.__rotate(img, angle), self.__rotate(img_cv_grey, angle)
+            counts["deskewed"] = 1
+
+        scale = self.__scale(img_cv_grey)
+        if scale != 1.0:
+            interpolation = cv2.INTER_CUBIC if scale > 1.0 else cv2.INTER_AREA
+            height, width = img_cv_grey.shape[:2]
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+
+            img_cv_grey = cv2.resize(img_cv_grey, size, interpolation=interpolation)
+            if img is not None:
+                img = cv2.resize(img, size, interpolation=interpolation)
+            counts["upscaled" if scale > 1.0 else "downscaled"] = 1
+
+        if self.__clahe is not None:
+            img_cv_grey = self.__clahe.apply(img_cv_grey)
+
+        self.__count(counts)
+        return img, img_cv_grey
+
+    def split_line(self, line: np.ndarray) -> list[np.ndarray]:
+        """
+        인식기 입력 높이로 맞춘 줄 이미지가 strip_width보다 길면 단어 사이의 빈 열에서 잘라서 반환
+
+        자를 위치는 strip_width 배수 근처(strip_width의 0.5 ~ 1.5배 구간)의 빈 열 중 가장 가까운 곳이며,
+        그런 빈 열이 없으면 글자를 자르지 않도록 그대로 둔다. 조각의 인식 결과는 join_strips로 다시 합친다.
+        """
+        height, width = line.shape[:2]
+        if self.__strip_width <= 0 or width <= self.__strip_width:
+            self.__count({"lines": 1, "strips": 1})
+            return [line]
+
+        gaps = self.__gap_centers(line)
+
+        strips = []
+        start = 0
+        while width - start > self.__strip_width:
+            target = start + self.__strip_width
+            candidates = [c for c in gaps if start + self.__strip_width // 2 < c <= start + self.__strip_width * 3 // 2 and c < width]
+            if not candidates:
+                break
+            cut = min(candidates, key=lambda c: abs(c - target))
+            strips.append(line[:, start:cut])
+            start = cut
+        strips.append(line[:, start:])
+
+        self.__count({"lines": 1, "split_lines": int(len(strips) > 1), "strips": len(strips)})
+        return strips
+
+    @staticmethod
+    def join_strips(predictions: list[tuple[str, float]], widths: list[int]) -> tuple[str, float]:
+        """split_line으로 나눈 조각들의 (text, confidence)를 한 줄의 결과로 합침 (신뢰도는 조각 폭으로 가중 평균)"""
+        text = " ".join(t for t, _ in predictions if t)
+        total = sum(widths)
+        conf = sum(c * w for (_, c), w in zip(predictions, widths)) / total if total else 0.0
+        return text, float(conf)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return dict(self.__counts)
+
+    def __count(self, counts: dict):
+        with self.__lock:
+            for key, value in counts.items():
+                self.__counts[key] += value
+
+    def __scale(self, img_cv_grey: np.ndarray) -> float:
+        """글자 줄 높이를 [min_line_height, max_line_height]로 맞추는 배율 (이미 범위 안이면 1.0)"""
+        line_height = self.__line_height(img_cv_grey)
+
+        if line_height < self.__min_line_height:
+            scale = self.__min_line_height / line_height
+        elif line_height > self.__max_line_height:
+            scale = self.__max_line_height / line_height
+        else:
+            return 1.0
+
+        return float(np.clip(scale, 1.0 / self.__max_scale, self.__max_scale))
+
+    def __line_height(self, img_cv_grey: np.ndarray) -> float:
+        """가로 방향 투영(row profile)에서 글자가 있는 행이 이어진 구간들의 중앙값 (구간이 없으면 crop 높이)"""
+        rows = _ink(img_cv_grey).mean(axis=1) > 0.02
+
+        runs = []
+        run = 0
+        for has_ink in list(rows) + [False]:
+            if has_ink:
+                run += 1
+                continue
+            if run >= 3: # 잡음, 밑줄 같은 얇은 구간은 무시
+                runs.append(run)
+            run = 0
+
+        return float(np.median(runs)) if runs else float(len(rows))
+
+    def __skew_angle(self, img_cv_grey: np.ndarray) -> float:
+        """
+        글자 줄의 기울기(도)를 가로 투영으로 추정, 보정할 필요가 없으면 0.0
+
+        글자 픽셀 좌표를 -max_skew ~ max_skew 각도로 돌려 보면서 행별 글자 픽셀 수의 제곱합이 가장 큰
+        (= 글자 줄이 가장 얇고 선명하게 모이는) 각도를 고른다.
+        (글자 픽셀의 최소 외접 사각형은 짧은 단어에서 글자 모양 때문에 1 ~ 2도씩 틀어지므로 사용하지 않음)
+        """
+        ys, xs = np.nonzero(_ink(img_cv_grey))
+        if len(xs) < 20:
+            return 0.0
+
+        # 큰 crop에서는 글자 픽셀을 솎아서 계산량을 제한
+        step = max(1, len(xs) // 20000)
+        ys, xs = ys[::step].astype(np.float64), xs[::step].astype(np.float64)
+
+        angles = np.arange(-self.__max_skew, self.__max_skew + 1e-6, 0.5)
+        scores = []
+        for angle in angles:
+            theta = np.deg2rad(angle)
+            rows = np.round(ys * np.cos(theta) - xs * np.sin(theta)).astype(np.int64)
+            histogram = np.bincount(rows - rows.min()).astype(np.float64)
+            scores.append(float((histogram ** 2).sum()))
+
+        best = int(np.argmax(scores))
+        level = int(np.argmin(np.abs(angles)))
+
+        # 수평일 때보다 뚜렷하게 나아지지 않으면 회전하지 않음 (불필요한 보간으로 글자가 흐려지지 않도록)
+        if abs(angles[best]) < 0.5 or scores[best] < scores[level] * 1.05:
+            return 0.0
+
+        return float(angles[best])
+
+    def __rotate(self, image: np.ndarray, angle: float) -> np.ndarray:
+        if image is None:
+            return None
+
+        height, width = image.shape[:2]
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+    def __gap_centers(self, line: np.ndarray) -> list[int]:
+        """글자가 없는 열이 min_gap * 글자 높이 이상 이어진 구간의 가운데 열 위치"""
+        ink = _ink(line)
+        columns = ink.mean(axis=0) > 0.02
+
+        # 줄 이미지의 위아래 여백은 제외하고 글자가 차지하는 높이를 기준으로 단어 사이 간격을 판단
+        rows = np.nonzero(ink.any(axis=1))[0]
+        ink_height = rows[-1] - rows[0] + 1 if len(rows) else line.shape[0]
+        min_gap = max(2, int(ink_height * self.__min_gap))
+
+        centers = []
+        run = 0
+        for x, has_ink in enumerate(list(columns) + [True]):
+            if not has_ink:
+                run += 1
+                continue
+            if run >= min_gap and run < x: # 줄 맨 앞의 여백은 자를 위치가 아님
+                centers.append(x - run // 2 - 1)
+            run = 0
+
+        return centers
+
+def _ink(img_cv_grey: np.ndarray) -> np.ndarray:
+    """Otsu 이진화 후 더 적은 쪽의 픽셀을 글자로 봄 (어두운 글자 / 밝은 글자 모두 처리)"""
+    _, binary = cv2.threshold(img_cv_grey, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    ink = binary == 0
+    if ink.mean() > 0.5:
+        ink = ~ink
+    return ink
+
+def benchmark(reader, crops: list[np.ndarray], normalizer: CropNormalizer, repeat: int = 3, recognition_only: bool = False) -> dict:
+    """
+    같은 crop들에서 정규화 없이 / 정규화를 거쳐 인식했을 때의 처리량과 결과를 비교
+
+    정답 라벨 대신 정규화 없이 읽은 결과를 기준으로 crop별 문자열 일치율(SequenceMatcher)을 계산하고,
+    양쪽의 평균 인식 신뢰도와 글자를 하나도 읽지 못한 crop 수를 함께 보고한다.
+    """
+    from MaterialAndNutritionOCR.EasyOCRBatchRecognizer import EasyOCRBatchRecognizer
+
+    def run(recognizer):
+        results, elapsed = None, []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = recognizer.recognize(crops) if recognition_only else recognizer.readtext(crops)
+            elapsed.append((time.perf_counter() - started) * 1000)
+
+        texts = [" ".join(text for text, _ in result) for result in results]
+        confidences = [conf for result in results for _, conf in result]
+        return texts, confidences, min(elapsed)
+
+    raw_texts, raw_confidences, raw_ms = run(EasyOCRBatchRecognizer(reader))
+    normalized_texts, normalized_confidences, normalized_ms = run(EasyOCRBatchRecognizer(reader, normalizer=normalizer))
+
+    ratios = [SequenceMatcher(None, a, b).ratio() for a, b in zip(raw_texts, normalized_texts)]
+
+    return {
+        "crops": len(crops),
+        "raw_ms": raw_ms,
+        "normalized_ms": normalized_ms,
+        "raw_crops_per_second": len(crops) / raw_ms * 1000 if raw_ms else 0.0,
+        "normalized_crops_per_second": len(crops) / normalized_ms * 1000 if normalized_ms else 0.0,
+        "char_agreement": float(np.mean(ratios)) if ratios else 1.0,
+        "raw_mean_confidence": float(np.mean(raw_confidences)) if raw_confidences else 0.0,
+        "normalized_mean_confidence": float(np.mean(normalized_confidences)) if normalized_confidences else 0.0,
+        "raw_empty_crops": sum(not text for text in raw_texts),
+        "normalized_empty_crops": sum(not text for text in normalized_texts),
+        "normalization": normalizer.stats()
+    }
+
+if(__name__ == "__main__"):
+    # 사용 예) fastapi 폴더에서
+    # python -m MaterialAndNutritionOCR.CropNormalizer ../1.jpg ../2.png
+    # (RECOGNITION_ONLY 경로를 비교하려면 첫 인자로 recognize를 줌: python -m MaterialAndNutritionOCR.CropNormalizer recognize ../1.jpg)
+    from MaterialAndNutritionOCR.MaterialAndNutritionImageToText import MaterialAndNutritionImageToText
+    from MaterialAndNutritionOCR.RecognizerQuantization import load_reader
+
+    recognition_only = sys.argv[1] == "recognize"
+    image_paths = sys.argv[2:] if recognition_only else sys.argv[1:]
+
+    # 서비스와 같은 YOLO로 라벨 이미지에서 crop을 만듦
+    detector = MaterialAndNutritionImageToText()
+    detector.load_nutrition_yolo()
+    detector.load_material_yolo()
+
+    crops = []
+    for path in image_paths:
+        nutrition_crops, material_crops = detector.detect_crops(cv2.imread(path))
+        # 원재료 crop은 BGR 프레임의 view이므로 서비스와 같은 입력이 되도록 RGB로 변환
+        crops += nutrition_crops + [cv2.cvtColor(crop, cv2.COLOR_BGR2RGB) for crop in material_crops]
+
+    print(benchmark(load_reader(['ko', 'en']), crops, CropNormalizer(max_skew=5.0), recognition_only=recognition_only))
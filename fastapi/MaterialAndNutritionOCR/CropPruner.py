@@ -0,0 +1,75 @@
+import threading
+
+import numpy as np
+
+from MaterialAndNutritionOCR.Detections import merge_overlapping
+
+class CropPruner:
+    """
+    YOLO 검출과 OCR 사이에서 읽을 필요가 없는 박스를 걸러내는 단계.
+
+    crop 하나를 건너뛸 때마다 인식기(필요하면 텍스트 검출기까지) 한 번을 아끼므로,
+    아래 순서로 박스를 줄이고 몇 번의 OCR을 아꼈는지 집계한다.
+    1) 신뢰도가 min_confidence보다 낮은 박스
+    2) 너비 / 높이가 min_width / min_height보다 작아서 읽을 수 없는 박스
+    3) 같은 클래스의 더 높은 신뢰도 박스와 IoU가 iou_threshold를 넘거나, 면적의 containment_threshold 이상이 그 안에 들어가는 박스
+    4) 신뢰도 순으로 max_crops개를 넘는 박스
+    """
+    def __init__(self, min_confidence: float = 0.3, min_width: int = 8, min_height: int = 8,
+                 iou_threshold: float = 0.6, containment_threshold: float = 0.9, max_crops: int = 64):
+        self.__min_confidence = min_confidence
+        self.__min_width = min_width
+        self.__min_height = min_height
+        self.__iou_threshold = iou_threshold
+        self.__containment_threshold = containment_threshold
+        self.__max_crops = max_crops
+
+        self.__lock = threading.Lock()
+        self.__counts = {"boxes": 0, "kept": 0, "low_confidence": 0, "too_small": 0, "overlap": 0, "over_cap": 0}
+
+    def prune(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            xyxy (np.ndarray): (N, 4) crop할 이미지 좌표의 박스
+            conf (np.ndarray): (N,) 검출 신뢰도
+            cls (np.ndarray): (N,) 클래스 번호
+
+        Returns:
+            np.ndarray: 남길 박스의 인덱스 (원래 순서 유지)
+        """
+        index = np.arange(len(xyxy))
+
+        confident = conf >= self.__min_confidence
+        low_confidence = int((~confident).sum())
+        index = index[confident]
+
+        width = xyxy[index, 2] - xyxy[index, 0]
+        height = xyxy[index, 3] - xyxy[index, 1]
+        readable = (width >= self.__min_width) & (height >= self.__min_height)
+        too_small = int((~readable).sum())
+        index = index[readable]
+
+        # merge_overlapping은 신뢰도 내림차순 인덱스를 돌려주므로 max_crops는 신뢰도가 높은 것부터 남김
+        merged = index[merge_overlapping(xyxy[index], conf[index], cls[index], self.__iou_threshold, self.__containment_threshold)]
+        overlap = len(index) - len(merged)
+
+        kept = merged[:self.__max_crops]
+        over_cap = len(merged) - len(kept)
+
+        with self.__lock:
+            self.__counts["boxes"] += len(xyxy)
+            self.__counts["kept"] += len(kept)
+            self.__counts["low_confidence"] += low_confidence
+            self.__counts["too_small"] += too_small
+            self.__counts["overlap"] += overlap
+            self.__counts["over_cap"] += over_cap
+
+        return np.sort(kept)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            counts = dict(self.__counts)
+
+        # 걸러낸 박스 수 = 아낀 OCR(crop 단위 인식) 호출 수
+        counts["ocr_calls_saved"] = counts["boxes"] - counts["kept"]
+        return counts
@@ -0,0 +1,192 @@
+import bisect
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+class Histogram:
+    """고정 구간(bucket) 히스토그램 (구간 경계는 각 구간의 상한값)"""
+    def __init__(self, bounds: list[float]):
+        self.__bounds = list(bounds)
+        self.__counts = [0] * (len(self.__bounds) + 1) # 마지막 칸은 상한 초과
+        self.__total = 0
+        self.__sum = 0.0
+        self.__lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self.__lock:
+            self.__counts[bisect.bisect_left(self.__bounds, value)] += 1
+            self.__total += 1
+            self.__sum += value
+
+    def snapshot(self) -> dict:
+        with self.__lock:
+            labels = [f"<={b:g}" for b in self.__bounds] + [f">{self.__bounds[-1]:g}"]
+            return {
+                "count": self.__total,
+                "mean": self.__sum / self.__total if self.__total else 0.0,
+                "buckets": dict(zip(labels, self.__counts))
+            }
+
+class DetectionBatcher:
+    """
+    여러 요청에서 거의 동시에 들어온 YOLO 검출을 하나의 배치로 묶어서 실행하는 스케줄러.
+
+    YOLO 모델 객체처럼 batcher(image)[0]로 호출할 수 있어서 set_yolo()로 그대로 교체할 수 있다.
+    첫 요청이 도착한 뒤 window_ms 동안(또는 max_batch개가 모일 때까지) 요청을 모아
+    전용 스레드에서 yolo([image1, image2, ...])로 한 번에 실행하고, 결과를 요청별로 나눠 돌려준다.
+
+    모으는 시간(window)은 관측된 지연에 맞춰 조절된다.
+    - 배치 크기가 1이면(동시 요청 없음) 기다림은 순수 지연이므로 창을 줄인다.
+    - 2개 이상 모이면 창을 늘리되, 배치 추론 시간의 max_wait_ratio배를 넘지 않게 하여 p99가 커지지 않게 한다.
+
+    호출 옵션(conf=, imgsz= 등)은 배치 실행에 그대로 넘기며, 옵션이 같은 요청끼리만 한 배치로 묶는다.
+    배치 스레드가 종료되면(close() 또는 예기치 못한 오류) 기다리던 요청은 멈춰 있지 않고 RuntimeError로 실패한다.
+    """
+    def __init__(self, yolo, window_ms: float = 10.0, max_batch: int = 8,
+                 min_window_ms: float = 1.0, max_window_ms: float = 50.0, max_wait_ratio: float = 0.5, name: str = "yolo"):
+        self.__yolo = yolo
+        self.__max_batch = max_batch
+        self.__window_ms = window_ms
+        self.__min_window_ms = min_window_ms
+        self.__max_window_ms = max_window_ms
+        self.__max_wait_ratio = max_wait_ratio
+        self.__infer_ms_ewma = None # 배치 추론 시간의 지수이동평균
+
+        self.__batch_size_hist = Histogram(list(range(1, max_batch + 1)))
+        self.__queue_wait_hist = Histogram([1, 2, 5, 10, 20, 50, 100, 200, 500])
+
+        self.__queue = queue.Queue()
+        self.__thread = threading.Thread(target=self.__run, name=f"{name}-batcher", daemon=True)
+        self.__thread.start()
+
+    @property
+    def detector(self):
+        """묶어서 실행하는 원래 YOLO 검출기"""
+        return self.__yolo
+
+    def __call__(self, images, **kwargs) -> list:
+        """
+        YOLO 모델과 같은 방식으로 호출 (이미지 1장 또는 이미지 리스트, 결과는 이미지별 Results 리스트)
+        리스트(타일 등)로 넣은 이미지도 한 장씩 큐에 넣으므로 다른 요청의 이미지와 함께 배치로 묶일 수 있음
+        kwargs(conf=, imgsz= 등)는 배치 실행에 그대로 넘김 (kwargs가 다른 요청과는 같은 배치로 묶이지 않음)
+        """
+        if isinstance(images, np.ndarray):
+            images = [images]
+
+        if not self.__thread.is_alive():
+            raise RuntimeError("검출 배치 스레드가 종료되어 검출을 실행할 수 없습니다.")
+
+        submitted = time.perf_counter()
+        futures = []
+        for image in images:
+            future = Future()
+            self.__queue.put((image, submitted, future, kwargs))
+            futures.append(future)
+
+        return [self.__wait(future) for future in futures]
+
+    def __wait(self, future: Future):
+        """결과를 기다리되, 배치 스레드가 종료되어 결과가 오지 않으면 무한히 기다리지 않고 실패"""
+        while True:
+            try:
+                return future.result(timeout=1.0)
+            except FutureTimeoutError:
+                if not self.__thread.is_alive() and not future.done():
+                    raise RuntimeError("검출 배치 스레드가 종료되어 검출 결과를 받을 수 없습니다.")
+
+    def __run(self):
+        try:
+            self.__collect_batches()
+        finally:
+            # 종료된 뒤에 큐에 남은 요청은 실행되지 않으므로 바로 실패시킴
+            while True:
+                try:
+                    item = self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None and not item[2].done():
+                    item[2].set_exception(RuntimeError("검출 배치 스레드가 종료되었습니다."))
+
+    def __collect_batches(self):
+        carry = None # 옵션이 달라서 이전 배치에 넣지 못하고 다음 배치의 첫 요청이 될 요청
+
+        while True:
+            first = carry if carry is not None else self.__queue.get()
+            carry = None
+            if first is None:
+                return
+
+            batch = [first]
+            stop = False
+
+            # 첫 요청 도착 시점부터 window 동안 다른 요청을 모음
+            # (window가 이미 지났어도 큐에 쌓여 있는 요청은 바로 꺼내서 같은 배치에 넣음)
+            deadline = first[1] + self.__window_ms / 1000
+            while len(batch) < self.__max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining <= 0:
+                        item = self.__queue.get_nowait()
+                    else:
+                        item = self.__queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if item[3] != first[3]:
+                    carry = item
+                    break
+                batch.append(item)
+
+            self.__execute_batch(batch)
+
+            if stop:
+                return
+
+    def __execute_batch(self, batch: list):
+        started = time.perf_counter()
+
+        try:
+            for _, submitted, _, _ in batch:
+                self.__queue_wait_hist.observe((started - submitted) * 1000)
+            self.__batch_size_hist.observe(len(batch))
+
+            results = self.__yolo([image for image, _, _, _ in batch], **batch[0][3])
+
+            for (_, _, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+            self.__adapt_window(len(batch), (time.perf_counter() - started) * 1000)
+        except Exception as e:
+            # 통계 갱신 등에서 난 오류로 배치 스레드가 죽거나 요청이 결과를 기다리며 멈추지 않도록, 결과를 못 받은 요청만 실패시킴
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def __adapt_window(self, batch_size: int, infer_ms: float):
+        """관측된 배치 크기와 추론 시간으로 다음 window를 조절"""
+        if self.__infer_ms_ewma is None:
+            self.__infer_ms_ewma = infer_ms
+        else:
+            self.__infer_ms_ewma = 0.8 * self.__infer_ms_ewma + 0.2 * infer_ms
+
+        window = self.__window_ms * (0.5 if batch_size == 1 else 1.25)
+        window = min(window, self.__max_wait_ratio * self.__infer_ms_ewma, self.__max_window_ms)
+        self.__window_ms = max(window, self.__min_window_ms)
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": round(self.__window_ms, 3),
+            "infer_ms_ewma": round(self.__infer_ms_ewma or 0.0, 3),
+            "queued": self.__queue.qsize(),
+            "batch_size": self.__batch_size_hist.snapshot(),
+            "queue_wait_ms": self.__queue_wait_hist.snapshot()
+        }
+
+    def close(self):
+        self.__queue.put(None)
+        self.__thread.join()
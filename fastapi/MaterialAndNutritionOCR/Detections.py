@@ -0,0 +1,112 @@
+import numpy as np
+
+class DetectionBoxes:
+    """ultralytics Results.boxes와 같은 이름의 속성(xyxy, conf, cls)을 numpy 배열로 가지는 검출 박스"""
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = xyxy # (N, 4) x1, y1, x2, y2
+        self.conf = conf # (N,) 검출 신뢰도
+        self.cls = cls # (N,) 클래스 번호
+
+    def __len__(self):
+        return len(self.xyxy)
+
+class DetectionResult:
+    """ultralytics Results 대신 사용하는 검출 결과 (boxes, names만 제공)"""
+    def __init__(self, boxes: DetectionBoxes, names: dict = None):
+        self.boxes = boxes
+        self.names = names or {}
+
+def detection_arrays(result) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ultralytics Results 또는 DetectionResult에서 (xyxy, conf, cls) numpy 배열을 꺼냄
+
+    Returns:
+        tuple: ((N, 4) float32, (N,) float32, (N,) int)
+    """
+    def to_numpy(x):
+        return x.cpu().numpy() if hasattr(x, "cpu") else np.asarray(x)
+
+    boxes = result.boxes
+    xyxy = to_numpy(boxes.xyxy).astype(np.float32).reshape(-1, 4)
+    conf = to_numpy(boxes.conf).astype(np.float32).reshape(-1)
+    cls = to_numpy(boxes.cls).astype(int).reshape(-1)
+
+    return xyxy, conf, cls
+
+def box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """박스 하나와 여러 박스 사이의 IoU"""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+def non_max_suppression(xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray = None, iou_threshold: float = 0.7) -> np.ndarray:
+    """
+    신뢰도가 높은 박스부터 남기고, 같은 클래스에서 IoU가 iou_threshold를 넘는 박스를 제거
+
+    Returns:
+        np.ndarray: 남길 박스의 인덱스 (신뢰도 내림차순)
+    """
+    if len(xyxy) == 0:
+        return np.zeros(0, dtype=int)
+
+    # 클래스별로 좌표를 떨어뜨려 놓으면 한 번의 NMS로 클래스별 NMS와 같은 결과가 나옴
+    if cls is not None:
+        offset = (cls.astype(np.float32) * (float(xyxy.max()) + 1))[:, None]
+        xyxy = xyxy + offset
+
+    order = np.argsort(-conf)
+    keep = []
+
+    while len(order) > 0:
+        i = order[0]
+        keep.append(i)
+        if len(order) == 1:
+            break
+        ious = box_iou(xyxy[i], xyxy[order[1:]])
+        order = order[1:][ious <= iou_threshold]
+
+    return np.array(keep, dtype=int)
+
+def merge_overlapping(xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray = None,
+                      iou_threshold: float = 0.5, containment_threshold: float = 0.8) -> np.ndarray:
+    """
+    신뢰도가 높은 박스부터 남기면서, 같은 클래스의 남긴 박스와 IoU가 iou_threshold를 넘거나
+    면적의 containment_threshold 이상이 남긴 박스 안에 들어가는 박스를 제거
+    (타일 경계에서 잘린 박스 조각, 큰 박스 안에 중복 검출된 작은 박스 등)
+
+    Returns:
+        np.ndarray: 남길 박스의 인덱스 (신뢰도 내림차순)
+    """
+    if len(xyxy) == 0:
+        return np.zeros(0, dtype=int)
+
+    areas = np.maximum((xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1]), 1e-9)
+    keep = []
+
+    for i in np.argsort(-conf):
+        kept = np.array(keep, dtype=int)
+        if cls is not None:
+            kept = kept[cls[kept] == cls[i]]
+
+        if len(kept) > 0:
+            x1 = np.maximum(xyxy[i, 0], xyxy[kept, 0])
+            y1 = np.maximum(xyxy[i, 1], xyxy[kept, 1])
+            x2 = np.minimum(xyxy[i, 2], xyxy[kept, 2])
+            y2 = np.minimum(xyxy[i, 3], xyxy[kept, 3])
+            inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+            iou = inter / np.maximum(areas[i] + areas[kept] - inter, 1e-9)
+            contained = inter / areas[i]
+            if (iou > iou_threshold).any() or (contained >= containment_threshold).any():
+                continue
+
+        keep.append(i)
+
+    return np.array(keep, dtype=int)
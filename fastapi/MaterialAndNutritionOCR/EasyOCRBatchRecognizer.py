@@ -0,0 +1,285 @@
+import math
+
+import cv2 # crop의 텍스트 줄 수를 추정하기 위한 import
+import numpy as np # crop 이미지를 넘파이 배열로 다루기 위한 import
+
+from easyocr.config import imgH as RECOGNIZER_HEIGHT # easyocr 인식기의 입력 높이(64px)
+from easyocr.recognition import get_text # easyocr 인식기를 배치 단위로 직접 실행하기 위한 import
+from easyocr.utils import get_image_list, reformat_input
+
+class EasyOCRBatchRecognizer:
+    """
+    한 이미지에서 나온 모든 crop을 하나의 배치로 묶어 EasyOCR 인식기에 넣는 클래스.
+
+    easy_ocr.readtext()는 crop 하나마다 (텍스트 검출 + 인식)을 따로 실행하고,
+    CPU에서는 인식도 텍스트 라인 하나씩 실행한다.
+    여기서는 crop별로 텍스트 라인 검출만 수행한 뒤, 모든 crop의 라인을 모아
+    폭이 비슷한 것끼리 패딩 배치로 인식하고 결과를 원래 crop 인덱스로 되돌려준다.
+    normalizer(CropNormalizer)가 주어지면 crop의 크기 / 기울기 / 대비를 맞춘 뒤 검출하고, 긴 줄은 조각으로 나눠서 인식한다.
+    """
+    def __init__(self, easy_ocr, batch_size: int = 16, buffer_pool = None, normalizer = None):
+        self.__easy_ocr = easy_ocr
+        self.__batch_size = batch_size # 한 번의 인식기 forward에 넣을 최대 라인 수
+        self.__ignore_chars = {} # 허용 문자 목록 -> 디코딩에서 제외할 문자 (매번 문자 집합 차이를 계산하지 않도록)
+        self.__buffer_pool = buffer_pool # swap_rb crop을 텍스트 검출기에 넣을 RGB로 바꿀 때 사용할 BufferPool
+        self.__normalizer = normalizer # 인식 전에 crop을 정규화하는 CropNormalizer (None이면 crop을 그대로 사용)
+
+    def readtext(self, crops: list[np.ndarray], allowlists: list[str] = None, swap_rb: list[bool] = None) -> list[list[tuple[str, float]]]:
+        """
+        easy_ocr.readtext(crop)를 crop마다 호출한 것과 같은 결과를 배치 인식으로 반환
+
+        Args:
+            crops (list[np.ndarray]): YOLO가 검출한 영역을 crop한 이미지 리스트
+            allowlists (list[str]): crop별 허용 문자 (None이면 모든 crop을 언어 전체 문자로 디코딩, readtext의 allowlist와 같음)
+            swap_rb (list[bool]): crop별로 True이면 crop의 R / B 채널을 바꾼 이미지(BGR view -> RGB)를 인식한 것과 같은 결과를 반환
+                                  (crop을 미리 RGB로 복사해 두지 않아도 됨, __prepare 참고)
+
+        Returns:
+            list[list[tuple[str, float]]]: crop 인덱스별 [(text, confidence), ...] 리스트
+        """
+        if allowlists is None:
+            allowlists = [None] * len(crops)
+        if swap_rb is None:
+            swap_rb = [False] * len(crops)
+
+        lines = [] # (crop 인덱스, 인식기 입력 높이로 resize된 라인 이미지)
+
+        for i, crop in enumerate(crops):
+            # 크기가 0인 crop은 readtext에서 예외가 나므로 건너뜀
+            if crop is None or crop.size == 0:
+                continue
+
+            img, img_cv_grey, pooled = self.__prepare(crop, swap_rb[i], need_color=True)
+
+            # crop 안의 텍스트 라인 검출 (readtext와 같은 기본값)
+            try:
+                detect_img = img
+                if self.__normalizer is not None:
+                    detect_img, img_cv_grey = self.__normalizer.normalize(img, img_cv_grey)
+
+                horizontal_list, free_list = self.__easy_ocr.detect(detect_img, reformat=False)
+                horizontal_list, free_list = horizontal_list[0], free_list[0]
+            finally:
+                if pooled:
+                    self.__buffer_pool.release(img)
+
+            lines += [(i, line) for line in self.__line_images(img_cv_grey, horizontal_list, free_list)]
+
+        return self.__group_by_crop(len(crops), lines, allowlists)
+
+    def recognize(self, crops: list[np.ndarray], min_confidence: float = 0.5, allowlists: list[str] = None,
+                  swap_rb: list[bool] = None) -> list[list[tuple[str, float]]]:
+        """
+        텍스트 검출기(CRAFT)를 건너뛰고 crop 전체를 한 줄의 텍스트 박스로 보고 바로 인식
+
+        YOLO가 이미 텍스트 영역을 찾았으므로 대부분의 crop은 검출기가 필요 없다.
+        여러 줄로 보이는 crop이나 인식 신뢰도가 min_confidence보다 낮은 crop만
+        검출기를 포함한 readtext() 경로로 다시 인식한다.
+
+        Args:
+            crops (list[np.ndarray]): YOLO가 검출한 영역을 crop한 이미지 리스트
+            min_confidence (float): 이 값보다 신뢰도가 낮으면 readtext() 경로로 다시 인식
+            allowlists (list[str]): crop별 허용 문자 (None이면 모든 crop을 언어 전체 문자로 디코딩)
+            swap_rb (list[bool]): crop별로 R / B 채널을 바꿔서 인식할지 (readtext 참고)
+
+        Returns:
+            list[list[tuple[str, float]]]: crop 인덱스별 [(text, confidence), ...] 리스트
+        """
+        if allowlists is None:
+            allowlists = [None] * len(crops)
+        if swap_rb is None:
+            swap_rb = [False] * len(crops)
+
+        results = [[] for _ in range(len(crops))]
+
+        lines = [] # (crop 인덱스, 인식기 입력 높이로 resize된 crop 전체 이미지)
+        fallback = [] # readtext() 경로로 다시 인식할 crop 인덱스
+
+        for i, crop in enumerate(crops):
+            if crop is None or crop.size == 0:
+                continue
+
+            _, img_cv_grey, _ = self.__prepare(crop, swap_rb[i], need_color=False)
+            if self.__normalizer is not None:
+                _, img_cv_grey = self.__normalizer.normalize(None, img_cv_grey)
+
+            # 여러 줄인 crop은 한 줄로 인식하면 글자가 뭉개지므로 검출기 경로로 보냄
+            if self.__count_text_lines(img_cv_grey) > 1:
+                fallback.append(i)
+                continue
+
+            height, width = img_cv_grey.shape
+            lines += [(i, line) for line in self.__line_images(img_cv_grey, [[0, width, 0, height]], [])]
+
+        predictions = self.__recognize_lines([line for _, line in lines], [allowlists[i] for i, _ in lines])
+
+        for (crop_index, _), (text, conf) in zip(lines, predictions):
+            if conf < min_confidence:
+                fallback.append(crop_index)
+            else:
+                results[crop_index] = [(text, conf)]
+
+        # 여러 줄이거나 신뢰도가 낮은 crop만 검출기 + 배치 인식으로 다시 처리
+        fallback_results = self.readtext([crops[i] for i in fallback], [allowlists[i] for i in fallback], [swap_rb[i] for i in fallback])
+        for crop_index, ocr_result in zip(fallback, fallback_results):
+            results[crop_index] = ocr_result
+
+        return results
+
+    def __prepare(self, crop: np.ndarray, swap_rb: bool, need_color: bool) -> tuple[np.ndarray, np.ndarray, bool]:
+        """
+        reformat_input(crop)과 같은 (텍스트 검출기 입력, 흑백 이미지)를 만듦
+
+        swap_rb이면 reformat_input(R / B를 바꾼 crop)과 같은 결과를 복사본 없이 만든다.
+        - 흑백: R / B를 바꾼 이미지의 BGR2GRAY는 원래 이미지의 RGB2GRAY와 같으므로 crop view에서 바로 변환
+        - 텍스트 검출기 입력: need_color일 때만 버퍼 풀의 버퍼에 RGB로 변환 (사용 후 release 필요)
+
+        Returns:
+            tuple: (텍스트 검출기 입력, 흑백 이미지, 텍스트 검출기 입력이 풀의 버퍼인지)
+        """
+        if not swap_rb or crop.ndim != 3 or crop.shape[2] != 3:
+            img, img_cv_grey = reformat_input(crop)
+            return img, img_cv_grey, False
+
+        img_cv_grey = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+        if not need_color:
+            return None, img_cv_grey, False
+
+        if self.__buffer_pool is None:
+            return cv2.cvtColor(crop, cv2.COLOR_BGR2RGB), img_cv_grey, False
+
+        img = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=self.__buffer_pool.acquire(crop.shape, crop.dtype))
+        return img, img_cv_grey, True
+
+    def __count_text_lines(self, img_cv_grey: np.ndarray) -> int:
+        """crop을 이진화한 뒤 가로 방향 투영(row profile)으로 텍스트 줄 수를 추정"""
+        _, binary = cv2.threshold(img_cv_grey, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        # 글자가 어두운 경우와 밝은 경우 모두 처리: 더 적은 쪽의 픽셀을 글자로 봄
+        ink = binary == 0
+        if ink.mean() > 0.5:
+            ink = ~ink
+
+        rows = ink.mean(axis=1) > 0.02 # 글자 픽셀이 조금이라도 있는 행
+        min_line_height = max(3, int(len(rows) * 0.15)) # 너무 얇은 줄(잡음, 밑줄)은 무시
+
+        line_count = 0
+        run = 0
+        for has_ink in list(rows) + [False]:
+            if has_ink:
+                run += 1
+                continue
+            if run >= min_line_height:
+                line_count += 1
+            run = 0
+
+        return line_count
+
+    def __line_images(self, img_cv_grey: np.ndarray, horizontal_list: list, free_list: list) -> list[np.ndarray]:
+        """검출된 라인 박스를 인식기 입력 높이로 잘라냄 (readtext의 CPU 경로와 같은 순서: 수평 박스 → 회전 박스)"""
+        horizontal_items, _ = get_image_list(horizontal_list, [], img_cv_grey, model_height=RECOGNIZER_HEIGHT, sort_output=False)
+        free_items, _ = get_image_list([], free_list, img_cv_grey, model_height=RECOGNIZER_HEIGHT, sort_output=False)
+
+        return [line for _, line in horizontal_items + free_items]
+
+    def __group_by_crop(self, crop_count: int, lines: list[tuple[int, np.ndarray]], allowlists: list[str]) -> list[list[tuple[str, float]]]:
+        """라인 단위 배치 인식 결과를 crop 인덱스별 리스트로 되돌림"""
+        predictions = self.__recognize_lines([line for _, line in lines], [allowlists[i] for i, _ in lines])
+
+        results = [[] for _ in range(crop_count)]
+        for (crop_index, _), prediction in zip(lines, predictions):
+            results[crop_index].append(prediction)
+
+        return results
+
+    def __recognize_lines(self, line_images: list[np.ndarray], allowlists: list[str] = None) -> list[tuple[str, float]]:
+        """
+        라인 이미지들을 허용 문자 목록별로 나눠서 인식
+
+        허용 문자가 같은 라인끼리만 한 배치에 넣을 수 있으므로(디코딩에서 제외할 문자가 배치 단위로 정해짐)
+        허용 문자 목록별로 묶어서 __recognize_group을 실행하고 결과를 원래 순서로 되돌린다.
+        normalizer가 있으면 긴 라인은 CropNormalizer.split_line으로 나눠서 인식한 뒤 조각의 결과를 라인 단위로 다시 합친다.
+        """
+        if allowlists is None:
+            allowlists = [None] * len(line_images)
+
+        if self.__normalizer is None:
+            return self.__recognize_by_allowlist(line_images, allowlists)
+
+        strips = [self.__normalizer.split_line(line) for line in line_images]
+        strip_predictions = self.__recognize_by_allowlist(
+            [strip for line_strips in strips for strip in line_strips],
+            [allowlist for allowlist, line_strips in zip(allowlists, strips) for _ in line_strips]
+        )
+
+        predictions = []
+        start = 0
+        for line_strips in strips:
+            line_predictions = strip_predictions[start:start + len(line_strips)]
+            start += len(line_strips)
+
+            if len(line_strips) == 1:
+                predictions.append(line_predictions[0])
+            else:
+                predictions.append(self.__normalizer.join_strips(line_predictions, [strip.shape[1] for strip in line_strips]))
+
+        return predictions
+
+    def __recognize_by_allowlist(self, line_images: list[np.ndarray], allowlists: list[str]) -> list[tuple[str, float]]:
+        """허용 문자 목록이 같은 라인끼리 묶어서 인식하고 결과를 원래 순서로 되돌림"""
+        groups = {} # 허용 문자 -> 라인 인덱스 리스트
+        for k, allowlist in enumerate(allowlists):
+            groups.setdefault(allowlist, []).append(k)
+
+        predictions = [None] * len(line_images)
+        for allowlist, indexes in groups.items():
+            group_predictions = self.__recognize_group([line_images[k] for k in indexes], allowlist)
+            for k, prediction in zip(indexes, group_predictions):
+                predictions[k] = prediction
+
+        return predictions
+
+    def __ignore_char(self, allowlist: str = None) -> str:
+        """readtext와 같은 방식으로 인식하지 않을 문자 목록 생성 (디코딩 시 이 문자들의 확률을 0으로 만듦)"""
+        if allowlist not in self.__ignore_chars:
+            reader = self.__easy_ocr
+            if allowlist:
+                self.__ignore_chars[allowlist] = "".join(set(reader.character) - set(allowlist))
+            else:
+                self.__ignore_chars[allowlist] = "".join(set(reader.character) - set(reader.lang_char))
+
+        return self.__ignore_chars[allowlist]
+
+    def __recognize_group(self, line_images: list[np.ndarray], allowlist: str = None) -> list[tuple[str, float]]:
+        """
+        라인 이미지들을 폭 기준으로 정렬하여 batch_size씩 패딩 배치로 인식
+
+        폭이 비슷한 라인끼리 묶어야 짧은 라인이 긴 라인의 폭만큼 패딩되어 낭비되는 연산이 줄어든다.
+        """
+        reader = self.__easy_ocr
+        ignore_char = self.__ignore_char(allowlist)
+
+        widths = [self.__aligned_width(line) for line in line_images]
+        order = sorted(range(len(line_images)), key=lambda k: widths[k])
+
+        predictions = [None] * len(line_images)
+
+        for start in range(0, len(order), self.__batch_size):
+            chunk = order[start:start + self.__batch_size]
+
+            # get_text는 (box, image) 쌍을 받아 box를 그대로 돌려주므로 box 자리에 원래 인덱스를 넣어 둠
+            image_list = [(k, line_images[k]) for k in chunk]
+            max_width = math.ceil(max(widths[k] for k in chunk) / RECOGNIZER_HEIGHT) * RECOGNIZER_HEIGHT
+
+            result = get_text(reader.character, RECOGNIZER_HEIGHT, int(max_width), reader.recognizer, reader.converter, image_list,
+                              ignore_char, "greedy", 5, len(chunk), 0.1, 0.5, 0.003, 0, reader.device)
+
+            for k, text, conf in result:
+                predictions[k] = (text, float(conf))
+
+        return predictions
+
+    def __aligned_width(self, line: np.ndarray) -> int:
+        """인식기 입력 높이로 맞췄을 때의 라인 폭 (AlignCollate의 keep_ratio_with_pad와 동일한 계산)"""
+        height, width = line.shape[:2]
+        return max(1, math.ceil(RECOGNIZER_HEIGHT * width / height))
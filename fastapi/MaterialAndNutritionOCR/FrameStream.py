@@ -0,0 +1,213 @@
+import sys
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+class FrameChangeDetector:
+    """
+    카메라 미리보기 프레임 중 마지막으로 OCR한 프레임과 거의 같은 프레임을 걸러내는 변화 검출기.
+
+    사용자가 라벨에 카메라를 대고 있는 동안 들어오는 프레임은 대부분 거의 같으므로,
+    긴 변을 size로 줄인 흑백 썸네일끼리 평균 밝기를 뺀 뒤의 평균 절대 차이(0 ~ 255)를 비교하여
+    threshold보다 작으면 건너뛴다. (자동 노출로 화면 전체가 밝아지거나 어두워진 것은 변화로 보지 않음)
+    비교 대상은 직전 프레임이 아니라 마지막으로 OCR한 프레임이므로, 천천히 움직여도 변화가 쌓이면 다시 OCR한다.
+    """
+    def __init__(self, threshold: float = 4.0, size: int = 64):
+        self.__threshold = threshold
+        self.__size = size
+        self.__reference = None # 마지막으로 OCR한 프레임의 썸네일
+        self.__candidate = None # 마지막으로 changed()에 넘어온 프레임의 썸네일
+
+    def changed(self, image: np.ndarray) -> tuple:
+        """
+        Args:
+            image (np.ndarray): BGR 또는 흑백 프레임 (ImageIngest의 검출용 프레임)
+
+        Returns:
+            tuple: (OCR할 만큼 바뀌었는지, 마지막으로 OCR한 프레임과의 차이 - 비교할 프레임이 없으면 None)
+        """
+        thumbnail = self.__thumbnail(image)
+        self.__candidate = thumbnail
+
+        if self.__reference is None or self.__reference.shape != thumbnail.shape:
+            return True, None
+
+        difference = float(np.abs(thumbnail - self.__reference).mean())
+        return difference >= self.__threshold, difference
+
+    def accept(self, image: Optional[np.ndarray] = None):
+        """
+        image를 OCR했으므로 이후 프레임의 비교 대상으로 등록
+        image를 주지 않으면 마지막으로 changed()에 넘긴 프레임을 등록 (그 사이 프레임 버퍼를 풀에 반납했어도 됨)
+        """
+        self.__reference = self.__thumbnail(image) if image is not None else self.__candidate
+
+    def reset(self):
+        self.__reference = None
+        self.__candidate = None
+
+    def __thumbnail(self, image: np.ndarray) -> np.ndarray:
+        grey = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+        height, width = grey.shape[:2]
+        scale = self.__size / max(height, width)
+        small = cv2.resize(grey, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+
+        small = small.astype(np.float32)
+        return small - small.mean()
+
+class ResultFusion:
+    """
+    여러 프레임의 OCR 결과를 항목별 신뢰도 투표로 합치는 클래스.
+
+    - 영양성분: 항목마다 읽힌 값별로 OCR 신뢰도를 더해서 가장 큰 값을 고름.
+      그 값을 읽은 프레임이 min_votes개 이상이고 전체 신뢰도 중 min_agreement 이상을 차지하면 확정(stable)
+    - 영양성분 항목 / 원재료 모두 min_votes개 이상의 프레임에서 읽힌 것만 결과에 넣음 (한 프레임에만 나온 오인식 제거)
+    - 수렴(converged): 결과에 들어간 영양성분 항목이 모두 확정되고, 합친 결과가 patience 프레임 동안 바뀌지 않았을 때
+      (그래서 수렴하려면 적어도 min_frames = min_votes + patience 프레임을 OCR해야 함)
+    """
+    def __init__(self, min_votes: int = 2, min_agreement: float = 0.6, patience: int = 2):
+        self.__min_votes = min_votes
+        self.__min_agreement = min_agreement
+        self.__patience = patience
+
+        self.reset()
+
+    def reset(self):
+        """새 제품을 찍기 시작할 때 지금까지의 투표를 버림"""
+        self.__votes = {} # 영양성분 항목 -> {값: [프레임 수, 신뢰도 합, 유사도 합]}
+        self.__material_votes = {} # 원재료 -> 프레임 수 (처음 읽힌 순서 유지)
+        self.__frames = 0
+        self.__last_values = None # 마지막으로 합친 결과의 값 (평균 신뢰도는 프레임마다 바뀌므로 비교에서 제외)
+        self.__unchanged = 0 # 합친 결과의 값이 바뀌지 않은 연속 프레임 수
+
+    def add(self, nutrition_result: dict, material_result: list) -> bool:
+        """
+        프레임 하나의 OCR 결과(MaterialAndNutritionImageToText.execute와 같은 형식)를 투표에 추가
+
+        Returns:
+            bool: 수렴했는지
+        """
+        self.__frames += 1
+
+        for key, (value, confidence, similarity) in (nutrition_result or {}).items():
+            vote = self.__votes.setdefault(key, {}).setdefault(value, [0, 0.0, 0.0])
+            vote[0] += 1
+            vote[1] += float(confidence)
+            vote[2] += float(similarity)
+
+        for material in dict.fromkeys(material_result or []):
+            self.__material_votes[material] = self.__material_votes.get(material, 0) + 1
+
+        nutrition_result, material_result = self.result()
+        values = ({key: value[0] for key, value in nutrition_result.items()}, material_result)
+        self.__unchanged = self.__unchanged + 1 if values == self.__last_values else 0
+        self.__last_values = values
+
+        return self.converged
+
+    def result(self) -> tuple:
+        """
+        Returns:
+            tuple: (nutrition_result, material_result), 영양성분은 항목마다 가장 많은 신뢰도를 받은 값과 그 값의 평균 신뢰도 / 유사도
+        """
+        nutrition_result = {}
+        for key, values in self.__votes.items():
+            if sum(vote[0] for vote in values.values()) < self.__min_votes:
+                continue
+            value, (count, confidence, similarity) = max(values.items(), key=lambda item: item[1][1])
+            nutrition_result[key] = [value, confidence / count, similarity / count]
+
+        material_result = [material for material, count in self.__material_votes.items() if count >= self.__min_votes]
+
+        return nutrition_result, material_result
+
+    def fields(self) -> dict:
+        """
+        영양성분 항목별 투표 현황 - 클라이언트가 확정된 항목부터 보여줄 수 있도록
+        (value: 지금까지 가장 유력한 값, votes: 그 값을 읽은 프레임 수, frames: 항목이 읽힌 프레임 수,
+         agreement: 그 값이 받은 신뢰도 비율, stable: 확정 여부)
+        """
+        fields = {}
+        for key, values in self.__votes.items():
+            value, (count, confidence, _) = max(values.items(), key=lambda item: item[1][1])
+            total = sum(vote[1] for vote in values.values())
+            agreement = confidence / total if total > 0 else 0.0
+            fields[key] = {
+                "value": value,
+                "votes": count,
+                "frames": sum(vote[0] for vote in values.values()),
+                "agreement": agreement,
+                "stable": count >= self.__min_votes and agreement >= self.__min_agreement
+            }
+
+        return fields
+
+    @property
+    def frames(self) -> int:
+        return self.__frames
+
+    @property
+    def min_frames(self) -> int:
+        """수렴할 수 있는 최소 OCR 프레임 수 (min_votes 프레임째에 결과가 나오고, 그 뒤 patience 프레임 동안 유지)"""
+        return self.__min_votes + self.__patience
+
+    @property
+    def converged(self) -> bool:
+        if self.__frames < self.__min_votes or self.__last_values is None:
+            return False
+
+        nutrition_values, material_result = self.__last_values
+        if not nutrition_values and not material_result:
+            return False
+
+        if not all(field["stable"] for key, field in self.fields().items() if key in nutrition_values):
+            return False
+
+        return self.__unchanged >= self.__patience
+
+class StreamStats:
+    """/ws/ocr/stream 세션들의 프레임 처리 통계 (여러 세션이 동시에 갱신)"""
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__counts = {
+            "sessions": 0, "frames": 0, "processed": 0,
+            "skipped_unchanged": 0, "skipped_quality": 0, "dropped_busy": 0,
+            "converged": 0, "converged_frames_sum": 0
+        }
+
+    def add(self, key: str, count: int = 1):
+        with self.__lock:
+            self.__counts[key] += count
+
+    def stats(self) -> dict:
+        with self.__lock:
+            counts = dict(self.__counts)
+
+        # 수렴한 세션이 수렴할 때까지 OCR한 평균 프레임 수
+        converged_frames_sum = counts.pop("converged_frames_sum")
+        counts["mean_frames_to_converge"] = converged_frames_sum / counts["converged"] if counts["converged"] else 0.0
+        return counts
+
+if(__name__ == "__main__"):
+    # 사용 예) fastapi 폴더에서 라벨을 찍은 동영상으로 변화 검출 기준값 확인 (기준값별로 OCR할 프레임 비율)
+    # python -m MaterialAndNutritionOCR.FrameStream ../label.mp4
+    capture = cv2.VideoCapture(sys.argv[1])
+    frames = []
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+
+    for threshold in (2.0, 4.0, 6.0, 8.0, 12.0):
+        detector = FrameChangeDetector(threshold=threshold)
+        processed = 0
+        for frame in frames:
+            changed, _ = detector.changed(frame)
+            if changed:
+                detector.accept(frame)
+                processed += 1
+        print(f"threshold {threshold}: {processed}/{len(frames)} 프레임 OCR ({processed / max(1, len(frames)):.1%})")
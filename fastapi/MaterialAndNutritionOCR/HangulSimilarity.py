@@ -0,0 +1,123 @@
+import string
+
+CHO = ["ㄱ","ㄲ","ㄴ","ㄷ","ㄸ","ㄹ","ㅁ","ㅂ","ㅃ","ㅅ","ㅆ","ㅇ",
+       "ㅈ","ㅉ","ㅊ","ㅋ","ㅌ","ㅍ","ㅎ"]
+JUNG = ["ㅏ","ㅐ","ㅑ","ㅒ","ㅓ","ㅔ","ㅕ","ㅖ","ㅗ","ㅘ","ㅙ","ㅚ",
+        "ㅛ","ㅜ","ㅝ","ㅞ","ㅟ","ㅠ","ㅡ","ㅢ","ㅣ"]
+JONG = ["","ㄱ","ㄲ","ㄳ","ㄴ","ㄵ","ㄶ","ㄷ","ㄹ","ㄺ","ㄻ","ㄼ","ㄽ","ㄾ","ㄿ",
+        "ㅀ","ㅁ","ㅂ","ㅄ","ㅅ","ㅆ","ㅇ","ㅈ","ㅊ","ㅋ","ㅌ","ㅍ","ㅎ"]
+
+# 한글 음절(가~힣) 11172자 -> 초성/중성/종성 문자열 변환표 (str.translate로 한 번에 분해)
+_DECOMPOSE_TABLE = {
+    0xAC00 + i: CHO[i // 588] + JUNG[(i % 588) // 28] + JONG[i % 28]
+    for i in range(11172)
+}
+
+# 유사도 비교용 변환표: 숫자 / 영문자는 지우고 한글은 분해 (기존 re.sub + 분해를 한 번의 translate로 처리)
+_KEY_TABLE = {**_DECOMPOSE_TABLE, **{ord(ch): None for ch in string.digits + string.ascii_letters}}
+
+def decompose_hangul(s: str) -> str:
+    """
+    문자열 내 한글을 초성/중성/종성 단위로 분해하여 반환.
+    예: "열량" -> "ㅇㅕㄹㄹㅑㅇ"
+    """
+    return s.translate(_DECOMPOSE_TABLE)
+
+def jamo_key(s: str) -> str:
+    """숫자와 영문자를 지우고 한글을 자모로 분해한 비교용 문자열"""
+    return s.translate(_KEY_TABLE)
+
+def _char_masks(key: str) -> dict:
+    """문자별로 key에서 그 문자가 나오는 위치를 비트로 표시한 마스크"""
+    masks = {}
+    for i, ch in enumerate(key):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+def _lcs_length(masks: dict, length: int, text: str) -> int:
+    """
+    비트 병렬 LCS(최장 공통 부분 수열) 길이 (Allison-Dix / Hyyrö)
+    패턴 길이가 길어도 파이썬 정수가 임의 길이 비트열이므로 그대로 동작함
+    """
+    full = (1 << length) - 1
+    row = full
+
+    for ch in text:
+        matches = row & masks.get(ch, 0)
+        row = ((row + matches) | (row - matches)) & full
+
+    return length - row.bit_count()
+
+def _ratio(lcs: int, total: int) -> float:
+    # difflib.SequenceMatcher.ratio()와 같이 두 문자열이 모두 비어 있으면 1.0
+    return 2.0 * lcs / total if total else 1.0
+
+class JamoPattern:
+    """
+    자모로 분해한 키워드와 비트 마스크를 미리 계산해 둔 비교 패턴.
+
+    similarity()는 2 * LCS / (두 문자열 길이 합)으로, 삽입/삭제 편집 거리를 0~1로 정규화한 값이다.
+    difflib.SequenceMatcher.ratio()와 같은 식이지만 SequenceMatcher는 일치 블록을 탐욕적으로 찾기 때문에
+    LCS보다 작게 셀 수 있어서, 이 값은 SequenceMatcher 결과보다 같거나 약간 크다.
+    """
+    def __init__(self, keyword: str):
+        self.keyword = keyword
+        self.key = jamo_key(keyword)
+        self.__masks = _char_masks(self.key)
+
+    def similarity(self, text_key: str) -> float:
+        """
+        Args:
+            text_key (str): jamo_key()로 변환한 비교 대상 문자열
+        """
+        return _ratio(_lcs_length(self.__masks, len(self.key), text_key), len(self.key) + len(text_key))
+
+def similar(a: str, b: str) -> float:
+    """두 문자열의 유사도 계산 (0~1)"""
+    return JamoPattern(b).similarity(jamo_key(a))
+
+if(__name__ == "__main__"):
+    # 기존 구현(re.sub + 매번 분해 + SequenceMatcher)과 속도 / 결과 비교
+    # 사용 예) fastapi 폴더에서 python -m MaterialAndNutritionOCR.HangulSimilarity
+    import re
+    import timeit
+    from difflib import SequenceMatcher
+
+    def legacy_decompose(s: str) -> str:
+        result = []
+        for ch in s:
+            code = ord(ch)
+            if 0xAC00 <= code <= 0xD7A3:
+                base = code - 0xAC00
+                result.append(CHO[base // 588])
+                result.append(JUNG[(base % 588) // 28])
+                if JONG[base % 28] != "":
+                    result.append(JONG[base % 28])
+            else:
+                result.append(ch)
+        return "".join(result)
+
+    def legacy_similar(a: str, b: str) -> float:
+        decomposed_a = legacy_decompose(re.sub(r"[0-9A-Za-z]", "", a))
+        decomposed_b = legacy_decompose(re.sub(r"[0-9A-Za-z]", "", b))
+        return SequenceMatcher(None, decomposed_a, decomposed_b).ratio()
+
+    keywords = ["총내용량", "나트륨", "나르룹", "탄수화물", "당류", "지방", "트랜스지방", "포화지방", "콜레스테롤", "단백질"]
+    texts = ["나트륨350mg18%", "탄수화물27g8%", "당류4g4%", "지방13g24%", "트랜스지방0g", "포화지방5g33%",
+             "콜레스테롤10mg3%", "단백질4g7%", "총내용량235ml", "원재료명:밀가루(밀:미국산),설탕,우유,대두유"]
+    patterns = [JamoPattern(kw) for kw in keywords]
+
+    def run_legacy():
+        return [legacy_similar(t, kw) for t in texts for kw in keywords]
+
+    def run_kernel():
+        return [p.similarity(jamo_key(t)) for t in texts for p in patterns]
+
+    assert [decompose_hangul(t) for t in texts] == [legacy_decompose(t) for t in texts]
+    max_diff = max(abs(x - y) for x, y in zip(run_legacy(), run_kernel()))
+
+    number = 2000
+    legacy_us = timeit.timeit(run_legacy, number=number) / number * 1e6
+    kernel_us = timeit.timeit(run_kernel, number=number) / number * 1e6
+    print(f"{len(texts)} texts x {len(keywords)} keywords: legacy {legacy_us:.1f}us, kernel {kernel_us:.1f}us "
+          f"({legacy_us / kernel_us:.1f}x), max ratio diff {max_diff:.3f}")
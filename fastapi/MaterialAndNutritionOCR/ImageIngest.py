@@ -0,0 +1,126 @@
+import io
+
+import cv2
+import numpy as np
+from PIL import Image # 이미지 전체를 디코딩하지 않고 헤더(크기, 포맷)만 읽기 위한 import
+
+# cv2.imdecode의 축소 디코딩 플래그 (JPEG은 DCT 단계에서 축소되어 전체 디코딩보다 훨씬 빠름)
+_REDUCED_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+def scale_boxes(boxes: np.ndarray, from_shape: tuple, to_shape: tuple) -> np.ndarray:
+    """
+    from_shape 크기의 이미지에서 검출한 xyxy 박스를 to_shape 크기의 이미지 좌표로 변환
+
+    Args:
+        boxes (np.ndarray): (N, 4) x1, y1, x2, y2
+        from_shape (tuple): 검출에 사용한 이미지의 shape (h, w, ...)
+        to_shape (tuple): crop할 이미지의 shape (h, w, ...)
+    """
+    if from_shape[:2] == to_shape[:2]:
+        return boxes
+
+    sx = to_shape[1] / from_shape[1]
+    sy = to_shape[0] / from_shape[0]
+
+    return boxes * np.array([sx, sy, sx, sy], dtype=np.float32)
+
+class IngestedImage:
+    """업로드 이미지를 디코딩한 결과 (OCR crop용 프레임 + 검출용 축소 프레임)"""
+    def __init__(self, image: np.ndarray, detect_image: np.ndarray, original_size: tuple):
+        self.image = image # OCR crop을 만들 고해상도 BGR 프레임
+        self.detect_image = detect_image # YOLO 검출에 사용할 BGR 프레임 (축소가 필요 없으면 image와 같은 객체)
+        self.original_size = original_size # 업로드 원본의 (width, height)
+
+    @property
+    def nbytes(self) -> int:
+        """디코딩된 프레임들이 차지하는 바이트 (검출용 프레임이 따로 있으면 함께 합산)"""
+        if self.detect_image is self.image:
+            return self.image.nbytes
+        return self.image.nbytes + self.detect_image.nbytes
+
+class ImageIngest:
+    """
+    업로드 바이트를 해상도에 맞춰 디코딩하는 클래스.
+
+    1) 헤더만 먼저 읽어서 원본 크기를 확인한다.
+    2) OCR crop용 프레임: ocr_min_side가 지정되어 있고 JPEG이면, 긴 변이 ocr_min_side 이상 남는 선에서
+       축소 디코딩(1/2, 1/4, 1/8)한다. (0이면 원본 해상도로 디코딩)
+    3) 검출용 프레임: OCR용 프레임이 검출기 입력 크기(detect_size)의 2배 이상이면 긴 변을 detect_size로 줄인다.
+       (이미 디코딩된 프레임을 INTER_AREA로 줄이는 것이 한 번 더 축소 디코딩하는 것보다 빠름)
+
+    YOLO는 작은 검출용 프레임에서 실행하고, 박스 좌표를 scale_boxes로 고해상도 프레임 좌표로 변환하여 crop하므로
+    작은 글자의 해상도는 그대로 유지된다.
+
+    buffer_pool이 주어지면 검출용 프레임은 풀의 버퍼에 바로 resize하고, 요청이 끝나면 release()로 돌려받아 재사용한다.
+    (cv2.imdecode는 파이썬에서 출력 버퍼를 지정할 수 없으므로 OCR용 프레임은 디코딩할 때 한 번 할당됨)
+    """
+    def __init__(self, detect_size: int = 640, ocr_min_side: int = 0, buffer_pool = None):
+        self.__detect_size = detect_size
+        self.__ocr_min_side = ocr_min_side
+        self.__buffer_pool = buffer_pool
+
+    def decode(self, image_bytes: bytes):
+        """
+        Returns:
+            IngestedImage: 디코딩 결과, 이미지를 읽을 수 없으면 None
+        """
+        buffer = np.frombuffer(image_bytes, np.uint8)
+
+        factor = 1
+        if self.__ocr_min_side > 0:
+            factor = self.__reduce_factor(image_bytes)
+
+        image = cv2.imdecode(buffer, _REDUCED_COLOR_FLAGS[factor])
+
+        if image is None:
+            return None
+
+        original_size = (image.shape[1] * factor, image.shape[0] * factor)
+
+        return IngestedImage(image, self.__detect_frame(image), original_size)
+
+    def release(self, ingested: IngestedImage):
+        """요청이 끝난 뒤 검출용 프레임 버퍼를 풀에 돌려줌 (이후 ingested.detect_image는 사용하면 안 됨)"""
+        if self.__buffer_pool is not None and ingested is not None and ingested.detect_image is not ingested.image:
+            self.__buffer_pool.release(ingested.detect_image)
+
+    def __reduce_factor(self, image_bytes: bytes) -> int:
+        """헤더로 원본 크기를 확인하여, 축소 후에도 긴 변이 ocr_min_side 이상이 되는 가장 큰 축소 배율"""
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as header:
+                width, height = header.size
+
+                # 축소 디코딩은 JPEG에서만 빠름 (다른 포맷은 전체 디코딩 후 resize와 같음)
+                if header.format != "JPEG":
+                    return 1
+        except Exception:
+            # PIL이 읽지 못하는 포맷은 OpenCV 전체 디코딩에 맡김
+            return 1
+
+        long_side = max(width, height)
+
+        for factor in (8, 4, 2):
+            if long_side / factor >= self.__ocr_min_side:
+                return factor
+        return 1
+
+    def __detect_frame(self, image: np.ndarray) -> np.ndarray:
+        """OCR용 프레임이 detect_size의 2배 이상이면 긴 변을 detect_size로 줄인 검출용 프레임 생성"""
+        long_side = max(image.shape[:2])
+
+        if long_side < self.__detect_size * 2:
+            return image
+
+        ratio = self.__detect_size / long_side
+        size = (max(1, round(image.shape[1] * ratio)), max(1, round(image.shape[0] * ratio)))
+
+        if self.__buffer_pool is None:
+            return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+        frame = self.__buffer_pool.acquire((size[1], size[0]) + image.shape[2:], image.dtype)
+        return cv2.resize(image, size, dst=frame, interpolation=cv2.INTER_AREA)
@@ -0,0 +1,155 @@
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# 사진을 다시 찍어야 하는 이유 (클라이언트가 그대로 분기할 수 있는 코드)
+BLURRY = "blurry"
+TOO_DARK = "too_dark"
+OVEREXPOSED = "overexposed"
+GLARE = "glare"
+NO_LABEL = "no_label"
+
+class QualityReport:
+    """ImageQualityGate.check의 결과 (통과 여부, 거부 사유 코드, 측정값)"""
+    def __init__(self, reasons: list, metrics: dict, elapsed_ms: float):
+        self.reasons = reasons # 비어 있으면 통과
+        self.metrics = metrics # sharpness / brightness / clipped / glare / edge_density
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def ok(self) -> bool:
+        return not self.reasons
+
+    def to_dict(self) -> dict:
+        return {"ok": self.ok, "reasons": list(self.reasons), "metrics": dict(self.metrics), "elapsed_ms": self.elapsed_ms}
+
+class ImageQualityError(Exception):
+    """품질 검사에서 거부된 이미지로 OCR을 요청했을 때 발생 (422로 응답하고 재촬영을 요청)"""
+    def __init__(self, report: QualityReport):
+        super().__init__(", ".join(report.reasons))
+        self.report = report
+
+class ImageQualityGate:
+    """
+    YOLO / OCR을 실행하기 전에 사진이 읽을 수 있는 상태인지 몇 ms 안에 확인하는 검사.
+
+    흐리거나 어둡거나 빛 반사로 하얗게 날아간 사진도 YOLO 두 번과 수십 번의 OCR을 거친 뒤에야 빈 결과가 나오므로,
+    긴 변을 size로 줄인 흑백 프레임에서 아래 값을 측정하고 기준을 벗어나면 사유 코드를 돌려준다.
+    - sharpness: 라플라시안 분산 (min_sharpness보다 작으면 BLURRY)
+    - brightness: 평균 밝기 (min_brightness보다 작으면 TOO_DARK)
+    - edge_density: Canny 경계 픽셀 비율, 글자가 있는 라벨은 경계가 촘촘함 (min_edge_density보다 작으면 NO_LABEL)
+    - clipped: 포화(250 이상)된 픽셀 비율 (참고용)
+    - glare: 포화된 영역 중 빛 반사 덩어리의 면적 비율 (max_glare보다 크면 GLARE)
+      포화된 픽셀의 연결 요소 중 면적이 min_glare_blob 이상이고, 글자 구멍까지 채운 안쪽의 경계 픽셀 비율이
+      max_glare_texture보다 작은(안에 글자가 없는) 덩어리만 센다.
+      (흰 바탕 라벨은 화면 대부분이 포화되어도 바탕 안에 글자 경계가 있으므로 빛 반사로 보지 않음)
+    - 과다 노출(OVEREXPOSED): 평균 밝기가 max_brightness보다 크고 경계도 거의 없을 때 (글자까지 하얗게 날아간 사진)
+      이때는 NO_LABEL / GLARE 대신 OVEREXPOSED만 돌려준다.
+    """
+    def __init__(self, min_sharpness: float = 60.0, min_brightness: float = 40.0, max_brightness: float = 225.0,
+                 max_glare: float = 0.05, min_edge_density: float = 0.01, min_glare_blob: float = 0.01,
+                 max_glare_texture: float = 0.02, size: int = 512):
+        self.__min_sharpness = min_sharpness
+        self.__min_brightness = min_brightness
+        self.__max_brightness = max_brightness
+        self.__max_glare = max_glare
+        self.__min_edge_density = min_edge_density
+        self.__min_glare_blob = min_glare_blob
+        self.__max_glare_texture = max_glare_texture
+        self.__size = size
+
+        self.__lock = threading.Lock()
+        self.__counts = {"checked": 0, "passed": 0, BLURRY: 0, TOO_DARK: 0, OVEREXPOSED: 0, GLARE: 0, NO_LABEL: 0}
+
+    def check(self, image: np.ndarray) -> QualityReport:
+        """
+        Args:
+            image (np.ndarray): BGR 또는 흑백 이미지 (ImageIngest의 검출용 축소 프레임을 넘기면 충분함)
+
+        Returns:
+            QualityReport: 거부 사유가 없으면 ok
+        """
+        started = time.perf_counter()
+
+        grey = self.__grey_frame(image)
+        edges = cv2.Canny(grey, 50, 150)
+        saturated = (grey >= 250).astype(np.uint8)
+
+        metrics = {
+            "sharpness": float(cv2.Laplacian(grey, cv2.CV_64F).var()),
+            "brightness": float(grey.mean()),
+            "clipped": float(np.count_nonzero(saturated) / grey.size),
+            "glare": self.__glare(saturated, edges),
+            "edge_density": float(np.count_nonzero(edges) / grey.size)
+        }
+
+        reasons = []
+        overexposed = metrics["brightness"] > self.__max_brightness and metrics["edge_density"] < self.__min_edge_density
+        if metrics["brightness"] < self.__min_brightness:
+            reasons.append(TOO_DARK)
+        elif overexposed:
+            reasons.append(OVEREXPOSED)
+        if metrics["glare"] > self.__max_glare and not overexposed:
+            reasons.append(GLARE)
+        if metrics["sharpness"] < self.__min_sharpness:
+            reasons.append(BLURRY)
+        if metrics["edge_density"] < self.__min_edge_density and not overexposed:
+            reasons.append(NO_LABEL)
+
+        with self.__lock:
+            self.__counts["checked"] += 1
+            self.__counts["passed"] += int(not reasons)
+            for reason in reasons:
+                self.__counts[reason] += 1
+
+        return QualityReport(reasons, metrics, (time.perf_counter() - started) * 1000)
+
+    def __glare(self, saturated: np.ndarray, edges: np.ndarray) -> float:
+        """포화된 연결 요소 중 min_glare_blob 이상이고 안에 경계(글자)가 없는 덩어리들의 면적 비율"""
+        count, labels, blobs, _ = cv2.connectedComponentsWithStats(saturated, connectivity=8)
+        min_area = self.__min_glare_blob * saturated.size
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+        glare = 0
+        for label in range(1, count):
+            x, y, width, height, area = blobs[label]
+            if area < min_area:
+                continue
+
+            # 글자 구멍까지 채운 덩어리 안쪽 (가장자리의 밝기 경계는 빛 반사에도 있으므로 깎아냄)
+            blob = (labels[y:y + height, x:x + width] == label).astype(np.uint8)
+            contours, _ = cv2.findContours(blob, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            inside = np.zeros_like(blob)
+            cv2.drawContours(inside, contours, -1, 1, thickness=cv2.FILLED)
+            inside = cv2.erode(inside, kernel) > 0
+
+            texture = np.count_nonzero(edges[y:y + height, x:x + width][inside]) / max(1, np.count_nonzero(inside))
+            if texture < self.__max_glare_texture:
+                glare += area
+
+        return float(glare / saturated.size)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return dict(self.__counts)
+
+    def __grey_frame(self, image: np.ndarray) -> np.ndarray:
+        """긴 변이 size보다 크면 줄인 흑백 프레임 (측정값이 업로드 해상도에 따라 달라지지 않도록 크기를 맞춤)"""
+        grey = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+        height, width = grey.shape[:2]
+        scale = self.__size / max(height, width)
+        if scale < 1.0:
+            grey = cv2.resize(grey, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+
+        return grey
+
+if(__name__ == "__main__"):
+    # 사용 예) fastapi 폴더에서 기준값을 정할 때 라벨 사진들의 측정값 확인
+    # python -m MaterialAndNutritionOCR.ImageQualityGate ../1.jpg ../2.png
+    gate = ImageQualityGate()
+    for path in sys.argv[1:]:
+        print(path, gate.check(cv2.imread(path)).to_dict())
@@ -0,0 +1,135 @@
+import sys
+import threading
+
+import cv2
+import numpy as np
+
+class LabelRegionFinder:
+    """
+    영양성분표 / 원재료명처럼 글자가 빽빽하게 모인 영역을 축소 프레임에서 고전적인 방법으로 찾는 1단계 검출기.
+
+    제품 사진은 대부분 포장 그림이므로, 이 영역만 잘라서 영양성분 / 원재료 YOLO에 넘기면
+    비싼 검출(타일 검출 포함)과 그 뒤의 OCR이 라벨 부분의 픽셀에만 쓰인다.
+    1) 긴 변을 size로 줄인 흑백 프레임을 적응형 이진화 (어두운 글자 / 밝은 글자 두 방향 모두)
+    2) 연결 요소 중 글자 크기(높이 3px ~ 긴 변의 5%, 가로세로 비 3 이하, 채움 비율 15% 이상)인 것만 글자로 봄
+       (표의 테두리 선, 큰 그림, 배경 잡음은 여기서 빠짐)
+    3) 글자 사각형을 키워서 이웃끼리 합친 블록 중 글자가 min_chars개 이상인 블록만 라벨 영역으로 봄
+    4) 라벨 블록들을 모두 감싸는 사각형에 여백(padding)을 더해서 반환
+       (찾지 못했거나 프레임의 max_coverage 이상을 덮으면 None -> 호출한 쪽은 프레임 전체를 검출)
+    """
+    def __init__(self, size: int = 480, min_chars: int = 30, max_coverage: float = 0.7, padding: float = 0.03):
+        self.__size = size
+        self.__min_chars = min_chars
+        self.__max_coverage = max_coverage # 잘라도 아낄 픽셀이 거의 없으면 영역을 쓰지 않음
+        self.__padding = padding # 영역 바깥쪽 여백 (축소 프레임 긴 변 대비, 가장자리 글자가 잘리지 않도록)
+
+        self.__lock = threading.Lock()
+        self.__counts = {"frames": 0, "found": 0, "not_found": 0, "too_large": 0, "coverage_sum": 0.0}
+
+    def find(self, image: np.ndarray) -> tuple:
+        """
+        Args:
+            image (np.ndarray): BGR 또는 흑백 이미지 (ImageIngest의 검출용 축소 프레임)
+
+        Returns:
+            tuple: image 좌표의 라벨 영역 (x1, y1, x2, y2), 없으면 None
+        """
+        grey = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+        height, width = grey.shape[:2]
+        scale = min(1.0, self.__size / max(height, width))
+        if scale < 1.0:
+            grey = cv2.resize(grey, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+
+        region = self.__label_region(grey)
+
+        coverage = 0.0
+        if region is not None:
+            x1, y1, x2, y2 = region
+            coverage = (x2 - x1) * (y2 - y1) / (grey.shape[0] * grey.shape[1])
+
+        with self.__lock:
+            self.__counts["frames"] += 1
+            if region is None:
+                self.__counts["not_found"] += 1
+            elif coverage >= self.__max_coverage:
+                self.__counts["too_large"] += 1
+            else:
+                self.__counts["found"] += 1
+                self.__counts["coverage_sum"] += coverage
+
+        if region is None or coverage >= self.__max_coverage:
+            return None
+
+        # 축소 프레임 좌표 -> image 좌표
+        x1, y1, x2, y2 = region
+        return (
+            max(0, int(x1 / scale)), max(0, int(y1 / scale)),
+            min(width, int(np.ceil(x2 / scale))), min(height, int(np.ceil(y2 / scale)))
+        )
+
+    def stats(self) -> dict:
+        with self.__lock:
+            counts = dict(self.__counts)
+
+        # 영역을 찾은 프레임에서 YOLO가 본 면적의 평균 비율
+        coverage_sum = counts.pop("coverage_sum")
+        counts["mean_coverage"] = coverage_sum / counts["found"] if counts["found"] else 0.0
+        return counts
+
+    def __label_region(self, grey: np.ndarray) -> tuple:
+        """축소 흑백 프레임 좌표의 라벨 영역 (x1, y1, x2, y2), 글자 블록이 없으면 None"""
+        height, width = grey.shape[:2]
+        long_side = max(height, width)
+
+        # 1) ~ 2) 글자 크기의 연결 요소
+        chars = []
+        for polarity in (cv2.THRESH_BINARY_INV, cv2.THRESH_BINARY):
+            binary = cv2.adaptiveThreshold(grey, 255, cv2.ADAPTIVE_THRESH_MEAN_C, polarity, 15, 10)
+            _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+
+            x, y, w, h, area = stats[1:].T
+            char_like = (h >= 3) & (h <= long_side * 0.05) & (w <= 3 * h) & (area >= 0.15 * w * h)
+            chars.append(stats[1:][char_like, :4])
+
+        chars = np.concatenate(chars)
+        if len(chars) < self.__min_chars:
+            return None
+
+        # 3) 글자 -> 블록 (가로로 글자 간격, 세로로 줄 간격만큼 키워서 합침)
+        mask = np.zeros_like(grey)
+        for x, y, w, h in chars:
+            mask[y:y + h, x:x + w] = 255
+        block_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, long_side // 30), max(3, long_side // 40)))
+        blocks = cv2.dilate(mask, block_kernel)
+
+        count, labels, block_stats, _ = cv2.connectedComponentsWithStats(blocks, connectivity=8)
+        char_counts = np.bincount(labels[chars[:, 1] + chars[:, 3] // 2, chars[:, 0] + chars[:, 2] // 2], minlength=count)
+
+        label_blocks = block_stats[1:][char_counts[1:] >= self.__min_chars]
+        if len(label_blocks) == 0:
+            return None
+
+        # 4) 라벨 블록 전체를 감싸는 사각형 + 여백
+        pad = int(long_side * self.__padding)
+        x1 = int(label_blocks[:, 0].min()) - pad
+        y1 = int(label_blocks[:, 1].min()) - pad
+        x2 = int((label_blocks[:, 0] + label_blocks[:, 2]).max()) + pad
+        y2 = int((label_blocks[:, 1] + label_blocks[:, 3]).max()) + pad
+
+        return max(0, x1), max(0, y1), min(width, x2), min(height, y2)
+
+if(__name__ == "__main__"):
+    # 사용 예) fastapi 폴더에서 라벨 사진들의 영역을 확인 (영역을 그린 이미지를 <경로>.region.jpg로 저장)
+    # python -m MaterialAndNutritionOCR.LabelRegionFinder ../1.jpg ../2.png
+    finder = LabelRegionFinder()
+    for path in sys.argv[1:]:
+        image = cv2.imread(path)
+        region = finder.find(image)
+        print(path, image.shape[:2], region)
+
+        if region is not None:
+            x1, y1, x2, y2 = region
+            cv2.rectangle(image, (x1, y1), (x2, y2), (0, 0, 255), max(2, max(image.shape[:2]) // 200))
+        cv2.imwrite(path + ".region.jpg", image)
+    print(finder.stats())
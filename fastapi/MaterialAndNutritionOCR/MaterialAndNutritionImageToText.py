@@ -1,39 +1,483 @@
+import contextlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
+import numpy as np
 
 from MaterialAndNutritionOCR.MaterialImageToText import MaterialImageToText
 from MaterialAndNutritionOCR.NutritionImageToText import NutritionImageToText
-import easyocr
+from MaterialAndNutritionOCR.EasyOCRBatchRecognizer import EasyOCRBatchRecognizer
+from MaterialAndNutritionOCR.DetectionBatcher import DetectionBatcher
+from MaterialAndNutritionOCR.RecognizerQuantization import load_reader
+from MaterialAndNutritionOCR.PreforkServer import freeze_torch_modules
+from MaterialAndNutritionOCR.CropPruner import CropPruner
+from MaterialAndNutritionOCR.BufferPool import BufferPool
+from MaterialAndNutritionOCR.CropNormalizer import CropNormalizer
+from MaterialAndNutritionOCR.LabelRegionFinder import LabelRegionFinder
+from MaterialAndNutritionOCR.ImageIngest import scale_boxes
+from MaterialAndNutritionOCR.YoloBackend import OnnxYoloDetector
+
+# execute()가 실행할 수 있는 분석 분기 (영양성분 수치 / 원재료 알레르기 성분)
+BRANCHES = ("nutrition", "material")
+
+def _synthetic_label() -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    워밍업용 가상 라벨 이미지 (흰 배경 + 검은 글자 줄)
+
+    Returns:
+        tuple: (라벨 BGR 이미지, 글자 줄마다 crop한 이미지 리스트)
+    """
+    image = np.full((960, 720, 3), 255, dtype=np.uint8)
+    lines = ["Nutrition Facts", "Total 250 kcal", "Sodium 350mg 18%", "Carbohydrate 27g 8%", "Protein 4g 7%", "Ingredients: wheat, milk, soy"]
+
+    crops = []
+    for i, line in enumerate(lines):
+        y = 120 + i * 130
+        cv2.putText(image, line, (40, y), cv2.FONT_HERSHEY_SIMPLEX, 1.4, (0, 0, 0), 3, cv2.LINE_AA)
+        crops.append(image[y - 60:y + 25, 20:700].copy())
+
+    return image, crops
+
+def _try(function, *args):
+    """function(*args)의 결과, 예외가 나면 예외 객체 (execute_batch에서 이미지 하나의 오류가 다른 이미지로 번지지 않도록)"""
+    try:
+        return function(*args)
+    except Exception as e:
+        return e
 
 class MaterialAndNutritionImageToText:
-    def __init__(self):
-        self.__niit = NutritionImageToText()
+    def __init__(self, RECOGNITION_ONLY = False, YOLO_BACKEND = "ultralytics", YOLO_INT8 = False, RECOGNIZER_QUANTIZATION = "dynamic",
+                 TILE_SIZE = 0, TILE_OVERLAP = 0.2, TILE_MIN_MEGAPIXELS = 8.0, CROP_PRUNING = None,
+                 VALUE_CLASSES = (), EARLY_STOP = None, LAYOUT_PARSER = True, CONCURRENT_BRANCHES = False,
+                 BRANCH_THREADS = 1, BUFFER_POOL_MB = 64, CROP_NORMALIZATION = None, CASCADE = None):
+        # LAYOUT_PARSER: True이면 박스 위치로 영양성분 표의 라벨 셀과 수치 셀을 짝지어 파싱 (NutritionImageToText 참고)
+        self.__niit = NutritionImageToText(LAYOUT_PARSER=LAYOUT_PARSER)
         self.__miit = MaterialImageToText()
         self.__easy_ocr = None
+        self.__recognizer = None
+
+        # True이면 YOLO crop을 EasyOCR 텍스트 검출기 없이 바로 인식함
+        # (여러 줄이거나 신뢰도가 낮은 crop만 검출기를 포함한 readtext 경로로 처리)
+        self.__recognition_only = RECOGNITION_ONLY
+
+        # YOLO 실행 백엔드 ("ultralytics" | "onnxruntime" | "openvino" | "opencv", YoloBackend 참고)
+        self.__yolo_backend = YOLO_BACKEND
+        self.__yolo_int8 = YOLO_INT8
+
+        # EasyOCR 인식기 양자화 모드 ("none" | "dynamic" | "static", RecognizerQuantization 참고)
+        self.__recognizer_quantization = RECOGNIZER_QUANTIZATION
+
+        # 영양성분 타일 검출 (TILE_SIZE > 0이고 원본이 TILE_MIN_MEGAPIXELS 이상일 때, NutritionImageToText.enable_tiling 참고)
+        if TILE_SIZE > 0:
+            self.__niit.enable_tiling(TILE_SIZE, TILE_OVERLAP, TILE_MIN_MEGAPIXELS)
+
+        # OCR 전에 박스를 걸러내는 단계 (CropPruner 생성 옵션 dict, None이면 모든 박스를 OCR)
+        self.__nutrition_pruner = None
+        self.__material_pruner = None
+        if CROP_PRUNING is not None:
+            self.__nutrition_pruner = CropPruner(**CROP_PRUNING)
+            self.__material_pruner = CropPruner(**CROP_PRUNING)
+            self.__niit.set_pruner(self.__nutrition_pruner)
+            self.__miit.set_pruner(self.__material_pruner)
+
+        # 수치 crop("350mg" 등)을 검출하는 영양성분 YOLO 클래스 번호 (숫자 / 단위 문자로만 디코딩, NutritionImageToText.set_value_classes 참고)
+        self.__niit.set_value_classes(VALUE_CLASSES)
+
+        # 영양성분 항목이 모두 확정되면 남은 영양성분 crop은 인식하지 않음 (enable_early_stop 옵션 dict, None이면 모두 인식)
+        self.__early_stop = EARLY_STOP is not None
+        if self.__early_stop:
+            self.__niit.enable_early_stop(**EARLY_STOP)
+
+        # True이면 영양성분 / 원재료 YOLO 검출을 동시에 실행 (torch 추론은 GIL을 놓으므로 두 검출이 겹쳐서 진행됨)
+        # 요청 하나의 검출 시간이 두 검출의 합에서 느린 쪽 정도로 줄어듦
+        # BRANCH_THREADS: 원재료 검출 스레드 수, 동시에 OCR을 실행하는 요청 수(서버의 OCR 스레드 수)에 맞춤
+        # (요청마다 원재료 검출 하나씩만 겹치므로 그보다 많으면 torch 스레드끼리 코어를 다투기만 함, 검출 배치가 켜져 있으면 함께 묶임)
+        self.__branch_executor = ThreadPoolExecutor(max_workers=max(1, BRANCH_THREADS), thread_name_prefix="material-branch") if CONCURRENT_BRANCHES else None
+
+        # 요청마다 만들던 중간 이미지(원재료 검출용 RGB 프레임, 텍스트 검출기용 RGB crop)를 재사용하는 버퍼 풀 (0이면 사용 안 함)
+        self.__buffer_pool = BufferPool(max_bytes=int(BUFFER_POOL_MB * 1024 * 1024)) if BUFFER_POOL_MB > 0 else None
+        self.__miit.set_buffer_pool(self.__buffer_pool)
+
+        # 인식 전에 crop의 글자 줄 높이 / 기울기 / 대비를 맞추고 긴 줄을 나누는 단계 (CropNormalizer 생성 옵션 dict, None이면 crop을 그대로 인식)
+        self.__normalizer = CropNormalizer(**CROP_NORMALIZATION) if CROP_NORMALIZATION is not None else None
+
+        # 2단계 검출: 축소 프레임에서 라벨 영역을 먼저 찾고, 두 YOLO는 그 영역에서만 검출 (LabelRegionFinder 생성 옵션 dict, None이면 프레임 전체)
+        self.__region_finder = LabelRegionFinder(**CASCADE) if CASCADE is not None else None
+
+        self.__nutrition_batcher = None
+        self.__material_batcher = None
+
+        self.__frozen = False # freeze() 이후에는 torch.inference_mode에서 추론
+
+        self.__load_ms = {} # 모델별 로드 시간 (load_models)
+        self.__warmup_ms = {} # 모델별 워밍업 시간 (warmup)
 
     def load_nutrition_yolo(self):
-        self.__niit.load_yolo("MaterialAndNutritionOCR/nutrition_yolo.pt")
+        self.__niit.load_yolo("MaterialAndNutritionOCR/nutrition_yolo.pt", self.__yolo_backend, self.__yolo_int8)
 
     def load_material_yolo(self):
-        self.__miit.load_yolo("MaterialAndNutritionOCR/material_yolo.pt")
+        self.__miit.load_yolo("MaterialAndNutritionOCR/material_yolo.pt", self.__yolo_backend, self.__yolo_int8)
 
     def load_easyocr(self):
         # 2️⃣ EasyOCR 불러오기
-        self.__easy_ocr = easyocr.Reader(['ko', 'en'])
+        self.__easy_ocr = load_reader(['ko', 'en'], self.__recognizer_quantization)
+        self.__recognizer = EasyOCRBatchRecognizer(self.__easy_ocr, buffer_pool=self.__buffer_pool, normalizer=self.__normalizer)
 
         self.__niit.set_easyocr(self.__easy_ocr)
         self.__miit.set_easyocr(self.__easy_ocr)
-        
+
+    def load_models(self, parallel: bool = True) -> dict:
+        """
+        영양성분 YOLO / 원재료 YOLO / EasyOCR를 로드하고 모델별 로드 시간(ms)을 기록
+
+        Args:
+            parallel (bool): True이면 세 모델을 스레드에서 동시에 로드 (가중치 파일 읽기 / 역직렬화가 겹쳐서 진행됨)
+        """
+        loaders = {
+            "nutrition_yolo": self.load_nutrition_yolo,
+            "material_yolo": self.load_material_yolo,
+            "easyocr": self.load_easyocr
+        }
+
+        def timed(load):
+            started = time.perf_counter()
+            load()
+            return (time.perf_counter() - started) * 1000
+
+        if parallel:
+            with ThreadPoolExecutor(max_workers=len(loaders), thread_name_prefix="model-load") as executor:
+                futures = {name: executor.submit(timed, load) for name, load in loaders.items()}
+                self.__load_ms = {name: future.result() for name, future in futures.items()}
+        else:
+            self.__load_ms = {name: timed(load) for name, load in loaders.items()}
+
+        return self.__load_ms
+
+    def warmup(self) -> dict:
+        """
+        가상 라벨 이미지로 각 모델을 한 번씩 실행하여 첫 요청의 지연(메모리 할당, 커널 초기화 등)을 미리 치름
+        가상 라벨에서는 YOLO가 아무것도 찾지 못할 수 있으므로, 인식기는 글자 줄 crop으로 따로 실행함
+
+        Returns:
+            dict: 모델별 워밍업 시간(ms)
+        """
+        image, line_crops = _synthetic_label()
+
+        def timed(run):
+            started = time.perf_counter()
+            run()
+            return (time.perf_counter() - started) * 1000
+
+        self.__warmup_ms = {
+            "nutrition_yolo": timed(lambda: self.__niit.detect_crops(image)),
+            "material_yolo": timed(lambda: self.__miit.detect_crops(image)),
+            "easyocr": timed(lambda: self.__recognizer.recognize(line_crops) if self.__recognition_only else self.__recognizer.readtext(line_crops))
+        }
+
+        return self.__warmup_ms
+
+    def freeze(self):
+        """
+        워커를 fork하기 전에 모든 torch 모델을 추론 전용(eval, requires_grad=False)으로 고정하고,
+        이후 인식(EasyOCR)은 torch.inference_mode에서 실행
+        (ONNX 백엔드 YOLO는 torch 모델이 아니므로 건너뜀)
+        """
+        freeze_torch_modules(
+            self.__torch_detector(self.__niit.get_yolo()),
+            self.__torch_detector(self.__miit.get_yolo()),
+            self.__easy_ocr.detector,
+            self.__easy_ocr.recognizer
+        )
+        self.__frozen = True
+
+    @staticmethod
+    def __torch_detector(detector):
+        """
+        YOLO 검출기 안의 torch 모듈 (torch 모델이 아니면 None)
+
+        ultralytics YOLO 래퍼는 nn.Module이지만 train()을 학습 진입점으로 덮어쓰므로,
+        래퍼에 eval()을 부르면 학습이 시작됨 -> 안쪽의 DetectionModel(yolo.model)을 고정해야 함
+        """
+        if isinstance(detector, DetectionBatcher):
+            detector = detector.detector
+
+        if detector is None or isinstance(detector, OnnxYoloDetector):
+            return None
+
+        return getattr(detector, "model", None)
+
+    def __inference(self):
+        """
+        freeze() 이후의 추론 컨텍스트 (autograd 기록 / 텐서 버전 카운터 갱신이 없어 공유 가중치 페이지에 쓰지 않음)
+        inference_mode는 스레드별 설정이므로 인식(EasyOCR)을 실행하는 스레드에서 호출마다 켜고,
+        다른 스레드에서 도는 YOLO 검출은 ultralytics가 predict 안에서 직접 inference_mode를 켬
+        """
+        if not self.__frozen:
+            return contextlib.nullcontext()
+
+        import torch
+        return torch.inference_mode()
+
+    def startup_stats(self) -> dict:
+        """load_models() / warmup()에서 기록한 모델별 로드 / 워밍업 시간(ms)"""
+        return {"load_ms": self.__load_ms, "warmup_ms": self.__warmup_ms}
+
+    def enable_detection_batching(self, window_ms: float = 10.0, max_batch: int = 8):
+        """
+        여러 스레드에서 동시에 들어온 요청의 YOLO 검출을 모델별로 묶어서 한 번에 실행하도록 설정
+        (YOLO를 로드한 뒤에 호출해야 함)
+        """
+        self.__nutrition_batcher = DetectionBatcher(self.__niit.get_yolo(), window_ms, max_batch, name="nutrition")
+        self.__material_batcher = DetectionBatcher(self.__miit.get_yolo(), window_ms, max_batch, name="material")
+
+        self.__niit.set_yolo(self.__nutrition_batcher)
+        self.__miit.set_yolo(self.__material_batcher)
+
+    def detection_stats(self) -> dict:
+        """검출 배치 스케줄러의 배치 크기 / 대기 시간 히스토그램"""
+        if self.__nutrition_batcher is None:
+            return {}
+
+        return {
+            "nutrition": self.__nutrition_batcher.stats(),
+            "material": self.__material_batcher.stats()
+        }
+
+    def pruning_stats(self) -> dict:
+        """crop pruning으로 걸러낸 박스 수 (= 아낀 OCR 호출 수)"""
+        if self.__nutrition_pruner is None:
+            return {}
+
+        return {
+            "nutrition": self.__nutrition_pruner.stats(),
+            "material": self.__material_pruner.stats()
+        }
+
+    def normalization_stats(self) -> dict:
+        """crop 정규화에서 크기를 바꾸거나 기울기를 보정한 crop 수, 나눈 줄 / 조각 수"""
+        if self.__normalizer is None:
+            return {}
+
+        return self.__normalizer.stats()
+
+    def cascade_stats(self) -> dict:
+        """라벨 영역을 찾은 / 못 찾은 프레임 수와 YOLO가 본 면적의 평균 비율"""
+        if self.__region_finder is None:
+            return {}
+
+        return self.__region_finder.stats()
+
+    def early_stop_stats(self) -> dict:
+        """영양성분 조기 종료로 인식하지 않고 건너뛴 crop 수"""
+        if not self.__early_stop:
+            return {}
+
+        return self.__niit.early_stop_stats()
+
     class str_or_ndarray:
         pass
 
-    def execute(self, image:str_or_ndarray):
+    def detect_crops(self, image, detect_image=None):
+        """
+        영양성분 / 원재료 YOLO로 텍스트 영역을 검출하여 crop만 반환 (OCR은 하지 않음)
+
+        Returns:
+            tuple[list, list]: (영양성분 crop 리스트, 원재료 crop 리스트)
+        """
+        return self.__niit.detect_crops(image, detect_image), self.__miit.detect_crops(image, detect_image)
+
+    def execute(self, image:str_or_ndarray, detect_image=None, branches=BRANCHES):
+        """
+        Args:
+            image: 이미지 경로 또는 OCR crop에 사용할 BGR 이미지
+            detect_image: YOLO 검출에 사용할 축소 BGR 이미지 (ImageIngest 참고), None이면 image에서 검출
+            branches: 실행할 분석 분기 (BRANCHES의 부분집합). 빠진 분기는 YOLO 검출과 OCR을 모두 건너뛰고
+                      영양성분은 {}, 원재료는 []를 반환
+        """
         # 이미지의 경로를 cv2로 읽어들여 numpy로 변환함
         img = image
-        
+
         if(type(img) == str):
             img = cv2.imread(img)
 
-        nutrition_result, _ = self.__niit.execute(img)
-        material_result = self.__miit.execute(img)
+        if "nutrition" not in branches and "material" not in branches:
+            return {}, []
+
+        (nutrition_crops, nutrition_allowlists, nutrition_order, nutrition_boxes), material_crops = self.__detect(img, detect_image, branches)
+
+        # 영양성분 분기를 건너뛰면 원재료 crop만 인식
+        if "nutrition" not in branches:
+            return {}, self.__miit.parse_ocr_result(self.__recognize([], [], material_crops))
+
+        # 원재료 crop은 알레르기 성분을 빠짐없이 찾아야 하므로 모두 인식하고,
+        # 영양성분 crop은 조기 종료가 켜져 있으면 모든 항목이 확정될 때까지만 나눠서 인식함.
+        # 원재료 crop은 영양성분의 첫 번째 인식 호출에 함께 넣어서 하나의 배치로 인식
+        # (수치 crop은 숫자 / 단위 문자로만, 나머지는 한글 + 영문 전체 문자로 디코딩)
+        material_results = None
+
+        def recognize(crops, allowlists):
+            nonlocal material_results
+
+            if material_results is None:
+                results = self.__recognize(crops, allowlists, material_crops)
+                material_results = results[len(crops):]
+                return results[:len(crops)]
+
+            return self.__recognize(crops, allowlists)
+
+        nutrition_result, _ = self.__niit.recognize_until_resolved(nutrition_crops, nutrition_allowlists, nutrition_order, recognize, nutrition_boxes)
+
+        # 영양성분 crop이 없어서 인식 호출이 없었던 경우
+        if material_results is None:
+            material_results = self.__recognize([], [], material_crops)
+
+        material_result = self.__miit.parse_ocr_result(material_results) if "material" in branches else []
+
+        return nutrition_result, material_result
+
+    def execute_batch(self, images: list, detect_images: list = None, branches=BRANCHES) -> list:
+        """
+        여러 이미지를 한 번에 OCR (/api/ocr/batch)
+
+        - 검출: 검출 배치가 켜져 있으면(enable_detection_batching) 이미지마다 스레드에서 검출하여 DetectionBatcher가 여러 이미지를 한 배치로 묶음
+        - 인식: 모든 이미지의 영양성분 / 원재료 crop을 한 번의 배치 인식으로 처리 (폭이 비슷한 라인이 많이 모여 패딩 배치가 꽉 참)
+        - 조기 종료가 켜져 있으면 영양성분 crop을 이미지마다 나눠서 인식해야 하므로 이미지별로 execute()를 실행
+
+        Args:
+            images (list): OCR crop에 사용할 BGR 이미지 리스트
+            detect_images (list): 이미지별 YOLO 검출용 축소 BGR 이미지 (None이면 images에서 검출)
+            branches: 실행할 분석 분기 (execute 참고)
+
+        Returns:
+            list: 이미지별 execute()와 같은 (nutrition_result, material_result), 처리 중 오류가 난 이미지는 그 예외 객체
+        """
+        if detect_images is None:
+            detect_images = [None] * len(images)
+
+        if self.__early_stop:
+            return [_try(self.execute, image, detect_image, branches) for image, detect_image in zip(images, detect_images)]
+
+        if self.__nutrition_batcher is not None and len(images) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(images), 8), thread_name_prefix="batch-detect") as executor:
+                detections = list(executor.map(lambda pair: _try(self.__detect, pair[0], pair[1], branches), zip(images, detect_images)))
+        else:
+            detections = [_try(self.__detect, image, detect_image, branches) for image, detect_image in zip(images, detect_images)]
+
+        # 검출에 성공한 이미지들의 crop을 이어 붙여서 한 번에 인식
+        detected = [detection for detection in detections if not isinstance(detection, Exception)]
+        nutrition_crops = [crop for (crops, _, _, _), _ in detected for crop in crops]
+        nutrition_allowlists = [allowlist for (_, allowlists, _, _), _ in detected for allowlist in allowlists]
+        material_crops = [crop for _, crops in detected for crop in crops]
+
+        try:
+            results = self.__recognize(nutrition_crops, nutrition_allowlists, material_crops)
+        except Exception as e:
+            return [detection if isinstance(detection, Exception) else e for detection in detections]
+
+        nutrition_results, material_results = results[:len(nutrition_crops)], results[len(nutrition_crops):]
+
+        outputs = []
+        nutrition_start, material_start = 0, 0
+        for detection in detections:
+            if isinstance(detection, Exception):
+                outputs.append(detection)
+                continue
+
+            (crops, _, _, boxes), image_material_crops = detection
+            image_nutrition_results = nutrition_results[nutrition_start:nutrition_start + len(crops)]
+            image_material_results = material_results[material_start:material_start + len(image_material_crops)]
+            nutrition_start += len(crops)
+            material_start += len(image_material_crops)
+
+            outputs.append(_try(lambda: (
+                self.__niit.parse_ocr_result(image_nutrition_results, boxes)[0] if "nutrition" in branches else {},
+                self.__miit.parse_ocr_result(image_material_results) if "material" in branches else []
+            )))
+
+        return outputs
+
+    def __detect(self, image: np.ndarray, detect_image: np.ndarray, branches) -> tuple:
+        """
+        branches에 있는 분기의 YOLO 검출 (CASCADE가 켜져 있으면 라벨 영역에서만)
+
+        Returns:
+            tuple: (영양성분 detect_routed_crops() 결과 - 분기가 없으면 빈 결과, 원재료 crop 리스트)
+        """
+        # 라벨 영역만 잘라서 검출 (crop은 image의 view이고, 영양성분 표 파싱은 박스 사이의 상대 위치만 사용하므로 좌표를 되돌릴 필요 없음)
+        image, detect_image = self.__label_region(image, detect_image)
+
+        if "nutrition" not in branches:
+            material_crops = self.__miit.detect_crops(image, detect_image) if "material" in branches else []
+            return ([], [], [], np.zeros((0, 4), dtype=np.float32)), material_crops
+
+        # 두 분기의 검출은 같은 (축소) 프레임을 사용하므로, 동시 실행 모드에서는 원재료 검출을 다른 스레드에서 함께 실행
+        material_future = None
+        if "material" in branches and self.__branch_executor is not None:
+            material_future = self.__branch_executor.submit(self.__miit.detect_crops, image, detect_image)
+
+        nutrition = self.__niit.detect_routed_crops(image, detect_image)
+
+        if material_future is not None:
+            material_crops = material_future.result()
+        elif "material" in branches:
+            material_crops = self.__miit.detect_crops(image, detect_image)
+        else:
+            material_crops = []
+
+        return nutrition, material_crops
+
+    def __label_region(self, image: np.ndarray, detect_image: np.ndarray = None) -> tuple:
+        """
+        CASCADE가 켜져 있으면 축소 프레임에서 라벨 영역을 찾아 (영역의 OCR용 view, 영역의 검출용 프레임)을 반환
+
+        영역의 검출용 프레임은 전체 검출용 프레임과 같은 긴 변 크기까지만 줄이므로,
+        YOLO는 같은 입력 크기로 라벨 부분을 더 높은 해상도로 보고, 타일 검출도 영역 안에서만 한다.
+        영역을 찾지 못하면 입력을 그대로 반환 (프레임 전체 검출)
+        """
+        if self.__region_finder is None:
+            return image, detect_image
+
+        frame = detect_image if detect_image is not None else image
+        region = self.__region_finder.find(frame)
+        if region is None:
+            return image, detect_image
+
+        x1, y1, x2, y2 = scale_boxes(np.array([region], dtype=np.float32), frame.shape, image.shape)[0]
+        roi = image[int(y1):int(np.ceil(y2)), int(x1):int(np.ceil(x2))]
+
+        # ImageIngest와 같은 기준: 검출 크기의 2배 이상일 때만 축소
+        detect_size = max(frame.shape[:2])
+        long_side = max(roi.shape[:2])
+        if long_side < detect_size * 2:
+            return roi, None
+
+        ratio = detect_size / long_side
+        size = (max(1, round(roi.shape[1] * ratio)), max(1, round(roi.shape[0] * ratio)))
+        return roi, cv2.resize(roi, size, interpolation=cv2.INTER_AREA)
+
+    def __recognize(self, nutrition_crops: list, allowlists: list, material_crops: list = ()) -> list:
+        """
+        RECOGNITION_ONLY 설정에 따라 검출기 없이 / 검출기를 포함해서 crop들을 하나의 배치로 인식
+
+        원재료 crop은 BGR 프레임의 view이므로 RGB로 인식하도록 swap_rb를 켬 (MaterialImageToText 참고)
+
+        Returns:
+            list: 영양성분 crop들의 결과 뒤에 원재료 crop들의 결과를 이어 붙인 리스트
+        """
+        crops = list(nutrition_crops) + list(material_crops)
+        allowlists = list(allowlists) + [None] * len(material_crops)
+        swap_rb = [False] * len(nutrition_crops) + [True] * len(material_crops)
+
+        with self.__inference():
+            if(self.__recognition_only):
+                return self.__recognizer.recognize(crops, allowlists=allowlists, swap_rb=swap_rb)
+
+            return self.__recognizer.readtext(crops, allowlists, swap_rb)
+
+    def buffer_stats(self) -> dict:
+        """버퍼 풀의 재사용 횟수 / 할당 바이트 / 동시에 사용 중인 바이트의 최대값"""
+        if self.__buffer_pool is None:
+            return {}
 
-        return nutrition_result, material_result
\ No newline at end of file
+        return self.__buffer_pool.stats()
\ No newline at end of file
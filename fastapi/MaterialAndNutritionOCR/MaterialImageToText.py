@@ -1,40 +1,63 @@
-from ultralytics import YOLO # yolo 모델을 사용한 객체 탐지를 하기 위한 import
+from MaterialAndNutritionOCR.YoloBackend import load_detector # 설정된 백엔드(ultralytics / ONNX)로 yolo 모델을 불러오기 위한 import
 import easyocr # easyocr 모델을 사용한 텍스트 추출을 하기 위한 import
+from MaterialAndNutritionOCR.EasyOCRBatchRecognizer import EasyOCRBatchRecognizer # crop들을 한 번에 배치 인식하기 위한 import
+from MaterialAndNutritionOCR.ImageIngest import scale_boxes # 축소 프레임의 검출 좌표를 원본 좌표로 변환하기 위한 import
+from MaterialAndNutritionOCR.Detections import detection_arrays # 백엔드와 상관없이 검출 결과를 numpy로 꺼내기 위한 import
 
 from typing import List
 import cv2
 import numpy as np
 import matplotlib.pyplot as plt
 
-import re # 정규식을 사용하기 위한 import
-from difflib import SequenceMatcher # 문자열의 유사도 비교를 위한 import
+from MaterialAndNutritionOCR.AllergenIndex import AllergenIndex # 원재료 문자열에서 알레르기 유발 성분을 찾기 위한 import
 
 class MaterialImageToText:
     def __init__(self, VISUALIZATION=False):
         self.__visualization = VISUALIZATION
-        self.__allergen_list = ['밀', '우유', '대두', '돼지고기', '쇠고기', '아황산류', '계란', '땅콩']
+        self.__allergen_index = AllergenIndex() # 알레르기 성분 + 동의어 전체를 자모 단위 오토마톤으로 미리 만들어 둠
 
         self.__yolo = None
         self.__easy_ocr = None
+        self.__recognizer = None
 
-    def __yolo_execute(self, image: np.ndarray, toleranceY: int = 10) -> List[np.ndarray]:
+        self.__pruner = None # OCR 전에 박스를 걸러내는 단계 (set_pruner 참고)
+        self.__buffer_pool = None # 검출용 RGB 프레임을 재사용할 버퍼 풀 (set_buffer_pool 참고)
+
+    def __yolo_execute(self, image: np.ndarray, toleranceY: int = 10, detect_image: np.ndarray = None) -> List[np.ndarray]:
         """
         YOLO를 사용하여 이미지에서 객체를 감지하고, 감지된 영역을 crop하여 리스트로 반환
         
         Parameters:
-            image (str): 이미지 파일 경로
-            visualization_mode (bool): True이면 crop된 이미지들을 시각화
+            image (np.ndarray): crop할 BGR 이미지
             toleranceY (int): y좌표 정렬 시 허용 오차 범위
+            detect_image (np.ndarray): YOLO 검출에 사용할 (축소된) BGR 이미지, None이면 image 사용
         
         Returns:
-            List[np.ndarray]: crop된 이미지 리스트
+            List[np.ndarray]: image(BGR)를 복사하지 않은 crop view 리스트
+                              (EasyOCRBatchRecognizer에 swap_rb=True로 넘기면 기존의 RGB crop과 같게 인식됨)
         """
-        # 1)
-        img_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
-        # 2) YOLO 실행
-        results = self.__yolo(img_rgb)[0]
-        boxes = results.boxes.xyxy.cpu().numpy()  # (N,4) numpy array: x1,y1,x2,y2
+        if detect_image is None:
+            detect_image = image
+
+        # 1) 검출용 프레임만 RGB로 변환 (원본 크기의 RGB 복사본은 만들지 않음, 버퍼 풀이 있으면 풀의 버퍼에 변환)
+        if self.__buffer_pool is not None:
+            detect_rgb = cv2.cvtColor(detect_image, cv2.COLOR_BGR2RGB, dst=self.__buffer_pool.acquire(detect_image.shape, detect_image.dtype))
+        else:
+            detect_rgb = cv2.cvtColor(detect_image, cv2.COLOR_BGR2RGB)
+
+        # 2) YOLO 실행 후 박스 좌표를 원본 크기로 변환
+        try:
+            results = self.__yolo(detect_rgb)[0]
+            boxes, conf, cls = detection_arrays(results)
+            boxes = scale_boxes(boxes, detect_rgb.shape, image.shape)  # (N,4) numpy array: x1,y1,x2,y2
+        finally:
+            if self.__buffer_pool is not None:
+                self.__buffer_pool.release(detect_rgb)
+            del detect_rgb
+
+        # 신뢰도가 낮거나, 겹치거나, 너무 작은 박스는 OCR하지 않음
+        if self.__pruner is not None:
+            boxes = boxes[self.__pruner.prune(boxes, conf, cls)]
 
         # 3) 좌표 정렬 (y좌표 우선, x좌표 다음)
         def sort_key(box):
@@ -44,17 +67,17 @@ class MaterialImageToText:
         
         boxes_sorted = sorted(boxes, key=sort_key)
 
-        # 4) crop
+        # 4) crop (복사 없이 BGR 프레임의 view로 만들고, RGB 변환은 인식기에서 필요한 경우에만 수행)
         cropped_list = []
         for box in boxes_sorted:
             x1, y1, x2, y2 = map(int, box)
-            crop_img = img_rgb[y1:y2, x1:x2]
+            crop_img = image[y1:y2, x1:x2]
             cropped_list.append(crop_img)
 
         # 5) visualization
         if self.__visualization and cropped_list:
         # 모든 crop 이미지를 10x10으로 resize
-            resized_crops = [cv2.resize(c, (200, 50)) for c in cropped_list]
+            resized_crops = [cv2.cvtColor(cv2.resize(c, (200, 50)), cv2.COLOR_BGR2RGB) for c in cropped_list if c.size > 0]
             
             # matplotlib으로 20개씩 줄바꿈하여 시각화
             num_per_row = 5
@@ -74,90 +97,81 @@ class MaterialImageToText:
 
         # easyocr execute
 
-    def __easyocr_execute(self, images: list[np.ndarray]) -> list[str]:
+    def __easyocr_execute(self, images: list[np.ndarray]) -> list[list[tuple[str, float]]]:
         """
         EasyOCR 모델을 사용하여 여러 이미지에서 텍스트를 추출합니다.
+        모든 이미지는 EasyOCRBatchRecognizer를 통해 하나의 배치로 인식됩니다.
         
         Args:
-            images (list): 이미지 객체들이 들어있는 리스트(OpenCV 이미지, PIL 이미지 등)
+            images (list): crop된 이미지(np.ndarray)들이 들어있는 리스트
         
         Returns:
-            list[str]: 각 이미지에서 추출한 텍스트 리스트
+            list[list[tuple[str, float]]]: 각 이미지에서 추출한 [(text, confidence), ...] 리스트
         """
-        results = []
-        
-        for img in images:
-            # easy_ocr 모델을 사용하여 텍스트 추출
-            ocr_result = self.__easy_ocr.readtext(img, detail=0)  # detail=0 -> 텍스트만 반환
-            # 추출된 텍스트를 하나의 문자열로 합치거나 리스트 그대로 추가 가능
-            results.append(" ".join(ocr_result))  # 여러 줄이면 공백으로 연결
-        
-        return results
+        return self.__recognizer.readtext(images, swap_rb=[True] * len(images))
 
-    def __decompose_hangul(self, s: str) -> str:
-        """
-        문자열 내 한글을 초성/중성/종성 단위로 분해하여 반환.
-        예: "열량" -> "ㅇㅕㄹㄹㅑㅇ"
-        """
-        CHO = ["ㄱ","ㄲ","ㄴ","ㄷ","ㄸ","ㄹ","ㅁ","ㅂ","ㅃ","ㅅ","ㅆ","ㅇ",
-                "ㅈ","ㅉ","ㅊ","ㅋ","ㅌ","ㅍ","ㅎ"]
-        JUNG = ["ㅏ","ㅐ","ㅑ","ㅒ","ㅓ","ㅔ","ㅕ","ㅖ","ㅗ","ㅘ","ㅙ","ㅚ",
-                    "ㅛ","ㅜ","ㅝ","ㅞ","ㅟ","ㅠ","ㅡ","ㅢ","ㅣ"]
-        JONG = ["","ㄱ","ㄲ","ㄳ","ㄴ","ㄵ","ㄶ","ㄷ","ㄹ","ㄺ","ㄻ","ㄼ","ㄽ","ㄾ","ㄿ",
-                    "ㅀ","ㅁ","ㅂ","ㅄ","ㅅ","ㅆ","ㅇ","ㅈ","ㅊ","ㅋ","ㅌ","ㅍ","ㅎ"]
+    def load_yolo(self, yolo_model_path:str, backend:str = "ultralytics", int8:bool = False):
+        # 1️⃣ YOLO 모델 불러오기
+        self.__yolo = load_detector(yolo_model_path, backend, int8)
+    def set_yolo(self, yolo_model):
+        self.__yolo = yolo_model
+    def get_yolo(self):
+        return self.__yolo
 
-        result = []
+    def set_pruner(self, pruner):
+        """검출과 OCR 사이에서 박스를 걸러낼 CropPruner 설정 (None이면 모든 박스를 OCR)"""
+        self.__pruner = pruner
 
-        for ch in s:
-            code = ord(ch)
+    def set_buffer_pool(self, buffer_pool):
+        """검출용 RGB 프레임을 만들 때 사용할 BufferPool 설정 (None이면 매번 새로 할당)"""
+        self.__buffer_pool = buffer_pool
 
-            # 한글 범위 (가~힣)
-            if 0xAC00 <= code <= 0xD7A3:
-                base = code - 0xAC00
-                cho = base // 588
-                jung = (base % 588) // 28
-                jong = base % 28
+    def load_easyocr(self):
+        # 2️⃣ EasyOCR 불러오기
+        self.set_easyocr(easyocr.Reader(['ko', 'en']))
+    def set_easyocr(self, easy_ocr):
+        self.__easy_ocr = easy_ocr
+        self.__recognizer = EasyOCRBatchRecognizer(easy_ocr)
 
-                result.append(CHO[cho])
-                result.append(JUNG[jung])
-                if JONG[jong] != "":
-                    result.append(JONG[jong])
+    class str_or_ndarray: # 타입 힌트용
+        pass
 
-            else:
-                # 한글이 아니면 그대로 추가
-                result.append(ch)
+    def detect_crops(self, image: np.ndarray, detect_image: np.ndarray = None) -> list[np.ndarray]:
+        """
+        YOLO로 원재료 텍스트 영역을 검출하고, 읽는 순서대로 crop하여 리스트로 반환
+        detect_image(축소 프레임)가 주어지면 그 프레임에서 검출하고, 박스 좌표를 image 크기로 변환하여 crop함
+        """
+        return self.__yolo_execute(image, detect_image=detect_image)
 
-        return "".join(result)
+    def parse_ocr_result(self, ocr_results: list[list[tuple[str, float]]]) -> list[str]:
+        """
+        crop별 OCR 결과에서 알레르기 유발 성분을 찾아 반환
+        "밀가루, 설탕, 우유..."처럼 여러 원재료가 이어진 문자열에서도 성분마다 찾아냄
 
-    def __similar(self, a: str, b: str) -> float:
-        """두 문자열의 유사도 계산 (0~1)"""
+        Args:
+            ocr_results (list): crop 인덱스별 [(text, confidence), ...] 리스트 (EasyOCRBatchRecognizer.readtext의 결과)
 
-        cleaned_a = re.sub(r"[0-9A-Za-z]", "", a)
-        cleaned_b = re.sub(r"[0-9A-Za-z]", "", b)
+        Returns:
+            list[str]: 찾은 알레르기 유발 성분 (처음 나온 순서, 중복 없음)
+        """
+        result = []
 
-        decomposed_a = self.__decompose_hangul(cleaned_a)
-        decomposed_b = self.__decompose_hangul(cleaned_b)
+        # 여러 줄이면 공백으로 연결하여 crop 하나당 하나의 문자열로 합침
+        easyocr_result = [" ".join(text for text, _ in ocr_result) for ocr_result in ocr_results]
 
-        return SequenceMatcher(None, decomposed_a, decomposed_b).ratio()
-    
-    def load_yolo(self, yolo_model_path:str):
-        # 1️⃣ YOLO 모델 불러오기
-        self.__yolo = YOLO(yolo_model_path)
-    def set_yolo(self, yolo_model):
-        self.__yolo = yolo_model
+        for r in easyocr_result:
+            hits = self.__allergen_index.find(r)
 
-    def load_easyocr(self):
-        # 2️⃣ EasyOCR 불러오기
-        self.__easy_ocr = easyocr.Reader(['ko', 'en'])
-    def set_easyocr(self, easy_ocr):
-        self.__easy_ocr = easy_ocr
+            if(self.__visualization):
+                print(f"\"{r}\" 알레르기 성분 검출 결과 : {hits}")
 
-    class str_or_ndarray: # 타입 힌트용
-        pass
+            for hit in hits:
+                if hit.allergen not in result:
+                    result += [hit.allergen]
+
+        return result
 
     def execute(self, image:str_or_ndarray) -> list[str]:
-        result = []
-        
         # 이미지의 경로를 cv2로 읽어들여 numpy로 변환함
         img = image
         
@@ -166,12 +180,5 @@ class MaterialImageToText:
         
         yolo_result = self.__yolo_execute(img)
         easyocr_result = self.__easyocr_execute(yolo_result)
-        
-        for r in easyocr_result:
-            for allergen in self.__allergen_list:
-                similar_ratio = self.__similar(r, allergen)
-
-                if(similar_ratio > 0.8):
-                    result += [allergen]
 
-        return result
\ No newline at end of file
+        return self.parse_ocr_result(easyocr_result)
\ No newline at end of file
@@ -1,81 +1,141 @@
-from ultralytics import YOLO # yolo 모델을 사용한 객체 탐지를 하기 위한 import
+from MaterialAndNutritionOCR.YoloBackend import load_detector # 설정된 백엔드(ultralytics / ONNX)로 yolo 모델을 불러오기 위한 import
 import easyocr # easyocr 모델을 사용한 텍스트 추출을 하기 위한 import
+from MaterialAndNutritionOCR.EasyOCRBatchRecognizer import EasyOCRBatchRecognizer # crop들을 한 번에 배치 인식하기 위한 import
+from MaterialAndNutritionOCR.ImageIngest import scale_boxes # 축소 프레임의 검출 좌표를 원본 좌표로 변환하기 위한 import
+from MaterialAndNutritionOCR.Detections import detection_arrays, merge_overlapping # 백엔드와 상관없이 검출 결과를 numpy로 꺼내기 위한 import
 
 import re # 정규식을 사용하기 위한 import
+import threading # 조기 종료 통계를 여러 스레드에서 갱신하기 위한 import
 import numpy as np # 이미지를 넘파이 배열로 변환을 하기 위한 import
-from difflib import SequenceMatcher # 문자열의 유사도 비교를 위한 import
+from MaterialAndNutritionOCR.HangulSimilarity import JamoPattern, jamo_key # 자모 단위 문자열 유사도 비교를 위한 import
 
 import cv2 # OCR클래스의 DEV_MODE가 True일때의 시각화를 위한 import
 import matplotlib.pyplot as plt # OCR클래스의 DEV_MODE가 True일때의 시각화를 위한 import
 
+# 수치 crop("350mg", "12g", "18%", "250kcal" 등)을 디코딩할 때 허용할 문자 (숫자 + 단위 + 문장부호)
+# 영문 O / o가 없으므로 인식기가 0을 O로 읽을 수 없음
+VALUE_ALLOWLIST = "0123456789.,%()/ mgkcalKCAL"
+
 class NutritionImageToText:
-    def __init__(self, VISUALIZATION = False):
+    def __init__(self, VISUALIZATION = False, LAYOUT_PARSER = True):
         self.__yolo = None
         self.__easy_ocr = None
+        self.__recognizer = None
 
         self.__visualization = VISUALIZATION
         self.__match_ratio_deadline = 0.7 # 패턴 매칭시 유사도가 이 수치 보다 낮은 녀석의 경우 버림
 
-    def load_yolo(self, yolo_model_path:str):
+        # 패턴 정의 (키워드는 자모 분해 / 비트 마스크를 미리 계산해 둠)
+        self.__patterns = {
+            "총내용량": ["총내용량"],
+            # "기준내용량"은 따로 정규식을 사용하여 처리 ex) "100ml당", "50g당"
+            # "kcal"는 따로 정규식을 사용하여 처리 ex) "300kcal", "600kcal"
+            "나트륨": ["나트륨", "나르룹"],
+            "탄수화물": ["탄수화물"],
+            "당류": ["당류"],
+            "지방": ["지방"],
+            "트랜스지방": ["트랜스지방"],
+            "포화지방": ["포화지방"],
+            "콜레스테롤": ["콜레스테롤"],
+            "단백질": ["단백질"]
+        }
+        for category, keywords in self.__patterns.items():
+            self.__patterns[category] = [JamoPattern(kw) for kw in keywords]
+
+        # 라벨 셀 검색용 키워드 색인: 자모 키 -> 항목 (완전 일치는 유사도 계산 없이 바로 찾음)
+        self.__keyword_index = {pattern.key: category for category, patterns in self.__patterns.items() for pattern in patterns}
+
+        # True이면 박스 위치로 표의 행을 나눠서 라벨 셀과 수치 셀을 짝지음 (__parse_layout 참고)
+        # False이거나 박스 정보가 없으면 crop 문자열마다 모든 키워드와 비교하는 기존 방식 사용
+        self.__layout_parser = LAYOUT_PARSER
+
+        # 타일 검출 설정 (enable_tiling 참고, None이면 프레임 전체에서 한 번만 검출)
+        self.__tile_size = None
+        self.__tile_overlap = 0.2
+        self.__tile_min_pixels = 0
+
+        self.__pruner = None # OCR 전에 박스를 걸러내는 단계 (set_pruner 참고)
+
+        self.__value_classes = set() # 수치만 담긴 crop으로 보고 VALUE_ALLOWLIST로 디코딩할 YOLO 클래스 번호 (set_value_classes 참고)
+
+        # 조기 종료 설정 (enable_early_stop 참고, None이면 모든 crop을 한 번에 인식)
+        self.__early_stop = None
+        self.__early_stop_lock = threading.Lock()
+        self.__early_stop_counts = {"images": 0, "stopped": 0, "crops": 0, "crops_skipped": 0}
+
+    def load_yolo(self, yolo_model_path:str, backend:str = "ultralytics", int8:bool = False):
         # 1️⃣ YOLO 모델 불러오기
-        self.__yolo = YOLO(yolo_model_path)
+        self.__yolo = load_detector(yolo_model_path, backend, int8)
     def set_yolo(self, yolo_model):
         self.__yolo = yolo_model
+    def get_yolo(self):
+        return self.__yolo
 
-    def load_easyocr(self):
-        # 2️⃣ EasyOCR 불러오기
-        self.__easy_ocr = easyocr.Reader(['ko', 'en'])
-    def set_easyocr(self, easy_ocr):
-            self.__easy_ocr = easy_ocr
-            
-    def __decompose_hangul(self, s: str) -> str:
+    def enable_tiling(self, tile_size: int = 640, overlap: float = 0.2, min_megapixels: float = 8.0):
         """
-        문자열 내 한글을 초성/중성/종성 단위로 분해하여 반환.
-        예: "열량" -> "ㅇㅕㄹㄹㅑㅇ"
+        고해상도 이미지에서 영양성분 표의 작은 글자 줄을 놓치지 않도록 타일(슬라이스) 검출을 사용
+
+        Args:
+            tile_size (int): 원본 해상도 기준 타일 한 변의 크기 (px)
+            overlap (float): 이웃한 타일끼리 겹치는 비율 (타일 경계에 걸친 줄도 한 타일 안에 온전히 들어가도록)
+            min_megapixels (float): 원본이 이 크기(메가픽셀) 이상일 때만 타일 검출을 사용
         """
-        CHO = ["ㄱ","ㄲ","ㄴ","ㄷ","ㄸ","ㄹ","ㅁ","ㅂ","ㅃ","ㅅ","ㅆ","ㅇ",
-            "ㅈ","ㅉ","ㅊ","ㅋ","ㅌ","ㅍ","ㅎ"]
-        JUNG = ["ㅏ","ㅐ","ㅑ","ㅒ","ㅓ","ㅔ","ㅕ","ㅖ","ㅗ","ㅘ","ㅙ","ㅚ",
-                "ㅛ","ㅜ","ㅝ","ㅞ","ㅟ","ㅠ","ㅡ","ㅢ","ㅣ"]
-        JONG = ["","ㄱ","ㄲ","ㄳ","ㄴ","ㄵ","ㄶ","ㄷ","ㄹ","ㄺ","ㄻ","ㄼ","ㄽ","ㄾ","ㄿ",
-                "ㅀ","ㅁ","ㅂ","ㅄ","ㅅ","ㅆ","ㅇ","ㅈ","ㅊ","ㅋ","ㅌ","ㅍ","ㅎ"]
-
-        result = []
-
-        for ch in s:
-            code = ord(ch)
-
-            # 한글 범위 (가~힣)
-            if 0xAC00 <= code <= 0xD7A3:
-                base = code - 0xAC00
-                cho = base // 588
-                jung = (base % 588) // 28
-                jong = base % 28
-
-                result.append(CHO[cho])
-                result.append(JUNG[jung])
-                if JONG[jong] != "":
-                    result.append(JONG[jong])
+        self.__tile_size = tile_size
+        self.__tile_overlap = overlap
+        self.__tile_min_pixels = min_megapixels * 1_000_000
 
-            else:
-                # 한글이 아니면 그대로 추가
-                result.append(ch)
+    def set_pruner(self, pruner):
+        """검출과 OCR 사이에서 박스를 걸러낼 CropPruner 설정 (None이면 모든 박스를 OCR)"""
+        self.__pruner = pruner
 
-        return "".join(result)
+    def set_value_classes(self, classes):
+        """
+        YOLO 클래스 번호로 crop을 인식기 설정에 나눠 보냄
 
-    def __similar(self, a: str, b: str) -> float:
-        """두 문자열의 유사도 계산 (0~1)"""
+        Args:
+            classes: 수치 영역("350mg" 등)을 검출하는 클래스 번호들. 이 클래스의 crop은 VALUE_ALLOWLIST로만 디코딩하고,
+                     나머지(라벨 "나트륨", "당류" 등) crop은 한글 + 영문 전체 문자로 디코딩함
+        """
+        self.__value_classes = set(int(c) for c in classes)
 
-        cleaned_a = re.sub(r"[0-9A-Za-z]", "", a)
-        cleaned_b = re.sub(r"[0-9A-Za-z]", "", b)
+    def enable_early_stop(self, min_confidence: float = 0.6, min_similarity: float = 0.85, chunk_size: int = 4, fields: list[str] = None):
+        """
+        crop을 쓸모 있어 보이는 순서대로 chunk_size개씩 인식하면서 패턴 매칭하고,
+        모든 대상 항목이 기준을 넘으면 남은 crop은 인식하지 않음 (recognize_until_resolved 참고)
+
+        Args:
+            min_confidence (float): 항목을 확정하기 위한 최소 OCR 신뢰도
+            min_similarity (float): 항목을 확정하기 위한 최소 패턴 매칭 유사도
+            chunk_size (int): 한 번에 인식할 crop 수
+            fields (list[str]): 확정되어야 하는 항목 (None이면 kcal, 기준내용량 + 패턴 항목 전체)
+        """
+        self.__early_stop = {
+            "min_confidence": min_confidence,
+            "min_similarity": min_similarity,
+            "chunk_size": max(1, chunk_size),
+            "fields": list(fields) if fields else ["kcal", "기준내용량"] + list(self.__patterns.keys())
+        }
+
+    def early_stop_stats(self) -> dict:
+        """조기 종료한 이미지 수와 인식하지 않고 건너뛴 crop 수"""
+        with self.__early_stop_lock:
+            return dict(self.__early_stop_counts)
 
-        decomposed_a = self.__decompose_hangul(cleaned_a)
-        decomposed_b = self.__decompose_hangul(cleaned_b)
+    def load_easyocr(self):
+        # 2️⃣ EasyOCR 불러오기
+        self.set_easyocr(easyocr.Reader(['ko', 'en']))
+    def set_easyocr(self, easy_ocr):
+        self.__easy_ocr = easy_ocr
+        self.__recognizer = EasyOCRBatchRecognizer(easy_ocr)
+
+    def __similar(self, text_key: str, pattern: JamoPattern) -> float:
+        """jamo_key()로 변환한 OCR 문자열과 미리 분해해 둔 키워드 패턴의 유사도 계산 (0~1)"""
+        similarity = pattern.similarity(text_key)
 
         if(self.__visualization):
-            print(f"패턴 매칭 유사도 결과 -  \"{a}\"와 같은 텍스트 내용이, \"{b}\"에 대한 내용인지에 대한 유사도 = {SequenceMatcher(None, decomposed_a, decomposed_b).ratio()}") # DEV
-        
-        return SequenceMatcher(None, decomposed_a, decomposed_b).ratio()
+            print(f"패턴 매칭 유사도 결과 -  \"{text_key}\"와 같은 텍스트 내용이, \"{pattern.keyword}\"에 대한 내용인지에 대한 유사도 = {similarity}") # DEV
+
+        return similarity
 
     def __extract_first_number(self, text: str):
         """문자열에서 첫 번째 숫자를 추출"""
@@ -86,22 +146,61 @@ class NutritionImageToText:
             return float(match.group())
         return None
 
-    def __image_to_text(self, image: np.ndarray, yolo, easy_ocr) -> dict[str, list]:
+    def detect_crops(self, image: np.ndarray, detect_image: np.ndarray = None) -> list[np.ndarray]:
+        """
+        YOLO로 영양성분 텍스트 영역을 검출하고, 검출된 영역을 crop하여 리스트로 반환
+        detect_image(축소 프레임)가 주어지면 그 프레임에서 검출하고, 박스 좌표를 image 크기로 변환하여 crop함
+        """
+        return self.detect_routed_crops(image, detect_image)[0]
+
+    def detect_routed_crops(self, image: np.ndarray, detect_image: np.ndarray = None) -> tuple[list[np.ndarray], list[str], list[int], np.ndarray]:
+        """
+        detect_crops()와 같이 crop한 뒤, crop별로 인식기에 넘길 허용 문자 목록과 인식 우선순위, 박스 좌표를 함께 반환
+
+        Returns:
+            tuple: (crop 리스트,
+                    crop별 허용 문자 리스트 - 수치 클래스는 VALUE_ALLOWLIST, 나머지는 None(전체 문자),
+                    쓸모 있어 보이는 순서로 정렬한 crop 인덱스 - recognize_until_resolved 참고,
+                    (N, 4) crop별 원본 좌표 x1, y1, x2, y2 - parse_ocr_result의 표 구조 파싱에 사용)
+        """
+        if detect_image is None:
+            detect_image = image
+
         # ------------------------------------------
         # 1) YOLO로 detection 수행
         # ------------------------------------------
-        results = yolo(image)[0]     # result 객체 하나
-        boxes = results.boxes.xyxy   # tensor: (N, 4)
+        if self.__tile_size and image.shape[0] * image.shape[1] >= self.__tile_min_pixels:
+            boxes, conf, cls = self.__detect_tiled(image, detect_image)
+        else:
+            results = self.__yolo(detect_image)[0]     # result 객체 하나
+            boxes, conf, cls = detection_arrays(results)
+            boxes = scale_boxes(boxes, detect_image.shape, image.shape)   # (N, 4) 원본 좌표
+
+        # 신뢰도가 낮거나, 겹치거나, 너무 작은 박스는 OCR하지 않음
+        if self.__pruner is not None:
+            keep = self.__pruner.prune(boxes, conf, cls)
+            boxes, conf, cls = boxes[keep], conf[keep], cls[keep]
 
         cropped_list = []
+        allowlists = []
 
         # ------------------------------------------
         # 2) bounding box 기반 crop 이미지 생성
         # ------------------------------------------
-        for box in boxes:
-            x1, y1, x2, y2 = box.int().tolist()
+        for box, c in zip(boxes, cls):
+            x1, y1, x2, y2 = map(int, box)
             crop = image[y1:y2, x1:x2]
             cropped_list.append(crop)
+            allowlists.append(VALUE_ALLOWLIST if int(c) in self.__value_classes else None)
+
+        # 인식 우선순위: 라벨이 있는 crop(기존 방식에서는 수치만 있는 crop이 혼자서 항목을 확정할 수 없음,
+        #   표 구조 파싱에서는 라벨 셀과 수치 셀이 짝지어져야 확정되므로 수치 crop을 뒤로 미루지 않음)
+        #   -> YOLO 신뢰도가 높은 crop (흐리거나 잘린 줄일수록 낮음, 0.1 단위로 묶음)
+        #   -> 키가 큰 crop (표 본문의 줄, 작은 글씨의 주석은 뒤로) -> 위쪽 crop
+        value_last = not self.__layout_parser
+        order = sorted(range(len(boxes)), key=lambda k: (
+            value_last and allowlists[k] is not None, -round(float(conf[k]), 1), -float(boxes[k][3] - boxes[k][1]), float(boxes[k][1])
+        ))
 
         ##### OCR전 실제로 크롭된 이미지를 확인하기 위한 코드
         if(self.__visualization):
@@ -127,117 +226,378 @@ class NutritionImageToText:
                 plt.tight_layout()
                 plt.show()
 
-        # ------------------------------------------
-        # 3) EasyOCR로 모든 crop 이미지에서 텍스트 추출
-        #    형태: [ [text, confidence], ... ]
-        # ------------------------------------------
-        original_ocr_result = []
+        return cropped_list, allowlists, order, boxes
 
-        for crop in cropped_list:
-            ocr_result = easy_ocr.readtext(crop)
+    def __tile_origins(self, length: int) -> list[int]:
+        """한 축을 tile_size 크기, overlap 비율로 겹치게 나눈 타일 시작 좌표 (마지막 타일은 끝에 맞춤)"""
+        if length <= self.__tile_size:
+            return [0]
 
-            # 현재 crop에서 읽힌 모든 text를 하나로 합침
-            texts = []
-            confs = []
+        step = max(1, int(self.__tile_size * (1 - self.__tile_overlap)))
+        origins = list(range(0, length - self.__tile_size, step))
+        return origins + [length - self.__tile_size]
 
-            for (_, text, conf) in ocr_result:
-                text = text.strip()
-                if text == "":
-                    continue
-                texts.append(text)
-                confs.append(float(conf))
+    def __detect_tiled(self, image: np.ndarray, detect_image: np.ndarray) -> np.ndarray:
+        """
+        원본 해상도의 겹치는 타일들 + 축소 프레임 전체를 한 번의 배치로 검출하고 타일 간 중복을 합침
 
-            # 아무 글자도 없다면 패스
-            if len(texts) == 0:
-                continue
+        - 타일: 작은 글자 줄을 원본 해상도로 검출
+        - 축소 프레임 전체: 타일보다 큰 영역(표 전체 폭의 줄 등)을 검출
+        - 타일 안쪽 경계에 닿은 박스는 잘린 조각이므로 버림 (겹침 덕분에 이웃 타일이나 전체 프레임에 온전한 박스가 있음)
+        - 남은 박스는 IoU / 포함 관계로 중복을 제거
 
-            # crop 하나당 하나의 문자열로 합침
-            merged_text = " ".join(texts)
+        Returns:
+            tuple: ((N, 4) 원본 좌표 x1, y1, x2, y2, (N,) 신뢰도, (N,) 클래스) 위에서 아래, 왼쪽에서 오른쪽 순
+        """
+        h, w = image.shape[:2]
+        origins = [(x, y) for y in self.__tile_origins(h) for x in self.__tile_origins(w)]
+        tiles = [image[y:y + self.__tile_size, x:x + self.__tile_size] for x, y in origins]
+
+        results = self.__yolo(tiles + [detect_image])
+
+        all_xyxy, all_conf, all_cls = [], [], []
+        margin = 2 # 경계에 닿았다고 볼 거리 (px)
+
+        for (x, y), tile, result in zip(origins, tiles, results):
+            xyxy, conf, cls = detection_arrays(result)
+            tile_h, tile_w = tile.shape[:2]
+
+            # 이미지 가장자리가 아닌 타일 경계에 닿은 박스는 잘린 조각
+            cut = np.zeros(len(xyxy), dtype=bool)
+            if x > 0:
+                cut |= xyxy[:, 0] <= margin
+            if y > 0:
+                cut |= xyxy[:, 1] <= margin
+            if x + tile_w < w:
+                cut |= xyxy[:, 2] >= tile_w - margin
+            if y + tile_h < h:
+                cut |= xyxy[:, 3] >= tile_h - margin
+
+            all_xyxy.append(xyxy[~cut] + np.array([x, y, x, y], dtype=np.float32))
+            all_conf.append(conf[~cut])
+            all_cls.append(cls[~cut])
+
+        xyxy, conf, cls = detection_arrays(results[-1])
+        all_xyxy.append(scale_boxes(xyxy, detect_image.shape, image.shape))
+        all_conf.append(conf)
+        all_cls.append(cls)
+
+        xyxy, conf, cls = np.concatenate(all_xyxy), np.concatenate(all_conf), np.concatenate(all_cls)
+        keep = merge_overlapping(xyxy, conf, cls)
 
-            # 신뢰도는 평균 또는 최대값 사용 (원하는 방식 선택)
-            avg_conf = sum(confs) / len(confs)
+        if(self.__visualization):
+            print(f"타일 {len(tiles)}개 + 전체 프레임 검출 결과 {len(xyxy)}개 -> 중복 제거 후 {len(keep)}개")
 
-            # 이제 하나만 저장
-            original_ocr_result.append([merged_text, avg_conf])
+        keep = keep[np.lexsort((xyxy[keep, 0], xyxy[keep, 1]))]
+        return xyxy[keep], conf[keep], cls[keep]
 
-        ##### 패턴 매칭전 문자열을 확인하기 위한 코드
-        if(self.__visualization):
-            print("패턴 매칭전 결과(easyocr의 순수 결과값) : ", original_ocr_result)
+    def parse_ocr_result(self, ocr_results: list[list[tuple[str, float]]], boxes: np.ndarray = None):
+        """
+        crop별 OCR 결과를 패턴 매칭하여 영양성분 수치로 변환
+
+        Args:
+            ocr_results (list): crop 인덱스별 [(text, confidence), ...] 리스트 (EasyOCRBatchRecognizer.readtext의 결과)
+            boxes (np.ndarray): (N, 4) crop별 원본 좌표 (주어지면 표의 행 / 열 구조로 라벨과 수치를 짝지음)
 
+        Returns:
+            tuple[dict, list]: (영양성분별 [수치, 신뢰도, 유사도], crop별 [text, 평균 신뢰도])
+        """
         # ------------------------------------------
-        # 4) 패턴 정의
+        # 3) EasyOCR로 모든 crop 이미지에서 추출한 텍스트 정리
+        #    형태: [ [text, confidence], ... ]
         # ------------------------------------------
-        patterns = {
-            "총내용량": ["총내용량"],
-            # "기준내용량"은 따로 정규식을 사용하여 처리 ex) "100ml당", "50g당"
-            # "kcal"는 따로 정규식을 사용하여 처리 ex) "300kcal", "600kcal"
-            "나트륨": ["나트륨", "나르룹"],
-            "탄수화물": ["탄수화물"],
-            "당류": ["당류"],
-            "지방": ["지방"],
-            "트랜스지방": ["트랜스지방"],
-            "포화지방": ["포화지방"],
-            "콜레스테롤": ["콜레스테롤"],
-            "단백질": ["단백질"]
-        }
+        original_ocr_result = []
+        cells = [] # (text, confidence, box)
 
-        matched = {key: None for key in patterns.keys()}
+        for k, ocr_result in enumerate(ocr_results):
+            merged = self.__merge_crop_result(ocr_result)
+            if merged is None:
+                continue
+            original_ocr_result.append(merged)
+            if boxes is not None:
+                cells.append((merged[0], merged[1], boxes[k]))
+
+        ##### 패턴 매칭전 문자열을 확인하기 위한 코드
+        if(self.__visualization):
+            print("패턴 매칭전 결과(easyocr의 순수 결과값) : ", original_ocr_result)
+
+        matched = {key: None for key in self.__patterns.keys()}
 
         # ------------------------------------------
         # 5) 문자열 패턴 매칭
         # ------------------------------------------
-        for ocr_original_text, ocr_conf in original_ocr_result:
-            ocr_text = ocr_original_text.replace(" ", "").replace("(", "").replace(")", "")
+        if self.__layout_parser and boxes is not None:
+            self.__parse_layout(matched, cells)
+        else:
+            for ocr_original_text, ocr_conf in original_ocr_result:
+                self.__match(matched, ocr_original_text, ocr_conf)
 
-            # ✔ 패턴1: 수치 + kcal
-            if re.search(r"\d+\.?\d*\s*kcal", ocr_text.lower()):
-                matched["kcal"] = [ocr_text, ocr_conf, 1] # 매칭이 되었을 경우 패턴 매칭 유사도를 1로 취급
-                continue
+        ##### easyocr이 추출한 문자열을 패턴 매칭한 이후의 결과를 확인하기 위한 코드 
+        if(self.__visualization):
+            print("패턴 매칭후 결과 : ", matched) # DEV
+
+        return self.__final_output(matched), original_ocr_result
+
+    def recognize_until_resolved(self, crops: list[np.ndarray], allowlists: list[str], order: list[int], recognize, boxes: np.ndarray = None):
+        """
+        crop을 order 순서대로 나눠서 인식하며 패턴 매칭을 함께 진행하고,
+        enable_early_stop()의 대상 항목이 모두 기준을 넘으면 남은 crop은 인식하지 않고 종료
+
+        조기 종료가 꺼져 있으면 모든 crop을 한 번에 인식하므로 parse_ocr_result(recognize(crops))와 같다.
+
+        Args:
+            crops (list[np.ndarray]): detect_routed_crops()의 crop 리스트
+            allowlists (list[str]): detect_routed_crops()의 crop별 허용 문자 리스트
+            order (list[int]): detect_routed_crops()의 인식 우선순위
+            recognize: (crop 리스트, 허용 문자 리스트)를 받아 crop별 OCR 결과를 반환하는 함수 (EasyOCRBatchRecognizer.readtext 등)
+            boxes (np.ndarray): detect_routed_crops()의 crop별 원본 좌표 (parse_ocr_result 참고)
+
+        Returns:
+            tuple[dict, list]: parse_ocr_result()와 같은 (영양성분별 [수치, 신뢰도, 유사도], 인식한 crop별 [text, 평균 신뢰도])
+        """
+        if self.__early_stop is None:
+            return self.parse_ocr_result(recognize(crops, allowlists), boxes)
+
+        chunk_size = self.__early_stop["chunk_size"]
+        ocr_results = [None] * len(crops) # 인식하지 않은 crop은 None
+        matched = {key: None for key in self.__patterns.keys()}
+        cells = [] # 지금까지 인식한 crop의 (text, confidence, box) - 표 구조 파싱용
+        recognized = 0
+
+        # 표 구조 파싱을 쓰면 parse_ocr_result와 같이 라벨 셀과 수치 셀을 짝지어서 확정 여부를 판단
+        # (crop 문자열마다 매칭하면 라벨 셀 "나트륨"에는 수치가 없어서 항목이 확정되지 않음)
+        layout = self.__layout_parser and boxes is not None
+
+        for start in range(0, len(order), chunk_size):
+            chunk = order[start:start + chunk_size]
+            chunk_results = recognize([crops[k] for k in chunk], [allowlists[k] for k in chunk])
+
+            for k, ocr_result in zip(chunk, chunk_results):
+                ocr_results[k] = ocr_result
+                merged = self.__merge_crop_result(ocr_result)
+                if merged is None:
+                    continue
+                if layout:
+                    cells.append((merged[0], merged[1], boxes[k]))
+                else:
+                    self.__match(matched, *merged)
+
+            if layout:
+                # 새 셀이 이전 행의 짝을 바꿀 수 있으므로 지금까지 인식한 셀 전체로 다시 파싱
+                matched = {key: None for key in self.__patterns.keys()}
+                self.__parse_layout(matched, cells)
+
+            recognized += len(chunk)
+            if self.__resolved(matched):
+                break
+
+        skipped = len(crops) - recognized
+        with self.__early_stop_lock:
+            self.__early_stop_counts["images"] += 1
+            self.__early_stop_counts["stopped"] += int(skipped > 0)
+            self.__early_stop_counts["crops"] += len(crops)
+            self.__early_stop_counts["crops_skipped"] += skipped
+
+        if(self.__visualization):
+            print(f"crop {len(crops)}개 중 {recognized}개를 인식하고 {skipped}개는 건너뜀")
+
+        # 반환값의 crop 순서는 parse_ocr_result와 같이 원래(위에서 아래) 순서로 맞춤
+        recognized_indexes = [k for k, ocr_result in enumerate(ocr_results) if ocr_result is not None]
+        return self.parse_ocr_result([ocr_results[k] for k in recognized_indexes], None if boxes is None else boxes[recognized_indexes])
 
-            # ✔ 패턴2: 수치 + 단위 + "당"
-            is_standard_amount = True
+    def __resolved(self, matched: dict) -> bool:
+        """
+        enable_early_stop()의 대상 항목이 모두 신뢰도 / 유사도 기준을 넘고 수치까지 읽혔는지
+        (표 구조 파싱의 결과는 라벨과 짝지어진 수치 셀의 문자열이므로 수치가 따로 있는 행도 확정됨)
+        """
+        for field in self.__early_stop["fields"]:
+            val = matched.get(field)
+            if val is None:
+                return False
 
-            if("류" in ocr_text.lower()):
-                is_standard_amount = False
+            ocr_text, ocr_conf, match_sim = val
+            if ocr_conf < self.__early_stop["min_confidence"] or match_sim < self.__early_stop["min_similarity"]:
+                return False
+            if self.__extract_first_number(ocr_text) is None:
+                return False
 
-            if("kc" in ocr_text.lower() or "cal" in ocr_text.lower()):
-                is_standard_amount = False
+        return True
 
-            if("당" not in ocr_text.lower()):
-                is_standard_amount = False
+    def __merge_crop_result(self, ocr_result: list[tuple[str, float]]):
+        """crop 하나에서 읽힌 모든 text를 [합친 문자열, 평균 신뢰도]로 합침 (읽힌 글자가 없으면 None)"""
+        texts = []
+        confs = []
 
-            if(is_standard_amount):
-                matched["기준내용량"] = [ocr_text, ocr_conf, 1] # 매칭이 되었을 경우 패턴 매칭 유사도를 1로 취급
+        for (text, conf) in ocr_result:
+            text = text.strip()
+            if text == "":
                 continue
+            texts.append(text)
+            confs.append(float(conf))
 
-            # ✔ 패턴3: "총내용량", "나트륨" 등 유사도 기반
-            if(self.__visualization):
-                print(f"===== easyocr이 변환한 \"{ocr_text}\"에 대한 패턴 매칭 시작 =====")
+        # 아무 글자도 없다면 패스
+        if len(texts) == 0:
+            return None
 
-            for category, keywords in patterns.items():
-                for kw in keywords:
-                    match_sim = self.__similar(ocr_text, kw)
+        # crop 하나당 하나의 문자열로 합침
+        merged_text = " ".join(texts)
 
-                    if match_sim > self.__match_ratio_deadline:
-                        # 이전 값이 없으면 바로 저장
-                        if matched[category] is None:
-                            matched[category] = [ocr_text, ocr_conf, match_sim] # conf = confidence(easyocr이 ocr한 텍스트에 대한 신뢰도)
-                                                                                # sim = similar(영양소 종류 패턴 매칭에 대한 유사도)
-                            break
+        # 신뢰도는 평균 또는 최대값 사용 (원하는 방식 선택)
+        avg_conf = sum(confs) / len(confs)
 
-                        # 이전에 저장된 유사도
-                        old_sim = matched[category][2]
+        # 이제 하나만 저장
+        return [merged_text, avg_conf]
 
-                        # 유사도가 기존보다 높을 때만 업데이트
-                        if match_sim > old_sim:
-                            matched[category] = [ocr_text, ocr_conf, match_sim]
+    def __match(self, matched: dict, ocr_original_text: str, ocr_conf: float):
+        """crop 문자열 하나를 패턴 매칭하여 matched(영양성분별 [text, 신뢰도, 유사도])를 갱신"""
+        ocr_text = ocr_original_text.replace(" ", "").replace("(", "").replace(")", "")
 
-                        break
+        # ✔ 패턴1, 2: 수치 + kcal / 수치 + 단위 + "당"
+        field = self.__regex_field(ocr_text)
+        if field is not None:
+            matched[field] = [ocr_text, ocr_conf, 1] # 매칭이 되었을 경우 패턴 매칭 유사도를 1로 취급
+            return
 
-        ##### easyocr이 추출한 문자열을 패턴 매칭한 이후의 결과를 확인하기 위한 코드 
+        # ✔ 패턴3: "총내용량", "나트륨" 등 유사도 기반
         if(self.__visualization):
-            print("패턴 매칭후 결과 : ", matched) # DEV
+            print(f"===== easyocr이 변환한 \"{ocr_text}\"에 대한 패턴 매칭 시작 =====")
+
+        ocr_text_key = jamo_key(ocr_text)
+
+        for category, keywords in self.__patterns.items():
+            for kw in keywords:
+                match_sim = self.__similar(ocr_text_key, kw)
+
+                if match_sim > self.__match_ratio_deadline:
+                    # 이전 값이 없으면 바로 저장
+                    if matched[category] is None:
+                        matched[category] = [ocr_text, ocr_conf, match_sim] # conf = confidence(easyocr이 ocr한 텍스트에 대한 신뢰도)
+                                                                            # sim = similar(영양소 종류 패턴 매칭에 대한 유사도)
+                        break
+
+                    # 이전에 저장된 유사도
+                    old_sim = matched[category][2]
+
+                    # 유사도가 기존보다 높을 때만 업데이트
+                    if match_sim > old_sim:
+                        matched[category] = [ocr_text, ocr_conf, match_sim]
+
+                    break
+
+    def __regex_field(self, ocr_text: str):
+        """정규식 / 규칙으로 처리하는 항목("kcal", "기준내용량")이면 그 항목 이름, 아니면 None"""
+        # ✔ 패턴1: 수치 + kcal
+        if re.search(r"\d+\.?\d*\s*kcal", ocr_text.lower()):
+            return "kcal"
+
+        # ✔ 패턴2: 수치 + 단위 + "당"
+        is_standard_amount = True
+
+        if("류" in ocr_text.lower()):
+            is_standard_amount = False
+
+        if("kc" in ocr_text.lower() or "cal" in ocr_text.lower()):
+            is_standard_amount = False
 
+        if("당" not in ocr_text.lower()):
+            is_standard_amount = False
+
+        if(is_standard_amount):
+            return "기준내용량"
+
+        return None
+
+    def __parse_layout(self, matched: dict, cells: list[tuple[str, float, np.ndarray]]):
+        """
+        박스 위치로 영양성분 표의 행을 나누고, 행 안에서 라벨 셀과 그 오른쪽의 수치 셀을 짝지어 matched를 갱신
+
+        - 행: 박스 중심 y를 높이 기준 허용 오차로 묶음 (MaterialImageToText의 toleranceY 정렬과 같은 방식)
+        - 라벨 셀: 첫 숫자 앞부분이 키워드 색인과 일치하는 셀. 같은 셀에 숫자가 있으면("나트륨350mg") 그 숫자를 사용하고,
+          없으면 같은 행에서 오른쪽에 있는 첫 번째 수치 셀(퍼센트만 있는 셀 "18%"는 제외)을 사용
+        - 유사도 비교는 라벨 셀에만, 색인에 완전 일치가 없을 때만 수행함
+        """
+        for row in self.__rows(cells):
+            pending = None # 수치 셀을 기다리는 라벨 (항목, 유사도, 신뢰도)
+
+            for ocr_original_text, ocr_conf, box in row:
+                ocr_text = ocr_original_text.replace(" ", "").replace("(", "").replace(")", "")
+
+                field = self.__regex_field(ocr_text)
+                if field is not None:
+                    matched[field] = [ocr_text, ocr_conf, 1] # 매칭이 되었을 경우 패턴 매칭 유사도를 1로 취급
+                    pending = None
+                    continue
+
+                label = self.__find_label(jamo_key(re.split(r"\d", ocr_text, maxsplit=1)[0]))
+                has_number = self.__extract_first_number(ocr_text) is not None
+
+                if label is not None:
+                    category, match_sim = label
+                    pending = None
+                    if has_number:
+                        self.__update_match(matched, category, [ocr_text, ocr_conf, match_sim])
+                    else:
+                        pending = (category, match_sim, ocr_conf)
+                    continue
+
+                if pending is not None and has_number and not re.fullmatch(r"[\d.,]+%", ocr_text):
+                    category, match_sim, label_conf = pending
+                    # 라벨과 수치 중 더 낮은 OCR 신뢰도를 항목의 신뢰도로 사용
+                    self.__update_match(matched, category, [ocr_text, min(label_conf, ocr_conf), match_sim])
+                    pending = None
+
+    def __rows(self, cells: list[tuple[str, float, np.ndarray]]) -> list[list[tuple[str, float, np.ndarray]]]:
+        """셀들을 중심 y가 가까운 것끼리 행으로 묶고, 행 안에서는 왼쪽부터 정렬"""
+        if len(cells) == 0:
+            return []
+
+        heights = [float(box[3] - box[1]) for _, _, box in cells]
+        tolerance = max(1.0, float(np.median(heights)) * 0.5) # 같은 행으로 볼 중심 y 차이 (px)
+
+        rows = []
+        row_center = None
+        for cell in sorted(cells, key=lambda cell: float(cell[2][1] + cell[2][3]) / 2):
+            center = float(cell[2][1] + cell[2][3]) / 2
+            if row_center is None or center - row_center > tolerance:
+                rows.append([])
+            rows[-1].append(cell)
+            row_center = sum(float(c[2][1] + c[2][3]) / 2 for c in rows[-1]) / len(rows[-1])
+
+        return [sorted(row, key=lambda cell: float(cell[2][0])) for row in rows]
+
+    def __find_label(self, label_key: str):
+        """
+        라벨 셀의 자모 키와 가장 비슷한 항목을 찾음
+
+        Returns:
+            tuple: (항목, 유사도), 유사도가 기준을 넘는 항목이 없으면 None
+        """
+        if label_key == "":
+            return None
+
+        if label_key in self.__keyword_index:
+            return self.__keyword_index[label_key], 1.0
+
+        best = None
+        for category, patterns in self.__patterns.items():
+            for pattern in patterns:
+                # 유사도는 2 * min(길이) / (길이 합)을 넘을 수 없으므로 길이 차이가 큰 키워드는 비교하지 않음
+                if 2 * min(len(label_key), len(pattern.key)) / (len(label_key) + len(pattern.key)) <= self.__match_ratio_deadline:
+                    continue
+
+                match_sim = self.__similar(label_key, pattern)
+                if match_sim > self.__match_ratio_deadline and (best is None or match_sim > best[1]):
+                    best = (category, match_sim)
+
+        return best
+
+    def __update_match(self, matched: dict, category: str, value: list):
+        """이전 값이 없거나 유사도가 기존보다 높을 때만 matched[category]를 갱신"""
+        if matched[category] is None or value[2] > matched[category][2]:
+            matched[category] = value
+
+    def __final_output(self, matched: dict) -> dict:
+        """matched(영양성분별 [text, 신뢰도, 유사도])의 문자열에서 숫자를 파싱하여 [수치, 신뢰도, 유사도]로 변환"""
         # ------------------------------------------
         # 6) 매칭된 문자열에서 숫자 파싱
         # ------------------------------------------
@@ -257,7 +617,13 @@ class NutritionImageToText:
             if number is not None:
                 final_output[key] = [number, ocr_conf, match_sim]
 
-        return final_output, original_ocr_result
+        try:
+            if(final_output["총내용량"][0] < 5): # 단위 변환 (L -> ml)
+                final_output["총내용량"][0] *= 1000
+        except:
+            pass
+
+        return final_output
 
     class str_or_ndarray: # 타입 힌트용
         pass
@@ -270,15 +636,10 @@ class NutritionImageToText:
         if(type(img) == str):
             img = cv2.imread(img)
 
-        nutrition_result, original_ocr_result = self.__image_to_text(img, self.__yolo, self.__easy_ocr)
-
-        try:
-            if(nutrition_result["총내용량"][0] < 5): # 단위 변환 (L -> ml)
-                nutrition_result["총내용량"][0] *= 1000
-        except:
-            pass
+        cropped_list, allowlists, order, boxes = self.detect_routed_crops(img)
 
-        return nutrition_result, original_ocr_result
+        # crop을 배치 인식 (조기 종료를 켜면 모든 항목이 확정될 때까지만 인식)
+        return self.recognize_until_resolved(cropped_list, allowlists, order, self.__recognizer.readtext, boxes)
 
 if(__name__ == "__main__"):
     nitt = NutritionImageToText(False)
@@ -0,0 +1,221 @@
+import asyncio
+import gc
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory # 디코딩된 이미지를 pickle 없이 워커에 넘기기 위한 import
+
+import numpy as np
+
+from MaterialAndNutritionOCR.MaterialAndNutritionImageToText import MaterialAndNutritionImageToText, BRANCHES
+
+# 워커 프로세스마다 하나씩 가지는 OCR 모델 (YOLO 2개 + EasyOCR)
+_worker_model = None
+
+def _init_worker(model_kwargs: dict, torch_threads: int):
+    """
+    워커 프로세스 시작 시 한 번 실행되어 OCR 모델을 로드하고 워밍업
+    torch는 기본으로 CPU 코어 수만큼 스레드를 쓰므로, 워커들이 코어를 나눠 쓰도록 워커별 스레드 수를 먼저 제한함
+    """
+    global _worker_model
+
+    import torch
+    torch.set_num_threads(torch_threads)
+
+    _worker_model = MaterialAndNutritionImageToText(**model_kwargs)
+    _worker_model.load_models(parallel=True)
+    _worker_model.warmup()
+
+def _startup_stats() -> dict:
+    """워커의 모델 로드 / 워밍업 시간 (initializer가 끝난 뒤에 실행되므로 모델 준비 완료 확인도 겸함)"""
+    return {"pid": os.getpid(), **_worker_model.startup_stats()}
+
+def _execute_shared(shm_name: str, layouts: list, branches: tuple = BRANCHES):
+    """
+    공유 메모리에 올라온 이미지들을 복사 없이 numpy 배열로 감싸서 OCR 실행
+
+    Args:
+        layouts (list): [(offset, shape, dtype), ...] 순서대로 (OCR용 이미지, 검출용 이미지)
+        branches (tuple): 실행할 분석 분기 (MaterialAndNutritionImageToText.execute 참고)
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    try:
+        image, detect_image = _attach_images(shm, layouts)
+        result = _worker_model.execute(image, detect_image, branches)
+
+        del image, detect_image
+        return result
+    finally:
+        _close_shared(shm)
+
+def _execute_shared_batch(shm_name: str, image_layouts: list, branches: tuple = BRANCHES) -> list:
+    """
+    공유 메모리 하나에 올라온 여러 이미지를 한 번에 OCR (MaterialAndNutritionImageToText.execute_batch)
+
+    Args:
+        image_layouts (list): 이미지별 _execute_shared의 layouts
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    try:
+        pairs = [_attach_images(shm, layouts) for layouts in image_layouts]
+        results = _worker_model.execute_batch([image for image, _ in pairs], [detect_image for _, detect_image in pairs], branches)
+
+        del pairs
+        return results
+    finally:
+        _close_shared(shm)
+
+def _attach_images(shm: shared_memory.SharedMemory, layouts: list) -> tuple:
+    """공유 메모리의 (OCR용 이미지, 검출용 이미지 또는 None)을 numpy 배열로 감쌈"""
+    images = []
+    for offset, shape, dtype in layouts:
+        image = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        image.flags.writeable = False # 부모 프로세스의 버퍼이므로 읽기 전용으로 사용
+        images.append(image)
+
+    return images[0], (images[1] if len(images) > 1 else None)
+
+def _close_shared(shm: shared_memory.SharedMemory):
+    try:
+        shm.close()
+    except BufferError:
+        # crop 등 버퍼를 참조하는 객체가 남아 있으면 정리 후 다시 닫음
+        gc.collect()
+        shm.close()
+
+class OCRPoolBusyError(Exception):
+    """대기 중인 OCR 요청이 max_pending을 넘었을 때 발생"""
+    pass
+
+class OCRProcessPool:
+    """
+    OCR 추론을 asyncio 이벤트 루프 밖의 워커 프로세스들에서 실행하는 엔진.
+
+    - 워커 프로세스마다 YOLO + EasyOCR 모델을 하나씩 로드해 두고 요청을 나눠서 처리한다.
+    - 디코딩된 이미지는 pickle로 직렬화하지 않고 공유 메모리(SharedMemory)로 전달한다.
+    - 처리 중 + 대기 중인 요청 수를 max_pending으로 제한하여, 넘치면 OCRPoolBusyError를 발생시킨다.
+    - 워커마다 torch 스레드를 torch_threads개(0이면 CPU 코어 수 / 워커 수)로 제한한다.
+    - 워커가 비정상 종료되어 풀이 깨지면 풀을 새로 만들고, 그 요청은 OCRPoolBusyError로 실패시킨다. (다음 요청부터 새 워커에서 처리)
+    """
+    def __init__(self, workers: int = 2, max_pending: int = 16, model_kwargs: dict = None, torch_threads: int = 0):
+        self.__workers = workers
+        self.__max_pending = max_pending
+        self.__model_kwargs = model_kwargs or {}
+        self.__torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // max(1, workers))
+
+        self.__executor = None
+        self.__pending = 0 # 제출되었지만 아직 끝나지 않은 요청 수
+        self.__startup_stats = [] # 워커별 모델 로드 / 워밍업 시간
+        self.__restarts = 0 # 워커가 죽어서 풀을 새로 만든 횟수
+
+    def __create_executor(self) -> ProcessPoolExecutor:
+        # torch/OpenMP 스레드 상태가 fork로 꼬이지 않도록 spawn으로 워커를 생성
+        return ProcessPoolExecutor(
+            max_workers=self.__workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.__model_kwargs, self.__torch_threads)
+        )
+
+    async def start(self):
+        """워커 프로세스를 띄우고 모든 워커의 모델 로드 + 워밍업이 끝날 때까지 대기"""
+        self.__executor = self.__create_executor()
+
+        # 워커 수만큼 제출해야 프로세스가 모두 생성되고 initializer(모델 로드)가 실행됨
+        loop = asyncio.get_running_loop()
+        self.__startup_stats = await asyncio.gather(*[loop.run_in_executor(self.__executor, _startup_stats) for _ in range(self.__workers)])
+
+    async def execute(self, image: np.ndarray, detect_image: np.ndarray = None, branches: tuple = BRANCHES):
+        """
+        MaterialAndNutritionImageToText.execute()를 워커 프로세스에서 실행하고 결과를 기다림
+
+        Args:
+            image (np.ndarray): OCR crop에 사용할 BGR 이미지
+            detect_image (np.ndarray): YOLO 검출에 사용할 축소 BGR 이미지 (없으면 image에서 검출)
+            branches (tuple): 실행할 분석 분기 ("nutrition", "material" 중 필요한 것)
+
+        Returns:
+            tuple[dict, list]: (nutrition_result, material_result)
+        """
+        return await self.__run_shared(_execute_shared, [(image, detect_image)], branches, batch=False)
+
+    async def execute_batch(self, images: list, detect_images: list = None, branches: tuple = BRANCHES) -> list:
+        """
+        MaterialAndNutritionImageToText.execute_batch()를 워커 프로세스 하나에서 실행하고 결과를 기다림
+        (이미지들은 공유 메모리 하나에 이어서 올리고, 대기 요청 수는 한 건으로 셈)
+
+        Returns:
+            list: 이미지별 (nutrition_result, material_result), 오류가 난 이미지는 그 예외 객체
+        """
+        if detect_images is None:
+            detect_images = [None] * len(images)
+
+        return await self.__run_shared(_execute_shared_batch, list(zip(images, detect_images)), branches, batch=True)
+
+    async def __run_shared(self, function, pairs: list, branches: tuple, batch: bool):
+        """(OCR용 이미지, 검출용 이미지) 쌍들을 공유 메모리 하나에 복사하고 워커에서 function 실행"""
+        if self.__pending >= self.__max_pending:
+            raise OCRPoolBusyError(f"OCR 대기 요청이 최대치({self.__max_pending})를 넘었습니다.")
+
+        # 검출용 프레임이 따로 있으면 OCR용 프레임 뒤에 이어서 같은 공유 메모리에 올림
+        arrays = []
+        image_layouts = []
+        offset = 0
+        for image, detect_image in pairs:
+            layouts = []
+            for array in ([image] if detect_image is None or detect_image is image else [image, detect_image]):
+                arrays.append(array)
+                layouts.append((offset, array.shape, array.dtype.str))
+                offset += array.nbytes
+            image_layouts.append(layouts)
+
+        self.__pending += 1
+        shm = shared_memory.SharedMemory(create=True, size=max(1, offset))
+
+        try:
+            # 디코딩된 이미지를 공유 메모리로 한 번만 복사
+            for array, (array_offset, shape, dtype) in zip(arrays, [layout for layouts in image_layouts for layout in layouts]):
+                shared_array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=array_offset)
+                shared_array[:] = array
+                del shared_array
+
+            loop = asyncio.get_running_loop()
+            executor = self.__executor
+            try:
+                return await loop.run_in_executor(executor, function, shm.name, image_layouts if batch else image_layouts[0], tuple(branches))
+            except BrokenProcessPool as e:
+                # 워커 하나가 죽으면 풀 전체가 깨져서 이후 요청이 모두 실패하므로 새 풀로 교체
+                # (동시에 실패한 요청들 중 처음 하나만 교체, 새 워커는 다음 요청 때 모델을 로드함)
+                if self.__executor is executor:
+                    self.__executor = self.__create_executor()
+                    self.__restarts += 1
+                    executor.shutdown(wait=False, cancel_futures=True)
+                raise OCRPoolBusyError("OCR 워커 프로세스가 비정상 종료되어 다시 시작합니다.") from e
+        finally:
+            shm.close()
+            shm.unlink()
+            self.__pending -= 1
+
+    @property
+    def pending(self) -> int:
+        return self.__pending
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    @property
+    def startup_stats(self) -> list:
+        return self.__startup_stats
+
+    @property
+    def restarts(self) -> int:
+        return self.__restarts
+
+    def shutdown(self):
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True, cancel_futures=True)
+            self.__executor = None
@@ -0,0 +1,129 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+class OCRResultCache:
+    """
+    업로드된 이미지 내용으로 OCR 결과를 캐싱하는 LRU + TTL 캐시.
+
+    - 1차 키: 업로드 바이트의 SHA-256 (재시도, 같은 파일 재업로드)
+    - 2차 키(선택): 디코딩된 이미지의 perceptual hash(dHash)
+      해밍 거리가 phash_distance 이하인 항목이 있으면 거의 같은 사진으로 보고 그 결과를 사용
+    - 항목 수(max_entries)와 저장 바이트(max_bytes)를 넘으면 가장 오래 사용하지 않은 항목부터 버림
+    - 결과는 pickle 바이트로 저장하므로, 꺼낸 결과를 호출자가 수정해도 캐시가 오염되지 않음
+    """
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 3600,
+                 phash_distance: int = -1, phash_size: int = 16):
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__ttl_seconds = ttl_seconds
+        self.__phash_distance = phash_distance # 음수이면 perceptual hash 조회를 하지 않음
+        self.__phash_size = phash_size # dHash 한 변의 크기 (phash_size^2 비트)
+
+        self.__entries = OrderedDict() # digest -> (pickle된 결과, 만료 시각, perceptual hash)
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+
+        self.__hits = 0
+        self.__similar_hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    @staticmethod
+    def digest(image_bytes: bytes) -> str:
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    @property
+    def uses_perceptual_hash(self) -> bool:
+        return self.__phash_distance >= 0
+
+    def perceptual_hash(self, image: np.ndarray) -> int:
+        """가로로 이웃한 픽셀의 밝기 차이로 만든 dHash (phash_size^2 비트 정수)"""
+        grey = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(grey, (self.__phash_size + 1, self.__phash_size), interpolation=cv2.INTER_AREA)
+
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    def get(self, digest: str):
+        """SHA-256이 같은 결과가 있으면 반환 (없으면 None)"""
+        with self.__lock:
+            entry = self.__entries.get(digest)
+
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    self.__remove(digest)
+                self.__misses += 1
+                return None
+
+            self.__entries.move_to_end(digest)
+            self.__hits += 1
+            return pickle.loads(entry[0])
+
+    def get_similar(self, phash: int):
+        """
+        perceptual hash의 해밍 거리가 phash_distance 이하인 결과가 있으면 반환 (없으면 None)
+        get()에서 miss가 난 뒤에 디코딩한 이미지로 호출하는 것을 전제로 함
+        """
+        if phash is None or not self.uses_perceptual_hash:
+            return None
+
+        now = time.monotonic()
+
+        with self.__lock:
+            best_digest, best_distance = None, self.__phash_distance + 1
+
+            for digest, (_, expires_at, entry_phash) in self.__entries.items():
+                if entry_phash is None or expires_at < now:
+                    continue
+                distance = (entry_phash ^ phash).bit_count()
+                if distance < best_distance:
+                    best_digest, best_distance = digest, distance
+
+            if best_digest is None:
+                return None
+
+            # exact 조회에서 이미 miss로 집계되었으므로 similar hit으로 옮겨서 집계
+            self.__misses -= 1
+            self.__similar_hits += 1
+            self.__entries.move_to_end(best_digest)
+            return pickle.loads(self.__entries[best_digest][0])
+
+    def put(self, digest: str, value, phash: int = None):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.__max_bytes:
+            return
+
+        with self.__lock:
+            if digest in self.__entries:
+                self.__remove(digest)
+
+            self.__entries[digest] = (data, time.monotonic() + self.__ttl_seconds, phash)
+            self.__bytes += len(data)
+
+            # 항목 수 / 바이트 예산을 넘으면 가장 오래 사용하지 않은 항목부터 버림
+            while len(self.__entries) > self.__max_entries or self.__bytes > self.__max_bytes:
+                self.__remove(next(iter(self.__entries)))
+                self.__evictions += 1
+
+    def __remove(self, digest: str):
+        data, _, _ = self.__entries.pop(digest)
+        self.__bytes -= len(data)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            lookups = self.__hits + self.__similar_hits + self.__misses
+            return {
+                "entries": len(self.__entries),
+                "bytes": self.__bytes,
+                "hits": self.__hits,
+                "similar_hits": self.__similar_hits,
+                "misses": self.__misses,
+                "evictions": self.__evictions,
+                "hit_ratio": (self.__hits + self.__similar_hits) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,173 @@
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+
+logger = logging.getLogger(__name__)
+
+# /proc/<pid>/smaps(_rollup)에서 합산할 항목 (kB)
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+def memory_usage(pid: int = None) -> dict:
+    """
+    프로세스의 메모리 사용량 (MB, 리눅스 전용)
+
+    - rss: 프로세스가 사용 중인 전체 물리 메모리
+    - shared: 다른 프로세스(master / 다른 워커)와 공유 중인 페이지 (copy-on-write로 아직 복사되지 않은 가중치 등)
+    - unique: 이 프로세스만 가진 페이지 (워커를 하나 더 띄우면 실제로 늘어나는 메모리)
+    - pss: 공유 페이지를 공유한 프로세스 수로 나눠서 더한 값
+    """
+    pid = pid or os.getpid()
+    totals = dict.fromkeys(_SMAPS_FIELDS, 0)
+
+    # smaps_rollup이 없는 커널에서는 smaps 전체를 합산
+    path = f"/proc/{pid}/smaps_rollup"
+    if not os.path.exists(path):
+        path = f"/proc/{pid}/smaps"
+
+    with open(path) as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in totals:
+                totals[name] += int(value.split()[0])
+
+    return {
+        "pid": pid,
+        "rss_mb": totals["Rss"] / 1024,
+        "pss_mb": totals["Pss"] / 1024,
+        "shared_mb": (totals["Shared_Clean"] + totals["Shared_Dirty"]) / 1024,
+        "unique_mb": (totals["Private_Clean"] + totals["Private_Dirty"]) / 1024
+    }
+
+def freeze_torch_modules(*modules):
+    """
+    fork 전에 torch 모듈을 추론 전용으로 고정
+
+    eval 모드로 바꾸고 파라미터의 requires_grad를 꺼서, 워커에서 추론할 때 가중치 텐서나
+    autograd 메타데이터에 쓰기가 일어나지 않도록 함 (쓰기가 없어야 가중치 페이지가 복사되지 않고 공유됨)
+    None은 건너뜀. ultralytics YOLO 래퍼처럼 train()을 덮어쓴 래퍼가 아니라 안쪽의 torch 모듈을 넘겨야 함
+    (nn.Module.eval()은 self.train(False)를 부르므로 래퍼에서는 학습이 시작됨)
+    """
+    import torch
+
+    for module in modules:
+        if isinstance(module, torch.nn.Module):
+            module.eval()
+            for parameter in module.parameters():
+                parameter.requires_grad_(False)
+
+class PreforkServer:
+    """
+    master 프로세스에서 모델을 한 번 로드한 뒤 uvicorn 워커들을 fork하는 서버 (gunicorn --preload와 같은 방식).
+
+    - master는 모델 로드 후 gc.freeze()로 현재 객체를 GC 대상에서 빼고 fork한다.
+      (GC가 객체 헤더에 쓰는 것만으로도 공유 페이지가 복사되기 때문)
+    - 워커는 fork 시점의 메모리를 copy-on-write로 공유하므로 가중치는 노드에 한 벌만 올라간다.
+    - 워커가 비정상 종료되면 master에 남아 있는 모델로 다시 fork한다.
+    - report_seconds마다 워커별 unique / shared RSS를 로그로 남긴다.
+    """
+    def __init__(self, app, workers: int = 2, host: str = "0.0.0.0", port: int = 8000,
+                 on_fork=None, report_seconds: float = 60):
+        self.__app = app
+        self.__workers = workers
+        self.__host = host
+        self.__port = port
+        self.__on_fork = on_fork # 워커에서 fork 직후 실행할 함수 (스레드 수 설정 등)
+        self.__report_seconds = report_seconds
+
+        self.__socket = None
+        self.__children = set()
+        self.__stopping = False
+
+    def serve(self):
+        """소켓을 열고 워커를 fork한 뒤, 종료 신호가 올 때까지 워커를 관리"""
+        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__socket.bind((self.__host, self.__port))
+        self.__socket.listen(2048)
+        self.__socket.set_inheritable(True)
+
+        # fork 직전에 지금까지 만들어진 객체(로드된 모델 포함)를 GC 영구 세대로 옮김
+        gc.collect()
+        gc.freeze()
+
+        for _ in range(self.__workers):
+            self.__spawn()
+
+        signal.signal(signal.SIGTERM, self.__stop)
+        signal.signal(signal.SIGINT, self.__stop)
+
+        next_report = time.monotonic() + self.__report_seconds
+        while self.__children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+
+            if pid:
+                self.__children.discard(pid)
+                if not self.__stopping:
+                    logger.warning(f"⚠️ OCR 워커 {pid} 종료 (status={status}), 다시 fork합니다")
+                    self.__spawn()
+                continue
+
+            if self.__report_seconds > 0 and time.monotonic() >= next_report:
+                self.log_memory_report()
+                next_report = time.monotonic() + self.__report_seconds
+
+            time.sleep(0.5)
+
+    def memory_report(self) -> dict:
+        """master와 워커별 메모리 사용량, 워커들이 공유 덕분에 절약한 메모리"""
+        master = memory_usage()
+        workers = []
+        for pid in sorted(self.__children):
+            try:
+                workers.append(memory_usage(pid))
+            except FileNotFoundError:
+                continue
+
+        return {
+            "master": master,
+            "workers": workers,
+            # 공유가 없었다면 워커마다 shared 만큼을 따로 가졌어야 함
+            "saved_mb": sum(worker["shared_mb"] for worker in workers)
+        }
+
+    def log_memory_report(self):
+        report = self.memory_report()
+        for worker in report["workers"]:
+            logger.info(
+                f"📊 워커 {worker['pid']}: rss {worker['rss_mb']:.0f}MB "
+                f"(unique {worker['unique_mb']:.0f}MB / shared {worker['shared_mb']:.0f}MB, pss {worker['pss_mb']:.0f}MB)"
+            )
+        logger.info(f"📊 master rss {report['master']['rss_mb']:.0f}MB, 워커 공유로 절약한 메모리 약 {report['saved_mb']:.0f}MB")
+
+    def __spawn(self):
+        pid = os.fork()
+
+        if pid:
+            self.__children.add(pid)
+            return
+
+        # ---- 워커 프로세스 ----
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            gc.enable()
+
+            if self.__on_fork is not None:
+                self.__on_fork()
+
+            import uvicorn
+            server = uvicorn.Server(uvicorn.Config(self.__app, lifespan="on"))
+            server.run(sockets=[self.__socket])
+        finally:
+            os._exit(0)
+
+    def __stop(self, signum, frame):
+        self.__stopping = True
+        for pid in self.__children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
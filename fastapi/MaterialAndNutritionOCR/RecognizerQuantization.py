@@ -0,0 +1,160 @@
+import io
+import os
+import time
+from difflib import SequenceMatcher # FP32 인식 결과와 양자화 모델 인식 결과의 일치율을 계산하기 위한 import
+
+import easyocr
+import numpy as np
+import torch
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+from MaterialAndNutritionOCR.EasyOCRBatchRecognizer import EasyOCRBatchRecognizer, RECOGNIZER_HEIGHT
+
+# 인식기 양자화 모드
+# - "none": FP32 (easyocr.Reader(quantize=False))
+# - "dynamic": LSTM / Linear 동적 INT8 양자화 (CPU에서 easyocr.Reader의 기본값)
+# - "static": dynamic + CNN 특징 추출기(Conv)까지 정적 INT8 양자화 (calibrate로 만든 관측값 파일 필요)
+RECOGNIZER_QUANTIZATIONS = ("none", "dynamic", "static")
+
+DEFAULT_CALIBRATION_PATH = "MaterialAndNutritionOCR/recognizer_int8_calibration.pt"
+
+def load_reader(langs: list[str] = ['ko', 'en'], quantization: str = "dynamic", calibration_path: str = DEFAULT_CALIBRATION_PATH):
+    """
+    양자화 모드에 맞춰 easyocr.Reader를 생성
+
+    Args:
+        langs (list[str]): easyocr 언어 목록
+        quantization (str): "none" | "dynamic" | "static"
+        calibration_path (str): "static"일 때 사용할 calibrate() 결과 파일
+    """
+    if quantization not in RECOGNIZER_QUANTIZATIONS:
+        raise ValueError(f"지원하지 않는 인식기 양자화 모드입니다: {quantization} (지원: {', '.join(RECOGNIZER_QUANTIZATIONS)})")
+
+    reader = easyocr.Reader(langs, quantize=(quantization != "none"))
+
+    if quantization == "static":
+        if not os.path.exists(calibration_path):
+            raise FileNotFoundError(
+                f"인식기 정적 양자화 관측값 파일이 없습니다: {calibration_path} "
+                f"(python -m MaterialAndNutritionOCR.RecognizerQuantization calibrate <라벨 이미지들> 로 생성)"
+            )
+        apply_static_quantization(reader, torch.load(calibration_path, weights_only=True))
+
+    return reader
+
+def _feature_extractor(reader):
+    """인식기의 CNN 특징 추출기 (VGG ConvNet, 연산량 대부분을 차지)"""
+    if reader.device != "cpu":
+        raise ValueError("인식기 INT8 양자화는 CPU에서만 지원합니다.")
+
+    return reader.recognizer.FeatureExtraction
+
+def _prepare(conv_net: torch.nn.Module) -> torch.nn.Module:
+    """ConvNet에 관측기(observer)를 붙여 calibration이 가능한 모델로 변환"""
+    qconfig_mapping = get_default_qconfig_mapping(torch.backends.quantized.engine)
+    example_input = torch.zeros(1, 1, RECOGNIZER_HEIGHT, RECOGNIZER_HEIGHT * 4)
+
+    return prepare_fx(conv_net.eval(), qconfig_mapping, (example_input,))
+
+def calibrate(reader, crops: list[np.ndarray]) -> dict:
+    """
+    라벨 crop들로 ConvNet의 활성값 범위를 관측하고, reader의 인식기를 정적 INT8로 변환
+
+    Args:
+        reader: quantization="dynamic"으로 만든 easyocr.Reader (이 함수 안에서 변환됨)
+        crops (list[np.ndarray]): 실제 서비스와 같은 방식으로 YOLO가 검출한 crop 리스트
+
+    Returns:
+        dict: torch.save로 저장하여 load_reader(quantization="static")에서 사용할 관측값
+    """
+    feature_extractor = _feature_extractor(reader)
+    prepared = _prepare(feature_extractor.ConvNet)
+
+    # 서비스와 같은 전처리(라인 검출 + 64px 높이 resize)를 거친 입력으로 관측
+    feature_extractor.ConvNet = prepared
+    with torch.no_grad():
+        EasyOCRBatchRecognizer(reader).readtext(crops)
+
+    observed = prepared.state_dict()
+    feature_extractor.ConvNet = convert_fx(prepared)
+    return observed
+
+def apply_static_quantization(reader, observed: dict):
+    """calibrate()로 얻은 관측값으로 reader의 ConvNet을 정적 INT8 모델로 교체"""
+    feature_extractor = _feature_extractor(reader)
+    prepared = _prepare(feature_extractor.ConvNet)
+    prepared.load_state_dict(observed)
+
+    feature_extractor.ConvNet = convert_fx(prepared)
+
+def model_bytes(reader) -> int:
+    """인식기 가중치를 직렬화했을 때의 크기 (양자화된 packed 가중치 포함)"""
+    buffer = io.BytesIO()
+    torch.save(reader.recognizer.state_dict(), buffer)
+    return buffer.tell()
+
+def compare(reference_reader, candidate_reader, crops: list[np.ndarray], repeat: int = 3) -> dict:
+    """
+    같은 crop들에서 FP32 기준 인식기와 양자화 인식기의 정확도 / 지연 시간 / 모델 크기를 비교
+
+    정답 라벨 대신 FP32 인식 결과를 기준으로, crop별 문자열 일치율(SequenceMatcher)과 완전 일치 비율을 계산한다.
+    """
+    def run(reader):
+        recognizer = EasyOCRBatchRecognizer(reader)
+        texts, elapsed = None, []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = recognizer.readtext(crops)
+            elapsed.append((time.perf_counter() - started) * 1000)
+            texts = [" ".join(text for text, _ in result) for result in results]
+        return texts, min(elapsed)
+
+    reference_texts, reference_ms = run(reference_reader)
+    candidate_texts, candidate_ms = run(candidate_reader)
+
+    ratios = [SequenceMatcher(None, a, b).ratio() for a, b in zip(reference_texts, candidate_texts)]
+
+    return {
+        "crops": len(crops),
+        "char_agreement": float(np.mean(ratios)) if ratios else 1.0,
+        "exact_match": sum(a == b for a, b in zip(reference_texts, candidate_texts)) / len(crops) if crops else 1.0,
+        "reference_ms": reference_ms,
+        "candidate_ms": candidate_ms,
+        "speedup": reference_ms / candidate_ms if candidate_ms else 0.0,
+        "reference_model_bytes": model_bytes(reference_reader),
+        "candidate_model_bytes": model_bytes(candidate_reader)
+    }
+
+if(__name__ == "__main__"):
+    # 사용 예) fastapi 폴더에서
+    # 1. 관측값 생성: python -m MaterialAndNutritionOCR.RecognizerQuantization calibrate ../1.jpg ../2.png ...
+    # 2. FP32와 비교: python -m MaterialAndNutritionOCR.RecognizerQuantization report static ../3.jpg ...
+    #    (calibration에 쓰지 않은 이미지로 비교해야 정확도를 제대로 확인할 수 있음)
+    import sys
+
+    import cv2
+
+    from MaterialAndNutritionOCR.MaterialAndNutritionImageToText import MaterialAndNutritionImageToText
+
+    command = sys.argv[1]
+    quantization = sys.argv[2] if command == "report" else "static"
+    image_paths = sys.argv[3:] if command == "report" else sys.argv[2:]
+
+    # 서비스와 같은 YOLO로 라벨 이미지에서 crop을 만듦
+    detector = MaterialAndNutritionImageToText()
+    detector.load_nutrition_yolo()
+    detector.load_material_yolo()
+
+    crops = []
+    for path in image_paths:
+        nutrition_crops, material_crops = detector.detect_crops(cv2.imread(path))
+        # 원재료 crop은 BGR 프레임의 view이므로 서비스와 같은 입력이 되도록 RGB로 변환
+        crops += nutrition_crops + [cv2.cvtColor(crop, cv2.COLOR_BGR2RGB) for crop in material_crops]
+
+    if command == "calibrate":
+        observed = calibrate(load_reader(quantization="dynamic"), crops)
+        torch.save(observed, DEFAULT_CALIBRATION_PATH)
+        print(f"{len(crops)}개 crop으로 관측값 저장: {DEFAULT_CALIBRATION_PATH}")
+    else:
+        print(compare(load_reader(quantization="none"), load_reader(quantization=quantization), crops))
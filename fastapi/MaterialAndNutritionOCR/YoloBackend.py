@@ -0,0 +1,285 @@
+import ast
+import os
+import time
+
+import cv2
+import numpy as np
+
+from MaterialAndNutritionOCR.Detections import DetectionBoxes, DetectionResult, detection_arrays, box_iou, non_max_suppression
+
+YOLO_BACKENDS = ("ultralytics", "onnxruntime", "openvino", "opencv")
+
+def onnx_path_for(pt_path: str, int8: bool = False) -> str:
+    """nutrition_yolo.pt -> nutrition_yolo.onnx (int8이면 nutrition_yolo_int8.onnx)"""
+    base = os.path.splitext(pt_path)[0]
+    return f"{base}_int8.onnx" if int8 else f"{base}.onnx"
+
+def export_onnx(pt_path: str, imgsz: int = 640, int8: bool = False) -> str:
+    """
+    Ultralytics PyTorch 가중치(.pt)를 ONNX로 한 번 변환하여 .pt 옆에 저장
+
+    Args:
+        pt_path (str): YOLO .pt 파일 경로
+        imgsz (int): 입력 크기
+        int8 (bool): True이면 ONNX Runtime 동적 양자화로 INT8 가중치 모델도 생성
+
+    Returns:
+        str: 생성된 onnx 파일 경로
+    """
+    from ultralytics import YOLO # 변환할 때만 필요하므로 여기서 import
+
+    # dynamic=True: 여러 이미지를 한 번에 넣는 배치 추론을 위해 배치 축을 동적으로 둠
+    exported = YOLO(pt_path).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    onnx_path = onnx_path_for(pt_path)
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+
+    if not int8:
+        return onnx_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = onnx_path_for(pt_path, int8=True)
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
+
+def _read_varint(data, pos: int) -> tuple[int, int]:
+    value, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def _read_fields(data, start: int = 0, end: int = None):
+    """protobuf 메시지의 (필드 번호, 값) 목록 (길이 구분 필드만 값을 bytes로, 나머지는 건너뜀)"""
+    pos, end = start, len(data) if end is None else end
+    while pos < end:
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x07
+        if wire_type == 0:
+            _, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            pos += 8
+        elif wire_type == 5:
+            pos += 4
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            yield field, data[pos:pos + length]
+            pos += length
+        else:
+            raise ValueError(f"지원하지 않는 protobuf wire type입니다: {wire_type}")
+
+def read_onnx_metadata(onnx_path: str) -> dict[str, str]:
+    """
+    ONNX 모델의 metadata_props(ultralytics가 export할 때 names, imgsz 등을 저장해 둠)를 읽음
+    백엔드마다 메타데이터를 읽는 방법이 다르거나(openvino, opencv는 없음) onnx 패키지가 없을 수 있으므로
+    ModelProto에서 metadata_props(필드 14, key=1 / value=2)만 직접 읽는다. (그래프 등 나머지 필드는 건너뜀)
+    """
+    with open(onnx_path, "rb") as f:
+        data = memoryview(f.read())
+
+    metadata = {}
+    for field, entry in _read_fields(data):
+        if field != 14:
+            continue
+        props = dict(_read_fields(entry))
+        metadata[bytes(props.get(1, b"")).decode("utf-8")] = bytes(props.get(2, b"")).decode("utf-8")
+    return metadata
+
+def load_detector(pt_path: str, backend: str = "ultralytics", int8: bool = False, imgsz: int = 640):
+    """
+    설정된 백엔드로 YOLO 검출기를 로드
+    반환되는 검출기는 모두 detector(image or [images])[i].boxes.xyxy / conf / cls 형태로 사용할 수 있음
+
+    Args:
+        pt_path (str): YOLO .pt 파일 경로 (ONNX 백엔드는 같은 이름의 .onnx 파일을 사용하고, 없으면 변환함)
+        backend (str): "ultralytics" | "onnxruntime" | "openvino" | "opencv"
+    """
+    if backend not in YOLO_BACKENDS:
+        raise ValueError(f"지원하지 않는 YOLO 백엔드입니다: {backend} (지원: {', '.join(YOLO_BACKENDS)})")
+
+    if backend == "ultralytics":
+        from ultralytics import YOLO
+        return YOLO(pt_path)
+
+    onnx_path = onnx_path_for(pt_path, int8)
+    if not os.path.exists(onnx_path):
+        export_onnx(pt_path, imgsz=imgsz, int8=int8)
+
+    return OnnxYoloDetector(onnx_path, backend=backend, imgsz=imgsz)
+
+class OnnxYoloDetector:
+    """
+    ONNX로 변환한 YOLOv8 검출기를 torch/ultralytics 없이 실행하는 클래스.
+
+    전처리(letterbox)와 후처리(신뢰도 필터 + 클래스별 NMS)를 numpy/cv2로 직접 수행하며
+    ultralytics의 predict 기본값(conf=0.25, iou=0.7, max_det=300)과 같은 결과를 내도록 맞췄다.
+    입력은 ultralytics와 같이 BGR 이미지로 간주한다.
+    """
+    def __init__(self, onnx_path: str, backend: str = "onnxruntime", imgsz: int = 640,
+                 conf_threshold: float = 0.25, iou_threshold: float = 0.7, max_det: int = 300):
+        self.__backend = backend
+        self.__imgsz = imgsz
+        self.__conf_threshold = conf_threshold
+        self.__iou_threshold = iou_threshold
+        self.__max_det = max_det
+
+        # ultralytics가 export할 때 메타데이터에 클래스 이름을 저장해 둠 (모든 백엔드에서 같은 names를 사용)
+        metadata = read_onnx_metadata(onnx_path)
+        self.names = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+
+        if backend == "onnxruntime":
+            import onnxruntime as ort
+
+            self.__session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+            self.__input_name = self.__session.get_inputs()[0].name
+        elif backend == "openvino":
+            import openvino as ov
+
+            self.__compiled = ov.Core().compile_model(onnx_path, "CPU")
+            self.__output = self.__compiled.output(0)
+        elif backend == "opencv":
+            self.__net = cv2.dnn.readNetFromONNX(onnx_path)
+        else:
+            raise ValueError(f"지원하지 않는 ONNX 백엔드입니다: {backend}")
+
+    def __call__(self, images, **kwargs) -> list[DetectionResult]:
+        if isinstance(images, np.ndarray):
+            images = [images]
+
+        blobs, transforms = [], []
+        for image in images:
+            blob, transform = self.__letterbox(image)
+            blobs.append(blob)
+            transforms.append(transform)
+
+        outputs = self.__infer(np.stack(blobs))
+
+        return [self.__postprocess(output, image.shape, transform) for output, image, transform in zip(outputs, images, transforms)]
+
+    def __letterbox(self, image: np.ndarray):
+        """비율을 유지하여 imgsz 정사각형 안에 넣고 남는 부분은 회색(114)으로 채움 (ultralytics LetterBox와 동일)"""
+        h, w = image.shape[:2]
+        ratio = min(self.__imgsz / h, self.__imgsz / w)
+        new_w, new_h = round(w * ratio), round(h * ratio)
+        pad_w, pad_h = (self.__imgsz - new_w) / 2, (self.__imgsz - new_h) / 2
+
+        if (new_w, new_h) != (w, h):
+            image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+        top, bottom = round(pad_h - 0.1), round(pad_h + 0.1)
+        left, right = round(pad_w - 0.1), round(pad_w + 0.1)
+        image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+        # BGR -> RGB, HWC -> CHW, 0~1 정규화
+        blob = image[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+        return blob, (ratio, left, top)
+
+    def __infer(self, batch: np.ndarray) -> np.ndarray:
+        """(B, 3, imgsz, imgsz) -> (B, 4 + 클래스 수, 후보 수)"""
+        if self.__backend == "onnxruntime":
+            return self.__session.run(None, {self.__input_name: batch})[0]
+
+        if self.__backend == "openvino":
+            return self.__compiled([batch])[self.__output]
+
+        # cv2.dnn은 동적 배치를 안정적으로 지원하지 않으므로 한 장씩 실행
+        outputs = []
+        for blob in batch:
+            self.__net.setInput(blob[None])
+            outputs.append(self.__net.forward()[0])
+        return np.stack(outputs)
+
+    def __postprocess(self, output: np.ndarray, image_shape: tuple, transform: tuple) -> DetectionResult:
+        ratio, left, top = transform
+
+        prediction = output.T # (후보 수, 4 + 클래스 수)
+        scores = prediction[:, 4:]
+        cls = scores.argmax(axis=1)
+        conf = scores[np.arange(len(scores)), cls]
+
+        keep = conf > self.__conf_threshold
+        prediction, cls, conf = prediction[keep], cls[keep], conf[keep]
+
+        # cx, cy, w, h -> x1, y1, x2, y2
+        xyxy = np.empty((len(prediction), 4), dtype=np.float32)
+        xyxy[:, 0] = prediction[:, 0] - prediction[:, 2] / 2
+        xyxy[:, 1] = prediction[:, 1] - prediction[:, 3] / 2
+        xyxy[:, 2] = prediction[:, 0] + prediction[:, 2] / 2
+        xyxy[:, 3] = prediction[:, 1] + prediction[:, 3] / 2
+
+        keep = non_max_suppression(xyxy, conf, cls, self.__iou_threshold)[:self.__max_det]
+        xyxy, conf, cls = xyxy[keep], conf[keep], cls[keep]
+
+        # letterbox 좌표 -> 원본 이미지 좌표
+        xyxy -= np.array([left, top, left, top], dtype=np.float32)
+        xyxy /= ratio
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, image_shape[1])
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, image_shape[0])
+
+        return DetectionResult(DetectionBoxes(xyxy, conf.astype(np.float32), cls.astype(np.float32)), self.names)
+
+def check_parity(reference, candidate, images: list[np.ndarray], iou_threshold: float = 0.5) -> dict:
+    """
+    두 검출기(보통 PyTorch 원본과 ONNX 백엔드)의 결과를 같은 이미지들에서 비교
+
+    같은 클래스끼리 IoU가 iou_threshold 이상인 박스를 신뢰도 순으로 짝지어
+    재현율(원본 박스 중 짝이 있는 비율), 정밀도, 평균 IoU, 평균 신뢰도 차이, 이미지당 지연 시간을 계산한다.
+    """
+    matched, ref_total, cand_total = 0, 0, 0
+    ious, conf_diffs = [], []
+    ref_ms, cand_ms = 0.0, 0.0
+
+    for image in images:
+        started = time.perf_counter()
+        ref_xyxy, ref_conf, ref_cls = detection_arrays(reference(image)[0])
+        ref_ms += (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        cand_xyxy, cand_conf, cand_cls = detection_arrays(candidate(image)[0])
+        cand_ms += (time.perf_counter() - started) * 1000
+
+        ref_total += len(ref_xyxy)
+        cand_total += len(cand_xyxy)
+        used = np.zeros(len(cand_xyxy), dtype=bool)
+
+        for i in np.argsort(-ref_conf):
+            if len(cand_xyxy) == 0:
+                break
+            overlap = box_iou(ref_xyxy[i], cand_xyxy)
+            overlap[(cand_cls != ref_cls[i]) | used] = 0
+            j = int(overlap.argmax())
+            if overlap[j] >= iou_threshold:
+                used[j] = True
+                matched += 1
+                ious.append(float(overlap[j]))
+                conf_diffs.append(abs(float(ref_conf[i]) - float(cand_conf[j])))
+
+    count = max(len(images), 1)
+    return {
+        "images": len(images),
+        "recall": matched / ref_total if ref_total else 1.0,
+        "precision": matched / cand_total if cand_total else 1.0,
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+        "mean_conf_diff": float(np.mean(conf_diffs)) if conf_diffs else 0.0,
+        "reference_ms_per_image": ref_ms / count,
+        "candidate_ms_per_image": cand_ms / count
+    }
+
+if(__name__ == "__main__"):
+    # 사용 예) fastapi 폴더에서
+    # python -m MaterialAndNutritionOCR.YoloBackend MaterialAndNutritionOCR/nutrition_yolo.pt onnxruntime ../1.jpg ../2.png
+    import sys
+
+    pt_path, backend = sys.argv[1], sys.argv[2]
+    int8 = "--int8" in sys.argv
+    image_paths = [p for p in sys.argv[3:] if p != "--int8"]
+
+    reference = load_detector(pt_path, "ultralytics")
+    candidate = load_detector(pt_path, backend, int8=int8)
+
+    images = [cv2.imread(p) for p in image_paths]
+    print(check_parity(reference, candidate, images))
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, File, UploadFile, Form, Header, HTTPException, Depends, status
+from fastapi import FastAPI, File, UploadFile, Form, Header, HTTPException, Depends, status, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
@@ -6,8 +6,10 @@ import os
 import sys
 import json
 import logging
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List
-import cv2
 import numpy as np
 from dotenv import load_dotenv
 from pydantic import BaseModel
@@ -19,7 +21,15 @@ CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, CURRENT_DIR)
 
 # MaterialAndNutritionOCR 모듈 임포트
-from MaterialAndNutritionOCR.MaterialAndNutritionImageToText import MaterialAndNutritionImageToText
+from MaterialAndNutritionOCR.MaterialAndNutritionImageToText import MaterialAndNutritionImageToText, BRANCHES
+from MaterialAndNutritionOCR.OCRProcessPool import OCRProcessPool, OCRPoolBusyError
+from MaterialAndNutritionOCR.OCRResultCache import OCRResultCache
+from MaterialAndNutritionOCR.ImageIngest import ImageIngest
+from MaterialAndNutritionOCR.BufferPool import BufferPool
+from MaterialAndNutritionOCR.ImageQualityGate import ImageQualityGate, ImageQualityError, BLURRY, TOO_DARK, OVEREXPOSED, GLARE, NO_LABEL
+from MaterialAndNutritionOCR.FrameStream import FrameChangeDetector, ResultFusion, StreamStats
+from MaterialAndNutritionOCR.AllergenIndex import ALLERGEN_MAPPING  # 알레르기 매핑 (한글 ↔ 영문)
+from MaterialAndNutritionOCR.PreforkServer import memory_usage
 
 # RAG 모듈 임포트 (v1JJickMuck-main에서)
 sys.path.insert(0, os.path.join(CURRENT_DIR, "v1JJickMuck-main", "fastapi"))
@@ -53,11 +63,167 @@ logger = logging.getLogger(__name__)
 
 # 전역 모델 변수
 ocr_model = None
+ocr_engine = None  # OCR_WORKERS > 0 일 때 사용하는 OCR 워커 프로세스 풀
+ocr_ready = False  # 모델 로드 + 워밍업이 끝났는지 (/ready)
+ocr_startup_stats = {}  # 모델별 로드 / 워밍업 시간
+ocr_startup_error = None  # 모델 로드 실패 시 오류 메시지
+ocr_branch_counts = {}  # 실행한 OCR 분석 분기 조합별 요청 수 ("nutrition+material" 등)
+ocr_request_bytes = {"last": 0, "peak": 0}  # 요청 하나가 들고 있는 업로드 바이트 + 디코딩 프레임 바이트 (마지막 / 최대)
+ocr_batch_counts = {"requests": 0, "images": 0, "chunks": 0, "failed_images": 0}  # /api/ocr/batch 처리 수
+ocr_stream_stats = StreamStats()  # /ws/ocr/stream 프레임 처리 수
 rag_service = None
 gpt_service = None
 security = HTTPBearer()
 API_KEY = os.getenv("API_KEY", "your-fastapi-secret-key")
 
+# OCR 실행 옵션
+OCR_RECOGNITION_ONLY = os.getenv("OCR_RECOGNITION_ONLY", "false").lower() == "true"  # YOLO crop을 EasyOCR 텍스트 검출기 없이 바로 인식
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0"))  # OCR 워커 프로세스 수 (0이면 서버 프로세스 안의 스레드에서 실행)
+OCR_MAX_PENDING = int(os.getenv("OCR_MAX_PENDING", "16"))  # 처리 중 + 대기 중인 OCR 요청 최대 수 (넘으면 503)
+OCR_BATCH_WINDOW_MS = float(os.getenv("OCR_BATCH_WINDOW_MS", "0"))  # 동시 요청의 YOLO 검출을 묶는 대기 시간 (0이면 묶지 않음)
+OCR_BATCH_MAX_SIZE = int(os.getenv("OCR_BATCH_MAX_SIZE", "8"))  # YOLO 검출 배치 최대 크기
+# 서버 프로세스 안에서 OCR을 실행할 스레드 수
+# YOLO 모델은 여러 스레드에서 동시에 호출하면 안전하지 않으므로, 검출 배치 스케줄러를 쓸 때만 여러 스레드를 사용
+OCR_THREADS = int(os.getenv("OCR_THREADS", "4")) if OCR_BATCH_WINDOW_MS > 0 else 1
+OCR_INGEST_THREADS = int(os.getenv("OCR_INGEST_THREADS", "2"))  # 업로드 이미지 디코딩 / 품질 검사 / 캐시 조회를 이벤트 루프 밖에서 실행할 스레드 수
+OCR_CACHE_ENTRIES = int(os.getenv("OCR_CACHE_ENTRIES", "1024"))  # OCR 결과 캐시 최대 항목 수 (0이면 캐시 사용 안 함)
+OCR_CACHE_MAX_MB = float(os.getenv("OCR_CACHE_MAX_MB", "64"))  # OCR 결과 캐시 최대 크기 (MB)
+OCR_CACHE_TTL_SECONDS = float(os.getenv("OCR_CACHE_TTL_SECONDS", "3600"))  # OCR 결과 캐시 유효 시간 (초)
+OCR_CACHE_PHASH_DISTANCE = int(os.getenv("OCR_CACHE_PHASH_DISTANCE", "-1"))  # 거의 같은 사진으로 볼 perceptual hash 해밍 거리 (-1이면 사용 안 함)
+OCR_DETECT_SIZE = int(os.getenv("OCR_DETECT_SIZE", "640"))  # YOLO 입력 크기 (원본이 이 크기의 2배 이상이면 검출용 프레임을 축소)
+OCR_MIN_SIDE = int(os.getenv("OCR_MIN_SIDE", "0"))  # OCR crop용 프레임을 축소 디코딩할 때 유지할 최소 긴 변 (0이면 원본 해상도)
+OCR_YOLO_BACKEND = os.getenv("OCR_YOLO_BACKEND", "ultralytics")  # YOLO 실행 백엔드 (ultralytics | onnxruntime | openvino | opencv)
+OCR_YOLO_INT8 = os.getenv("OCR_YOLO_INT8", "false").lower() == "true"  # ONNX 백엔드에서 INT8 양자화 모델 사용
+OCR_RECOGNIZER_QUANTIZATION = os.getenv("OCR_RECOGNIZER_QUANTIZATION", "dynamic")  # EasyOCR 인식기 양자화 (none | dynamic | static)
+OCR_TILE_SIZE = int(os.getenv("OCR_TILE_SIZE", "0"))  # 영양성분 타일 검출의 타일 크기 (원본 px, 0이면 사용 안 함)
+OCR_TILE_OVERLAP = float(os.getenv("OCR_TILE_OVERLAP", "0.2"))  # 이웃한 타일끼리 겹치는 비율
+OCR_TILE_MIN_MEGAPIXELS = float(os.getenv("OCR_TILE_MIN_MEGAPIXELS", "8"))  # 원본이 이 크기(MP) 이상일 때만 타일 검출
+OCR_CROP_PRUNING = os.getenv("OCR_CROP_PRUNING", "true").lower() == "true"  # 검출과 OCR 사이에서 읽을 필요 없는 박스를 걸러냄
+OCR_PRUNE_MIN_CONFIDENCE = float(os.getenv("OCR_PRUNE_MIN_CONFIDENCE", "0.3"))  # 이 신뢰도보다 낮은 박스는 OCR하지 않음
+OCR_PRUNE_MIN_SIZE = int(os.getenv("OCR_PRUNE_MIN_SIZE", "8"))  # 너비 또는 높이가 이보다 작은(px) 박스는 OCR하지 않음
+OCR_PRUNE_IOU = float(os.getenv("OCR_PRUNE_IOU", "0.6"))  # 더 높은 신뢰도 박스와 IoU가 이보다 크면 중복으로 봄
+OCR_PRUNE_CONTAINMENT = float(os.getenv("OCR_PRUNE_CONTAINMENT", "0.9"))  # 면적의 이 비율 이상이 다른 박스 안에 들어가면 중복으로 봄
+OCR_PRUNE_MAX_CROPS = int(os.getenv("OCR_PRUNE_MAX_CROPS", "64"))  # 이미지 하나에서 영양성분 / 원재료 각각 OCR할 최대 crop 수
+OCR_NUTRITION_VALUE_CLASSES = tuple(int(c) for c in os.getenv("OCR_NUTRITION_VALUE_CLASSES", "").split(",") if c.strip())  # 수치 crop을 검출하는 영양성분 YOLO 클래스 번호 (숫자 / 단위 문자로만 디코딩)
+OCR_EARLY_STOP = os.getenv("OCR_EARLY_STOP", "false").lower() == "true"  # 영양성분 항목이 모두 확정되면 남은 영양성분 crop은 인식하지 않음
+OCR_EARLY_STOP_MIN_CONFIDENCE = float(os.getenv("OCR_EARLY_STOP_MIN_CONFIDENCE", "0.6"))  # 항목을 확정하기 위한 최소 OCR 신뢰도
+OCR_EARLY_STOP_MIN_SIMILARITY = float(os.getenv("OCR_EARLY_STOP_MIN_SIMILARITY", "0.85"))  # 항목을 확정하기 위한 최소 패턴 매칭 유사도
+OCR_EARLY_STOP_CHUNK = int(os.getenv("OCR_EARLY_STOP_CHUNK", "4"))  # 한 번에 인식할 영양성분 crop 수
+OCR_LAYOUT_PARSER = os.getenv("OCR_LAYOUT_PARSER", "true").lower() == "true"  # 박스 위치로 영양성분 표의 라벨 셀과 수치 셀을 짝지어 파싱
+OCR_CONCURRENT_BRANCHES = os.getenv("OCR_CONCURRENT_BRANCHES", "false").lower() == "true"  # 영양성분 / 원재료 YOLO 검출을 요청 안에서 동시에 실행
+OCR_QUALITY_GATE = os.getenv("OCR_QUALITY_GATE", "flag").lower()  # 검출 전 사진 품질 검사 (off | flag: 결과에 품질 정보만 추가 | reject: 422로 재촬영 요청)
+OCR_QUALITY_MIN_SHARPNESS = float(os.getenv("OCR_QUALITY_MIN_SHARPNESS", "60"))  # 라플라시안 분산이 이보다 작으면 흐린 사진
+OCR_QUALITY_MIN_BRIGHTNESS = float(os.getenv("OCR_QUALITY_MIN_BRIGHTNESS", "40"))  # 평균 밝기가 이보다 작으면 어두운 사진
+OCR_QUALITY_MAX_BRIGHTNESS = float(os.getenv("OCR_QUALITY_MAX_BRIGHTNESS", "225"))  # 평균 밝기가 이보다 크고 경계(글자)도 거의 없으면 과다 노출
+OCR_QUALITY_MAX_GLARE = float(os.getenv("OCR_QUALITY_MAX_GLARE", "0.05"))  # 안에 글자가 없는 포화 덩어리의 면적 비율이 이보다 크면 빛 반사
+OCR_QUALITY_MIN_GLARE_BLOB = float(os.getenv("OCR_QUALITY_MIN_GLARE_BLOB", "0.01"))  # 빛 반사로 볼 포화 덩어리 하나의 최소 면적 비율
+OCR_QUALITY_MAX_GLARE_TEXTURE = float(os.getenv("OCR_QUALITY_MAX_GLARE_TEXTURE", "0.02"))  # 포화 덩어리 안의 경계 픽셀 비율이 이보다 작으면 글자가 없는 빛 반사
+OCR_QUALITY_MIN_EDGE_DENSITY = float(os.getenv("OCR_QUALITY_MIN_EDGE_DENSITY", "0.01"))  # 경계 픽셀 비율이 이보다 작으면 라벨(글자)이 없는 사진
+OCR_CROP_NORMALIZATION = os.getenv("OCR_CROP_NORMALIZATION", "false").lower() == "true"  # 인식 전에 crop의 글자 줄 높이 / 기울기 / 대비를 맞추고 긴 줄을 나눔
+OCR_NORMALIZE_MIN_LINE_HEIGHT = int(os.getenv("OCR_NORMALIZE_MIN_LINE_HEIGHT", "32"))  # 글자 줄이 이보다 낮은 crop은 키움
+OCR_NORMALIZE_MAX_LINE_HEIGHT = int(os.getenv("OCR_NORMALIZE_MAX_LINE_HEIGHT", "64"))  # 글자 줄이 이보다 높은 crop은 줄임
+OCR_NORMALIZE_MAX_SKEW = float(os.getenv("OCR_NORMALIZE_MAX_SKEW", "0"))  # 이 각도(도) 이하로 기울어진 crop을 수평으로 보정 (0이면 사용 안 함)
+OCR_NORMALIZE_CONTRAST = os.getenv("OCR_NORMALIZE_CONTRAST", "false").lower() == "true"  # 흑백 crop에 CLAHE 대비 정규화 적용
+OCR_NORMALIZE_STRIP_WIDTH = int(os.getenv("OCR_NORMALIZE_STRIP_WIDTH", "512"))  # 인식기 입력(64px 높이)에서 이보다 긴 줄은 단어 사이에서 나눠서 인식 (0이면 사용 안 함)
+OCR_CASCADE = os.getenv("OCR_CASCADE", "false").lower() == "true"  # 축소 프레임에서 라벨(글자가 빽빽한) 영역을 먼저 찾고 두 YOLO는 그 영역에서만 검출
+OCR_CASCADE_MIN_CHARS = int(os.getenv("OCR_CASCADE_MIN_CHARS", "30"))  # 라벨 영역으로 볼 글자 블록의 최소 글자(연결 요소) 수
+OCR_CASCADE_MAX_COVERAGE = float(os.getenv("OCR_CASCADE_MAX_COVERAGE", "0.7"))  # 라벨 영역이 프레임의 이 비율 이상이면 프레임 전체를 검출
+OCR_BATCH_MAX_IMAGES = int(os.getenv("OCR_BATCH_MAX_IMAGES", "32"))  # /api/ocr/batch 요청 하나에 보낼 수 있는 최대 이미지 수
+OCR_BATCH_CHUNK_SIZE = int(os.getenv("OCR_BATCH_CHUNK_SIZE", "8"))  # /api/ocr/batch에서 한 번에 디코딩 + 검출 + 인식할 이미지 수
+OCR_STREAM_CHANGE_THRESHOLD = float(os.getenv("OCR_STREAM_CHANGE_THRESHOLD", "4"))  # 마지막으로 OCR한 프레임과의 썸네일 차이(0 ~ 255)가 이보다 작으면 건너뜀
+OCR_STREAM_MIN_VOTES = int(os.getenv("OCR_STREAM_MIN_VOTES", "2"))  # 영양성분 값 / 원재료를 결과에 넣기 위해 같은 값을 읽어야 하는 프레임 수
+OCR_STREAM_MIN_AGREEMENT = float(os.getenv("OCR_STREAM_MIN_AGREEMENT", "0.6"))  # 영양성분 값을 확정하기 위한 최소 신뢰도 비율
+OCR_STREAM_PATIENCE = int(os.getenv("OCR_STREAM_PATIENCE", "2"))  # 합친 결과가 이 프레임 수만큼 바뀌지 않으면 수렴
+OCR_STREAM_MAX_FRAME_KB = int(os.getenv("OCR_STREAM_MAX_FRAME_KB", "512"))  # 스트리밍 프레임 하나의 최대 크기 (KB, 미리보기 크기의 프레임만 받음)
+OCR_BUFFER_POOL_MB = float(os.getenv("OCR_BUFFER_POOL_MB", "64"))  # 요청마다 만들던 중간 이미지 버퍼를 재사용할 풀 크기 (0이면 사용 안 함)
+OCR_PARALLEL_LOAD = os.getenv("OCR_PARALLEL_LOAD", "true").lower() == "true"  # YOLO 2개 + EasyOCR를 동시에 로드
+OCR_PRELOAD_WORKERS = int(os.getenv("OCR_PRELOAD_WORKERS", "0"))  # master가 모델을 로드한 뒤 fork할 서버 워커 수 (0이면 사용 안 함, python main.py로 실행)
+OCR_TORCH_THREADS = int(os.getenv("OCR_TORCH_THREADS", "0"))  # OCR_WORKERS / OCR_PRELOAD_WORKERS의 워커별 torch 스레드 수 (0이면 CPU 코어 수 / 워커 수)
+OCR_MEMORY_REPORT_SECONDS = float(os.getenv("OCR_MEMORY_REPORT_SECONDS", "60"))  # master가 워커별 메모리 사용량을 로그로 남기는 주기 (0이면 사용 안 함)
+
+# MaterialAndNutritionImageToText 생성 옵션 (서버 프로세스 / 워커 프로세스 공통)
+OCR_MODEL_KWARGS = {
+    "RECOGNITION_ONLY": OCR_RECOGNITION_ONLY,
+    "YOLO_BACKEND": OCR_YOLO_BACKEND,
+    "YOLO_INT8": OCR_YOLO_INT8,
+    "RECOGNIZER_QUANTIZATION": OCR_RECOGNIZER_QUANTIZATION,
+    "TILE_SIZE": OCR_TILE_SIZE,
+    "TILE_OVERLAP": OCR_TILE_OVERLAP,
+    "TILE_MIN_MEGAPIXELS": OCR_TILE_MIN_MEGAPIXELS,
+    "CROP_PRUNING": {
+        "min_confidence": OCR_PRUNE_MIN_CONFIDENCE,
+        "min_width": OCR_PRUNE_MIN_SIZE,
+        "min_height": OCR_PRUNE_MIN_SIZE,
+        "iou_threshold": OCR_PRUNE_IOU,
+        "containment_threshold": OCR_PRUNE_CONTAINMENT,
+        "max_crops": OCR_PRUNE_MAX_CROPS
+    } if OCR_CROP_PRUNING else None,
+    "VALUE_CLASSES": OCR_NUTRITION_VALUE_CLASSES,
+    "EARLY_STOP": {
+        "min_confidence": OCR_EARLY_STOP_MIN_CONFIDENCE,
+        "min_similarity": OCR_EARLY_STOP_MIN_SIMILARITY,
+        "chunk_size": OCR_EARLY_STOP_CHUNK
+    } if OCR_EARLY_STOP else None,
+    "LAYOUT_PARSER": OCR_LAYOUT_PARSER,
+    "CONCURRENT_BRANCHES": OCR_CONCURRENT_BRANCHES,
+    "BRANCH_THREADS": OCR_THREADS,  # 원재료 검출 스레드는 동시에 OCR을 실행하는 요청 수만큼 (워커 프로세스는 한 번에 한 요청이라 하나만 쓰임)
+    "BUFFER_POOL_MB": OCR_BUFFER_POOL_MB,
+    "CROP_NORMALIZATION": {
+        "min_line_height": OCR_NORMALIZE_MIN_LINE_HEIGHT,
+        "max_line_height": OCR_NORMALIZE_MAX_LINE_HEIGHT,
+        "max_skew": OCR_NORMALIZE_MAX_SKEW,
+        "contrast": OCR_NORMALIZE_CONTRAST,
+        "strip_width": OCR_NORMALIZE_STRIP_WIDTH
+    } if OCR_CROP_NORMALIZATION else None,
+    "CASCADE": {
+        "min_chars": OCR_CASCADE_MIN_CHARS,
+        "max_coverage": OCR_CASCADE_MAX_COVERAGE
+    } if OCR_CASCADE else None
+}
+
+ocr_thread_executor = ThreadPoolExecutor(max_workers=OCR_THREADS, thread_name_prefix="ocr")  # 프로세스 풀을 쓰지 않을 때 OCR을 실행할 스레드
+ocr_ingest_executor = ThreadPoolExecutor(max_workers=max(1, OCR_INGEST_THREADS), thread_name_prefix="ocr-ingest")  # 업로드 이미지 디코딩 + 품질 검사 스레드
+ocr_cache = OCRResultCache(
+    max_entries=OCR_CACHE_ENTRIES,
+    max_bytes=int(OCR_CACHE_MAX_MB * 1024 * 1024),
+    ttl_seconds=OCR_CACHE_TTL_SECONDS,
+    phash_distance=OCR_CACHE_PHASH_DISTANCE
+) if OCR_CACHE_ENTRIES > 0 else None
+ingest_buffer_pool = BufferPool(max_bytes=int(OCR_BUFFER_POOL_MB * 1024 * 1024)) if OCR_BUFFER_POOL_MB > 0 else None  # 검출용 축소 프레임 버퍼
+quality_gate = ImageQualityGate(
+    min_sharpness=OCR_QUALITY_MIN_SHARPNESS,
+    min_brightness=OCR_QUALITY_MIN_BRIGHTNESS,
+    max_brightness=OCR_QUALITY_MAX_BRIGHTNESS,
+    max_glare=OCR_QUALITY_MAX_GLARE,
+    min_edge_density=OCR_QUALITY_MIN_EDGE_DENSITY,
+    min_glare_blob=OCR_QUALITY_MIN_GLARE_BLOB,
+    max_glare_texture=OCR_QUALITY_MAX_GLARE_TEXTURE
+) if OCR_QUALITY_GATE in ("flag", "reject") else None
+
+# 품질 검사 사유 코드별 재촬영 안내 문구
+QUALITY_MESSAGES = {
+    BLURRY: "사진이 흐립니다. 초점을 맞춰 다시 촬영해주세요.",
+    TOO_DARK: "사진이 너무 어둡습니다. 밝은 곳에서 다시 촬영해주세요.",
+    OVEREXPOSED: "사진이 너무 밝습니다. 조명을 줄이고 다시 촬영해주세요.",
+    GLARE: "빛 반사가 심합니다. 각도를 바꿔 다시 촬영해주세요.",
+    NO_LABEL: "라벨이 보이지 않습니다. 영양성분표 / 원재료명이 보이도록 다시 촬영해주세요."
+}
+# OCR 원본 영양성분 키 -> API 응답의 표준화된 키
+NUTRITION_KEYS = {
+    "kcal": "calories",
+    "탄수화물": "carbs",
+    "단백질": "protein",
+    "지방": "fat",
+    "나트륨": "sodium",
+    "당류": "sugar",
+    "포화지방": "saturated_fat",
+    "트랜스지방": "trans_fat",
+    "콜레스테롤": "cholesterol",
+    "총내용량": "total_content",
+    "기준내용량": "serving_size"
+}
+image_ingest = ImageIngest(detect_size=OCR_DETECT_SIZE, ocr_min_side=OCR_MIN_SIDE, buffer_pool=ingest_buffer_pool)
+
 
 # ============================================
 # Pydantic 모델 정의
@@ -91,22 +257,59 @@ class RAGAnalysisRequestBody(BaseModel):
     user_info: dict
 
 
+def create_ocr_model() -> MaterialAndNutritionImageToText:
+    return MaterialAndNutritionImageToText(**OCR_MODEL_KWARGS)
+
+
+async def load_ocr_models():
+    """
+    YOLO + EasyOCR 모델을 로드하고 가상 라벨로 워밍업한 뒤 ocr_ready를 True로 설정
+    - OCR_WORKERS > 0: 워커 프로세스마다 세 모델을 동시에 로드 + 워밍업
+    - OCR_WORKERS = 0: 서버 프로세스에서 세 모델을 동시에 로드 + 워밍업 (이벤트 루프는 막지 않음)
+    """
+    global ocr_model, ocr_engine, ocr_ready, ocr_startup_stats, ocr_startup_error
+
+    try:
+        if OCR_WORKERS > 0:
+            # 워커 프로세스마다 모델을 로드하고 요청을 나눠서 처리
+            engine = OCRProcessPool(
+                workers=OCR_WORKERS,
+                max_pending=OCR_MAX_PENDING,
+                model_kwargs=OCR_MODEL_KWARGS,
+                torch_threads=OCR_TORCH_THREADS
+            )
+            ocr_engine = engine
+            await engine.start()
+            ocr_startup_stats = {"workers": engine.startup_stats}
+            logger.info(f"✅ YOLO + EasyOCR 워커 프로세스 {OCR_WORKERS}개 로드 + 워밍업 완료")
+        else:
+            loop = asyncio.get_running_loop()
+            model = ocr_model  # OCR_PRELOAD_WORKERS > 0이면 fork 전에 master가 로드해 둔 모델
+            if model is None:
+                model = create_ocr_model()
+                await loop.run_in_executor(None, model.load_models, OCR_PARALLEL_LOAD)
+            await loop.run_in_executor(None, model.warmup)
+            if OCR_BATCH_WINDOW_MS > 0:
+                model.enable_detection_batching(OCR_BATCH_WINDOW_MS, OCR_BATCH_MAX_SIZE)
+            ocr_model = model
+            ocr_startup_stats = model.startup_stats()
+            logger.info(f"✅ YOLO + EasyOCR 모델 로드 + 워밍업 완료: {ocr_startup_stats}")
+
+        ocr_ready = True
+    except Exception as e:
+        ocr_startup_error = str(e)
+        logger.error(f"❌ OCR 모델 로드 실패: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """애플리케이션 라이프사이클 관리"""
-    global ocr_model, rag_service, gpt_service
+    global rag_service, gpt_service
     
     logger.info("🚀 FastAPI 서버 시작")
     
-    # 1. YOLO + EasyOCR 모델 로드
-    try:
-        ocr_model = MaterialAndNutritionImageToText()
-        ocr_model.load_nutrition_yolo()
-        ocr_model.load_material_yolo()
-        ocr_model.load_easyocr()
-        logger.info("✅ YOLO + EasyOCR 모델 로드 완료")
-    except Exception as e:
-        logger.error(f"❌ OCR 모델 로드 실패: {e}")
+    # 1. YOLO + EasyOCR 모델 로드 + 워밍업 (백그라운드에서 진행, 끝나기 전까지 /ready는 503)
+    ocr_startup_task = asyncio.create_task(load_ocr_models())
     
     # 2. RAG 서비스 초기화 (RAG 모듈이 로드된 경우만)
     if RAG_AVAILABLE:
@@ -128,6 +331,11 @@ async def lifespan(app: FastAPI):
     
     yield
     
+    ocr_startup_task.cancel()
+    if ocr_engine is not None:
+        ocr_engine.shutdown()
+    ocr_thread_executor.shutdown(wait=False)
+    ocr_ingest_executor.shutdown(wait=False)
     logger.info("👋 FastAPI 서버 종료")
 
 
@@ -166,25 +374,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 알레르기 매핑 (한글 ↔ 영문)
-ALLERGEN_MAPPING = {
-    "밀": ["밀", "wheat", "글루텐", "gluten"],
-    "우유": ["우유", "milk", "유제품", "dairy", "유청", "카제인", "lactose"],
-    "대두": ["대두", "soy", "soybean", "콩"],
-    "돼지고기": ["돼지고기", "pork", "돈육"],
-    "쇠고기": ["쇠고기", "beef", "우육"],
-    "아황산류": ["아황산류", "sulfite", "아황산"],
-    "계란": ["계란", "egg", "난류", "난백", "난황"],
-    "땅콩": ["땅콩", "peanut"],
-    "견과류": ["견과류", "호두", "아몬드", "캐슈넛", "피스타치오", "잣", "nut"],
-    "갑각류": ["새우", "게", "shrimp", "crab", "갑각류"],
-    "조개류": ["조개", "굴", "홍합", "전복", "오징어", "clam", "oyster"],
-    "생선": ["고등어", "연어", "참치", "fish"],
-    "메밀": ["메밀", "buckwheat"],
-    "토마토": ["토마토", "tomato"],
-    "복숭아": ["복숭아", "peach"],
-}
-
 
 def check_allergen_match(detected_materials: list, allergies: list) -> list:
     """원재료와 사용자 알레르기 매칭"""
@@ -247,16 +436,476 @@ def check_diet_warnings(detected_ingredients: List[str], diet_type: str) -> List
     return warnings
 
 
+def ocr_branches_for(user_data: dict) -> tuple:
+    """
+    사용자 정보로 필요한 OCR 분석 분기를 결정
+    - 알레르기나 식단 타입(비건/채식)이 있으면 원재료 분기 (알레르기 / 식단 경고)
+      식단 경고는 check_diet_warnings가 vegan / vegetarian만 보므로, 그 외 식단("none", "normal", 할랄 등)은 식단 없음으로 취급
+    - 질환이나 특수 상태가 있으면 영양성분 분기 (영양성분 수치 기반 분석)
+    - 둘 다 없으면 일반 분석을 위해 두 분기 모두 실행
+    """
+    allergies = [a for a in (user_data.get("allergies") or []) if isinstance(a, str) and a.strip()]
+    diet_type = user_data.get("diet_type")
+    diseases = user_data.get("diseases") or []
+    special_conditions = user_data.get("special_conditions") or []
+
+    branches = []
+    if diseases or special_conditions:
+        branches.append("nutrition")
+    if allergies or diet_type in ("vegan", "vegetarian"):
+        branches.append("material")
+
+    return tuple(branches) if branches else BRANCHES
+
+
+def parse_ocr_branches(value: Optional[str]) -> tuple:
+    """
+    "nutrition,material" 형식의 분기 목록을 BRANCHES 순서의 tuple로 변환 (비어 있으면 모든 분기)
+
+    Raises:
+        ValueError: 알 수 없는 분기 이름이 있을 때
+    """
+    if not value or not value.strip():
+        return BRANCHES
+
+    names = {name.strip().lower() for name in value.split(",") if name.strip()}
+    unknown = names - set(BRANCHES)
+    if unknown:
+        raise ValueError(f"알 수 없는 분기: {', '.join(sorted(unknown))} (사용 가능: {', '.join(BRANCHES)})")
+
+    return tuple(branch for branch in BRANCHES if branch in names)
+
+
+def select_ocr_branches(ocr_output: tuple, branches: tuple) -> tuple:
+    """두 분기를 모두 실행한 결과(캐시 등)에서 요청한 분기의 결과만 남김"""
+    nutrition_result, material_result = ocr_output
+    return (
+        nutrition_result if "nutrition" in branches else {},
+        material_result if "material" in branches else []
+    )
+
+
+async def run_ocr(image: np.ndarray, detect_image: Optional[np.ndarray] = None, branches: tuple = BRANCHES):
+    """
+    YOLO + EasyOCR 실행을 이벤트 루프 밖으로 넘겨서 기다림
+    - OCR_WORKERS > 0: OCR 워커 프로세스 풀에서 실행 (이미지는 공유 메모리로 전달)
+    - OCR_WORKERS = 0: 서버 프로세스의 OCR 전용 스레드에서 실행
+    - detect_image가 주어지면 YOLO는 축소된 detect_image에서 실행하고 crop은 image에서 만듦
+    - branches에 없는 분기("nutrition" / "material")는 YOLO 검출과 OCR을 건너뜀
+    """
+    if ocr_engine is not None:
+        return await ocr_engine.execute(image, detect_image, branches)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ocr_thread_executor, ocr_model.execute, image, detect_image, branches)
+
+
+async def run_ocr_batch(images: list, detect_images: list, branches: tuple = BRANCHES) -> list:
+    """
+    여러 이미지의 YOLO + EasyOCR를 한 번에 실행 (run_ocr의 배치 버전)
+    - OCR_WORKERS > 0: 워커 프로세스 하나에서 실행 (이미지들은 공유 메모리 하나로 전달)
+    - 검출은 이미지별로 하되(검출 배치가 켜져 있으면 한 배치로 묶임), 모든 이미지의 crop을 한 번의 배치 인식으로 처리
+
+    Returns:
+        list: 이미지별 (nutrition_result, material_result), 오류가 난 이미지는 그 예외 객체
+    """
+    if ocr_engine is not None:
+        return await ocr_engine.execute_batch(images, detect_images, branches)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ocr_thread_executor, ocr_model.execute_batch, images, detect_images, branches)
+
+
+async def await_ocr_and_release(job, ingested: list):
+    """
+    run_ocr / run_ocr_batch 코루틴(job)을 기다리고, OCR 작업이 끝나면 ingested의 검출용 축소 프레임 버퍼를 풀에 반납
+    - 기다리던 요청이 취소(클라이언트 연결 종료 등)되어도 스레드 / 워커에서 실행 중인 OCR은 멈추지 않으므로,
+      버퍼는 취소된 시점이 아니라 작업이 실제로 끝났을 때 반납함 (실행 중인 YOLO의 입력을 다음 요청이 덮어쓰지 않도록)
+    - 호출한 뒤에는 ingested의 버퍼를 반납하거나 읽으면 안 됨 (반납은 이 함수가 맡음)
+    """
+    task = asyncio.ensure_future(job)
+
+    def release(task):
+        # 취소되어 아무도 결과를 받지 않는 작업의 예외가 "never retrieved" 경고로 남지 않도록 꺼내 둠
+        if not task.cancelled():
+            task.exception()
+        for item in ingested:
+            image_ingest.release(item)
+
+    task.add_done_callback(release)
+    return await asyncio.shield(task)
+
+
+class OCRNotReadyError(Exception):
+    """
+    모델 로드 + 워밍업이 끝나기 전이나 로드에 실패한 뒤에 OCR 요청이 들어왔을 때 발생 (503으로 응답)
+    대기열 초과(OCRPoolBusyError)와는 원인과 안내 문구가 다르므로 따로 처리함
+    """
+    pass
+
+
+def ocr_not_ready_message() -> str:
+    """OCR 모델을 쓸 수 없을 때 사용자에게 보여줄 안내 문구 (준비 중 / 로드 실패)"""
+    if ocr_startup_error:
+        return "OCR 모델을 불러오지 못해 분석할 수 없습니다. 관리자에게 문의해주세요."
+    return "OCR 모델을 준비하는 중입니다. 잠시 후 다시 시도해주세요."
+
+
+def quality_message(reasons: list) -> str:
+    """품질 검사 사유 코드들을 사용자에게 보여줄 재촬영 안내 문구로 변환"""
+    return " ".join(QUALITY_MESSAGES[reason] for reason in reasons if reason in QUALITY_MESSAGES)
+
+
+def count_ocr_request(branches: tuple, images: int = 1):
+    """실행한 분석 분기 조합별 이미지 수 (/api/ocr/stats의 branches)"""
+    branch_key = "+".join(branches)
+    ocr_branch_counts[branch_key] = ocr_branch_counts.get(branch_key, 0) + images
+
+
+def record_request_bytes(request_bytes: int):
+    """요청 하나가 들고 있는 업로드 바이트 + 디코딩 프레임 바이트 (/api/ocr/stats의 buffers.request_bytes)"""
+    ocr_request_bytes["last"] = request_bytes
+    ocr_request_bytes["peak"] = max(ocr_request_bytes["peak"], request_bytes)
+
+
+def lookup_ocr_cache(image_bytes: bytes, branches: tuple) -> tuple:
+    """
+    업로드 바이트(SHA-256)로 결과 캐시 조회
+    (캐시 키는 SHA-256 + 분기, 두 분기를 모두 실행한 결과는 어떤 분기 요청에도 사용할 수 있음)
+
+    Returns:
+        (digest, 요청한 분기만 남긴 캐시 결과 또는 None), 캐시를 쓰지 않으면 (None, None)
+    """
+    if ocr_cache is None:
+        return None, None
+
+    digest = ocr_cache.digest(image_bytes)
+    cached = ocr_cache.get(digest if branches == BRANCHES else f"{digest}:{'+'.join(branches)}")
+    if cached is None and branches != BRANCHES:
+        cached = ocr_cache.get(digest)
+
+    return digest, (select_ocr_branches(cached, branches) if cached is not None else None)
+
+
+def check_image_quality(ingested) -> Optional[dict]:
+    """
+    검출용 축소 프레임으로 사진 품질 검사
+
+    Returns:
+        품질 검사 결과 dict (품질 검사를 하지 않으면 None)
+
+    Raises:
+        ImageQualityError: OCR_QUALITY_GATE=reject이고 기준에 못 미칠 때
+    """
+    if quality_gate is None:
+        return None
+
+    report = quality_gate.check(ingested.detect_image)
+    if not report.ok:
+        logger.info(f"📉 사진 품질 미달: {', '.join(report.reasons)} ({report.elapsed_ms:.1f}ms)")
+        if OCR_QUALITY_GATE == "reject":
+            raise ImageQualityError(report)
+
+    return report.to_dict()
+
+
+def lookup_similar_ocr_cache(ingested, branches: tuple) -> tuple:
+    """
+    perceptual hash로 거의 같은 사진의 결과 조회
+
+    Returns:
+        (phash, 요청한 분기만 남긴 캐시 결과 또는 None), 유사 이미지 조회를 쓰지 않으면 (None, None)
+    """
+    if ocr_cache is None or not ocr_cache.uses_perceptual_hash:
+        return None, None
+
+    phash = ocr_cache.perceptual_hash(ingested.detect_image)
+    cached = ocr_cache.get_similar(phash)
+    return phash, (select_ocr_branches(cached, branches) if cached is not None else None)
+
+
+def store_ocr_cache(digest: Optional[str], phash, ocr_output: tuple, branches: tuple):
+    """OCR 결과를 캐시에 등록"""
+    if ocr_cache is None:
+        return
+
+    # 유사 이미지 조회는 분기를 구분하지 않으므로 두 분기를 모두 실행한 결과만 perceptual hash로 등록
+    if branches == BRANCHES:
+        ocr_cache.put(digest, ocr_output, phash)
+    else:
+        ocr_cache.put(f"{digest}:{'+'.join(branches)}", ocr_output)
+
+
+def ingest_ocr_image(image_bytes: bytes, branches: tuple) -> tuple:
+    """
+    OCR 전 단계: 결과 캐시 조회 -> 디코딩 -> 품질 검사 -> 유사 이미지 캐시 조회
+    수 MB 사진의 디코딩은 수백 ms가 걸리므로 이벤트 루프가 아니라 ocr_ingest_executor 스레드에서 실행함
+
+    Returns:
+        (digest, 캐시 결과 또는 None, IngestedImage 또는 None, 품질 검사 결과 dict, phash)
+        - 결과 캐시에 있으면 디코딩하지 않으므로 IngestedImage는 None
+        - 디코딩할 수 없으면 캐시 결과와 IngestedImage 모두 None
+        - 유사 이미지 캐시에 있으면 캐시 결과와 IngestedImage를 함께 반환 (호출한 쪽에서 버퍼를 반납)
+
+    Raises:
+        ImageQualityError: OCR_QUALITY_GATE=reject이고 기준에 못 미칠 때 (버퍼는 반납한 뒤 발생)
+    """
+    digest, cached = lookup_ocr_cache(image_bytes, branches)
+    if cached is not None:
+        return digest, cached, None, None, None
+
+    # 해상도에 맞춰 디코딩 (YOLO는 축소 프레임에서 검출, crop은 고해상도 프레임에서 생성)
+    ingested = image_ingest.decode(image_bytes)
+    if ingested is None:
+        return digest, None, None, None, None
+
+    try:
+        quality = check_image_quality(ingested)
+        phash, cached = lookup_similar_ocr_cache(ingested, branches)
+    except Exception:
+        image_ingest.release(ingested)
+        raise
+
+    return digest, cached, ingested, quality, phash
+
+
+async def ocr_from_bytes(image_bytes: bytes, branches: tuple = BRANCHES):
+    """
+    업로드된 이미지 바이트로 OCR 실행 (결과 캐시 포함)
+    - 같은 바이트(SHA-256)의 결과가 캐시에 있으면 디코딩 없이 바로 반환
+    - perceptual hash 조회가 켜져 있으면 디코딩 후 거의 같은 사진의 결과도 재사용
+    - 디코딩한 검출용 축소 프레임으로 사진 품질을 먼저 검사하고,
+      OCR_QUALITY_GATE=reject이면 흐리거나 어둡거나 라벨이 없는 사진은 YOLO / OCR 없이 ImageQualityError를 발생시킴
+    - branches에 없는 분기는 실행하지 않고 영양성분 {}, 원재료 []로 반환
+
+    Returns:
+        ((nutrition_result, material_result), 품질 검사 결과 dict), 이미지를 디코딩할 수 없으면 (None, None)
+        (품질 검사를 하지 않았거나 캐시에서 바로 반환하면 품질 검사 결과는 None)
+    """
+    if not ocr_ready:
+        raise OCRNotReadyError(ocr_startup_error or "OCR 모델을 준비하는 중입니다.")
+
+    count_ocr_request(branches)
+
+    loop = asyncio.get_running_loop()
+    digest, cached, ingested, quality, phash = await loop.run_in_executor(ocr_ingest_executor, ingest_ocr_image, image_bytes, branches)
+
+    if ingested is None:
+        if cached is not None:
+            logger.info("⚡ OCR 캐시 적중")
+            return cached, None
+        return None, None
+
+    record_request_bytes(len(image_bytes) + ingested.nbytes)
+
+    if cached is not None:
+        # 검출용 축소 프레임 버퍼를 다음 요청이 재사용하도록 반납
+        image_ingest.release(ingested)
+        logger.info("⚡ OCR 캐시 적중 (유사 이미지)")
+        return cached, quality
+
+    # 버퍼는 OCR 작업이 끝난 뒤에 반납됨 (요청이 취소되어도 작업이 끝날 때까지 유지)
+    ocr_output = await await_ocr_and_release(run_ocr(ingested.image, ingested.detect_image, branches), [ingested])
+
+    store_ocr_cache(digest, phash, ocr_output, branches)
+
+    return ocr_output, quality
+
+
+async def ocr_batch_from_bytes(images_bytes: list, branches: tuple = BRANCHES) -> list:
+    """
+    업로드된 여러 이미지 바이트로 OCR 실행 (ocr_from_bytes의 배치 버전, /api/ocr/batch의 청크 하나)
+    - 캐시 조회 / 디코딩 / 품질 검사는 이미지마다 ocr_from_bytes와 같이 ocr_ingest_executor 스레드들에서 나눠 하고,
+      캐시에 없는 이미지들만 모아서 run_ocr_batch 한 번으로 검출 + 인식
+
+    Returns:
+        list: 이미지별 ocr_from_bytes와 같은 결과, 품질 미달(reject) / 대기 초과 / OCR 실패인 이미지는 그 예외 객체
+    """
+    if not ocr_ready:
+        raise OCRNotReadyError(ocr_startup_error or "OCR 모델을 준비하는 중입니다.")
+
+    count_ocr_request(branches, len(images_bytes))
+
+    outputs = [None] * len(images_bytes)
+    pending = []  # OCR을 실행할 이미지 (index, digest, phash, quality, ingested)
+    request_bytes = 0
+
+    # 이미지별 캐시 조회 / 디코딩 / 품질 검사는 이벤트 루프 밖의 ocr_ingest_executor 스레드들에서 실행
+    loop = asyncio.get_running_loop()
+    ingests = await asyncio.gather(
+        *[loop.run_in_executor(ocr_ingest_executor, ingest_ocr_image, image_bytes, branches) for image_bytes in images_bytes],
+        return_exceptions=True
+    )
+
+    errors = [ingest for ingest in ingests if isinstance(ingest, BaseException) and not isinstance(ingest, ImageQualityError)]
+    if errors:
+        # OCR을 시작하기 전에 실패하면 디코딩해 둔 검출용 축소 프레임 버퍼를 바로 반납
+        for ingest in ingests:
+            if isinstance(ingest, tuple) and ingest[2] is not None:
+                image_ingest.release(ingest[2])
+        raise errors[0]
+
+    for index, (image_bytes, ingest) in enumerate(zip(images_bytes, ingests)):
+        if isinstance(ingest, ImageQualityError):
+            outputs[index] = ingest
+            continue
+
+        digest, cached, ingested, quality, phash = ingest
+        if ingested is None:
+            outputs[index] = (cached, None)
+            continue
+
+        request_bytes += len(image_bytes) + ingested.nbytes
+
+        if cached is not None:
+            image_ingest.release(ingested)
+            outputs[index] = (cached, quality)
+            continue
+
+        pending.append((index, digest, phash, quality, ingested))
+
+    record_request_bytes(request_bytes)
+
+    if pending:
+        try:
+            # 버퍼는 OCR 작업이 끝난 뒤에 반납됨 (요청이 취소되어도 작업이 끝날 때까지 유지)
+            results = await await_ocr_and_release(
+                run_ocr_batch(
+                    [ingested.image for *_, ingested in pending],
+                    [ingested.detect_image for *_, ingested in pending],
+                    branches
+                ),
+                [ingested for *_, ingested in pending]
+            )
+        except Exception as e:
+            # 대기 초과 등 청크 전체가 실패하면 OCR을 기다리던 이미지 모두 같은 오류
+            results = [e] * len(pending)
+
+        for (index, digest, phash, quality, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                outputs[index] = result
+                continue
+
+            store_ocr_cache(digest, phash, result, branches)
+            outputs[index] = (result, quality)
+
+    return outputs
+
+
+def format_ocr_output(nutrition_result: dict, material_result: list) -> tuple:
+    """
+    OCR 결과를 API 응답 형식으로 변환
+
+    Returns:
+        (ocr_result - 표준화된 영양성분 키, raw_ocr - OCR 원본 키)
+    """
+    nutrition_data = {}
+    if nutrition_result:
+        for korean_key, english_key in NUTRITION_KEYS.items():
+            if korean_key in nutrition_result:
+                nutrition_data[english_key] = str(nutrition_result[korean_key][0])
+
+    materials = material_result if material_result else []
+
+    return (
+        {"nutrition": nutrition_data, "materials": materials},
+        {"nutrition": {k: v[0] for k, v in nutrition_result.items()} if nutrition_result else {}, "materials": materials}
+    )
+
+
+def merge_ocr_outputs(ocr_outputs: list) -> tuple:
+    """
+    같은 제품의 여러 사진(앞면 / 뒷면 / 원재료 등) OCR 결과를 하나로 합침
+    - 영양성분: 항목마다 OCR 신뢰도가 가장 높은 사진의 값
+    - 원재료: 사진 순서대로 중복 없이 합침
+    """
+    nutrition_result = {}
+    material_result = []
+
+    for nutrition, materials in ocr_outputs:
+        for key, value in (nutrition or {}).items():
+            if key not in nutrition_result or value[1] > nutrition_result[key][1]:
+                nutrition_result[key] = value
+
+        for material in materials or []:
+            if material not in material_result:
+                material_result.append(material)
+
+    return nutrition_result, material_result
+
+
+@app.get("/api/ocr/stats", tags=["OCR"])
+async def ocr_stats():
+    """OCR 실행 통계 (검출 배치 크기 / 대기 시간 히스토그램 등)"""
+    return {
+        "ocr_threads": OCR_THREADS if ocr_engine is None else 0,
+        "yolo_backend": OCR_YOLO_BACKEND,
+        "recognizer_quantization": OCR_RECOGNIZER_QUANTIZATION,
+        "detection_batching": ocr_model.detection_stats() if ocr_model else {},
+        "crop_pruning": ocr_model.pruning_stats() if ocr_model else {},
+        "nutrition_early_stop": ocr_model.early_stop_stats() if ocr_model else {},
+        "crop_normalization": ocr_model.normalization_stats() if ocr_model else {},
+        "quality_gate": quality_gate.stats() if quality_gate else {},
+        "cascade": ocr_model.cascade_stats() if ocr_model else {},
+        "branches": dict(ocr_branch_counts),
+        "batch": dict(ocr_batch_counts),
+        "stream": ocr_stream_stats.stats(),
+        "buffers": {
+            "ingest": ingest_buffer_pool.stats() if ingest_buffer_pool else {},
+            "model": ocr_model.buffer_stats() if ocr_model else {},
+            "request_bytes": dict(ocr_request_bytes)
+        },
+        "cache": ocr_cache.stats() if ocr_cache else {},
+        "memory": memory_usage() if sys.platform.startswith("linux") else {}
+    }
+
+
 @app.get("/health")
 async def health_check():
-    """헬스 체크 엔드포인트"""
-    return {
-        "status": "healthy", 
-        "ocr_model": ocr_model is not None,
+    """
+    헬스 체크 엔드포인트 (프로세스가 살아 있는지, liveness)
+    - healthy: OCR 모델 준비 완료
+    - starting: 모델 로드 + 워밍업 중 (프로세스는 정상이므로 200, 트래픽을 받을 수 있는지는 /ready)
+    - unhealthy: 모델 로드 실패 (재시작해야 OCR을 쓸 수 있으므로 503)
+    """
+    if ocr_startup_error:
+        health_status = "unhealthy"
+    elif not ocr_ready:
+        health_status = "starting"
+    else:
+        health_status = "healthy"
+
+    content = {
+        "status": health_status,
+        "ocr_model": ocr_ready,
+        "ocr_error": ocr_startup_error,
+        "ocr_workers": ocr_engine.workers if ocr_engine else 0,
+        "ocr_pending": ocr_engine.pending if ocr_engine else 0,
+        "ocr_worker_restarts": ocr_engine.restarts if ocr_engine else 0,
         "rag_service": rag_service is not None,
         "gpt_service": gpt_service is not None
     }
 
+    if health_status == "unhealthy":
+        return JSONResponse(status_code=503, content=content)
+
+    return content
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    레디니스 체크 엔드포인트 (로드밸런서용)
+    모델 로드 + 워밍업이 끝나기 전이나 로드에 실패했으면 503
+    """
+    if not ocr_ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "failed" if ocr_startup_error else "warming_up", "error": ocr_startup_error}
+        )
+
+    return {"status": "ready", "startup": ocr_startup_stats}
+
 
 # ============================================
 # API 1: OCR API (YOLO + EasyOCR)
@@ -265,7 +914,8 @@ async def health_check():
 @app.post("/api/ocr", tags=["OCR"])
 async def ocr_extract(
     file: UploadFile = File(...),
-    product_name: Optional[str] = Form(None)
+    product_name: Optional[str] = Form(None),
+    branches: Optional[str] = Form(None)
 ):
     """
     ## YOLO + EasyOCR로 이미지에서 영양성분/원재료 텍스트 추출
@@ -273,6 +923,7 @@ async def ocr_extract(
     ### Request
     - **file**: 이미지 파일 (jpg, png 등)
     - **product_name**: 제품명 (선택, 없으면 파일명 사용)
+    - **branches**: 실행할 분석 분기 (선택, "nutrition" / "material" / "nutrition,material", 없으면 모두 실행)
     
     ### Response
     ```json
@@ -286,17 +937,39 @@ async def ocr_extract(
         "raw_ocr": {
             "nutrition": {"kcal": 200, "단백질": 5, ...},
             "materials": ["밀가루", "설탕", "우유", ...]
-        }
+        },
+        "quality": {"ok": true, "reasons": [], "metrics": {...}}
     }
     ```
+    - **quality**: OCR_QUALITY_GATE=flag일 때 사진 품질 검사 결과
+    - OCR_QUALITY_GATE=reject이고 사진 품질이 기준에 못 미치면 422와 사유 코드(quality.reasons: blurry / too_dark / overexposed / glare / no_label)로 응답
     """
     try:
-        # 이미지 읽기 및 OpenCV 형식으로 변환
+        try:
+            ocr_branches = parse_ocr_branches(branches)
+        except ValueError as e:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "status": "error",
+                    "message": str(e),
+                    "product_name": product_name or "분석 실패",
+                    "ocr_result": {"nutrition": {}, "materials": []},
+                    "raw_ocr": {"nutrition": {}, "materials": []}
+                }
+            )
+
+        # 이미지 읽기
         image_bytes = await file.read()
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
-        if image is None:
+        # 제품명 설정
+        final_product_name = product_name or (file.filename.rsplit('.', 1)[0] if file.filename else "제품명 미확인")
+
+        # YOLO + EasyOCR 실행 (캐시 적중 시 바로 반환)
+        logger.info(f"📷 OCR 처리 시작: {final_product_name} (분기: {', '.join(ocr_branches)})")
+        ocr_output, quality = await ocr_from_bytes(image_bytes, ocr_branches)
+
+        if ocr_output is None:
             return JSONResponse(
                 status_code=400,
                 content={
@@ -308,48 +981,62 @@ async def ocr_extract(
                 }
             )
 
-        # 제품명 설정
-        final_product_name = product_name or (file.filename.rsplit('.', 1)[0] if file.filename else "제품명 미확인")
-
-        # YOLO + EasyOCR 실행
-        logger.info(f"📷 OCR 처리 시작: {final_product_name}")
-        nutrition_result, material_result = ocr_model.execute(image)
+        nutrition_result, material_result = ocr_output
         logger.info(f"✅ OCR 완료 - 영양성분: {len(nutrition_result) if nutrition_result else 0}개, 원재료: {len(material_result) if material_result else 0}개")
 
         # 영양성분 파싱 (표준화된 키)
-        nutrition_data = {}
-        if nutrition_result:
-            nutrition_mapping = {
-                "kcal": "calories",
-                "탄수화물": "carbs",
-                "단백질": "protein",
-                "지방": "fat",
-                "나트륨": "sodium",
-                "당류": "sugar",
-                "포화지방": "saturated_fat",
-                "트랜스지방": "trans_fat",
-                "콜레스테롤": "cholesterol",
-                "총내용량": "total_content",
-                "기준내용량": "serving_size"
-            }
-            for korean_key, english_key in nutrition_mapping.items():
-                if korean_key in nutrition_result:
-                    value = nutrition_result[korean_key][0]
-                    nutrition_data[english_key] = str(value)
+        ocr_result, raw_ocr = format_ocr_output(nutrition_result, material_result)
 
-        return {
+        response = {
             "status": "success",
             "product_name": final_product_name,
-            "ocr_result": {
-                "nutrition": nutrition_data,
-                "materials": material_result if material_result else []
-            },
-            "raw_ocr": {
-                "nutrition": {k: v[0] for k, v in nutrition_result.items()} if nutrition_result else {},
-                "materials": material_result if material_result else []
-            }
+            "ocr_result": ocr_result,
+            "raw_ocr": raw_ocr
         }
+        if quality is not None:
+            # OCR_QUALITY_GATE=flag: 결과와 함께 품질 검사 결과를 돌려줘서 클라이언트가 재촬영을 권할 수 있게 함
+            response["quality"] = quality
 
+        return response
+
+    except ImageQualityError as e:
+        return JSONResponse(
+            status_code=422,
+            content={
+                "status": "error",
+                "reason": "image_quality",
+                "message": quality_message(e.report.reasons),
+                "quality": e.report.to_dict(),
+                "product_name": product_name or "분석 실패",
+                "ocr_result": {"nutrition": {}, "materials": []},
+                "raw_ocr": {"nutrition": {}, "materials": []}
+            }
+        )
+    except OCRNotReadyError as e:
+        logger.warning(f"⚠️ OCR 모델 준비 전 요청 거부: {e}")
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "error",
+                "reason": "not_ready",
+                "message": ocr_not_ready_message(),
+                "product_name": product_name or "분석 실패",
+                "ocr_result": {"nutrition": {}, "materials": []},
+                "raw_ocr": {"nutrition": {}, "materials": []}
+            }
+        )
+    except OCRPoolBusyError as e:
+        logger.warning(f"⚠️ OCR 요청 거부: {e}")
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "error",
+                "message": "OCR 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                "product_name": product_name or "분석 실패",
+                "ocr_result": {"nutrition": {}, "materials": []},
+                "raw_ocr": {"nutrition": {}, "materials": []}
+            }
+        )
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -365,6 +1052,358 @@ async def ocr_extract(
         )
 
 
+def parse_product_ids(value: Optional[str], count: int) -> list:
+    """
+    이미지별 제품 ID 목록을 파싱 (JSON 배열 '["a", "a", "b"]' 또는 "a,a,b")
+    없으면 모든 이미지를 한 제품으로 봄
+
+    Raises:
+        ValueError: 형식이 잘못됐거나 이미지 수와 개수가 다를 때
+    """
+    if not value or not value.strip():
+        return [None] * count
+
+    value = value.strip()
+    if value.startswith("["):
+        try:
+            product_ids = json.loads(value)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"product_ids를 읽을 수 없습니다: {e}")
+        if not isinstance(product_ids, list):
+            raise ValueError("product_ids는 배열이어야 합니다.")
+        product_ids = [None if product_id is None else str(product_id) for product_id in product_ids]
+    else:
+        product_ids = [product_id.strip() for product_id in value.split(",")]
+
+    if len(product_ids) != count:
+        raise ValueError(f"product_ids 개수({len(product_ids)})가 이미지 수({count})와 다릅니다.")
+
+    return product_ids
+
+
+def ocr_batch_entry(index: int, file: UploadFile, product_id: Optional[str], output) -> dict:
+    """/api/ocr/batch 응답의 이미지 하나 결과 (ocr_batch_from_bytes의 결과 하나를 /api/ocr 응답 형식으로 변환)"""
+    entry = {"index": index, "filename": file.filename, "product_id": product_id}
+
+    if isinstance(output, ImageQualityError):
+        entry.update(status="error", reason="image_quality", message=quality_message(output.report.reasons), quality=output.report.to_dict())
+    elif isinstance(output, OCRNotReadyError):
+        entry.update(status="error", reason="not_ready", message=ocr_not_ready_message())
+    elif isinstance(output, OCRPoolBusyError):
+        entry.update(status="error", reason="busy", message="OCR 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.")
+    elif isinstance(output, Exception):
+        logger.error(f"❌ 배치 OCR 실패 ({file.filename}): {output}")
+        entry.update(status="error", reason="ocr_error", message=f"OCR 처리 중 오류가 발생했습니다: {str(output)}")
+    elif output[0] is None:
+        entry.update(status="error", reason="decode", message="이미지를 읽을 수 없습니다. 다른 이미지를 시도해주세요.")
+    else:
+        (nutrition_result, material_result), quality = output
+        ocr_result, raw_ocr = format_ocr_output(nutrition_result, material_result)
+        entry.update(status="success", ocr_result=ocr_result, raw_ocr=raw_ocr)
+        if quality is not None:
+            entry["quality"] = quality
+
+    return entry
+
+
+@app.post("/api/ocr/batch", tags=["OCR"])
+async def ocr_extract_batch(
+    files: List[UploadFile] = File(...),
+    product_ids: Optional[str] = Form(None),
+    branches: Optional[str] = Form(None),
+    merge: bool = Form(False)
+):
+    """
+    ## 여러 이미지를 한 번의 요청으로 OCR (제품 앞면 / 뒷면 / 원재료 사진, 카탈로그 일괄 등록 등)
+
+    이미지를 OCR_BATCH_CHUNK_SIZE개씩 묶어서, 청크마다 검출은 한 배치로(OCR_BATCH_WINDOW_MS > 0일 때),
+    모든 이미지의 crop 인식은 한 번의 배치 인식으로 처리함 (캐시에 있는 이미지는 OCR 없이 바로 반환)
+
+    ### Request
+    - **files**: 이미지 파일들 (최대 OCR_BATCH_MAX_IMAGES개)
+    - **product_ids**: 이미지별 제품 ID (선택, JSON 배열 또는 쉼표 구분, 없으면 모든 이미지가 한 제품)
+    - **branches**: 실행할 분석 분기 (선택, /api/ocr과 같음)
+    - **merge**: true이면 같은 제품 ID의 결과를 합친 products를 추가
+      (영양성분은 항목마다 신뢰도가 가장 높은 사진의 값, 원재료는 중복 없이 합침)
+
+    ### Response
+    ```json
+    {
+        "status": "success",
+        "count": 2,
+        "succeeded": 1,
+        "failed": 1,
+        "results": [
+            {"index": 0, "filename": "front.jpg", "product_id": "p1", "status": "success",
+             "ocr_result": {...}, "raw_ocr": {...}, "quality": {...}},
+            {"index": 1, "filename": "back.jpg", "product_id": "p1", "status": "error",
+             "reason": "image_quality", "message": "사진이 흐립니다. ...", "quality": {...}}
+        ],
+        "products": [
+            {"product_id": "p1", "images": [0], "ocr_result": {...}, "raw_ocr": {...}}
+        ]
+    }
+    ```
+    - **status**: 모든 이미지가 성공이면 success, 일부만 성공이면 partial, 모두 실패면 error
+    - **results[].reason**: image_quality (OCR_QUALITY_GATE=reject) / decode / busy / not_ready / ocr_error
+    """
+    try:
+        ocr_branches = parse_ocr_branches(branches)
+        if len(files) > OCR_BATCH_MAX_IMAGES:
+            raise ValueError(f"이미지는 한 번에 최대 {OCR_BATCH_MAX_IMAGES}개까지 보낼 수 있습니다.")
+        image_product_ids = parse_product_ids(product_ids, len(files))
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e), "results": []})
+
+    if not ocr_ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error", "reason": "not_ready", "message": ocr_not_ready_message(), "results": []}
+        )
+
+    logger.info(f"📷 배치 OCR 처리 시작: 이미지 {len(files)}개 (분기: {', '.join(ocr_branches)})")
+    ocr_batch_counts["requests"] += 1
+    ocr_batch_counts["images"] += len(files)
+
+    # 청크를 워커 수만큼 동시에 실행 (업로드 바이트는 청크를 실행할 때 읽어서 요청 전체를 메모리에 올리지 않음)
+    chunk_size = max(1, OCR_BATCH_CHUNK_SIZE)
+    chunk_semaphore = asyncio.Semaphore(max(1, OCR_WORKERS))
+
+    async def run_chunk(start: int) -> list:
+        async with chunk_semaphore:
+            chunk_files = files[start:start + chunk_size]
+            images_bytes = [await file.read() for file in chunk_files]
+            ocr_batch_counts["chunks"] += 1
+
+            try:
+                return await ocr_batch_from_bytes(images_bytes, ocr_branches)
+            except Exception as e:
+                return [e] * len(chunk_files)
+
+    chunk_outputs = await asyncio.gather(*[run_chunk(start) for start in range(0, len(files), chunk_size)])
+    outputs = [output for chunk in chunk_outputs for output in chunk]
+
+    results = [
+        ocr_batch_entry(index, file, product_id, output)
+        for index, (file, product_id, output) in enumerate(zip(files, image_product_ids, outputs))
+    ]
+    succeeded = sum(1 for entry in results if entry["status"] == "success")
+    ocr_batch_counts["failed_images"] += len(results) - succeeded
+    logger.info(f"✅ 배치 OCR 완료 - 성공: {succeeded}개, 실패: {len(results) - succeeded}개")
+
+    response = {
+        "status": "success" if succeeded == len(results) else ("partial" if succeeded else "error"),
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }
+
+    if merge:
+        # 제품 ID별로 성공한 이미지의 결과를 합침 (제품 순서는 처음 나온 이미지 순서)
+        products = {}
+        for entry, output in zip(results, outputs):
+            product = products.setdefault(entry["product_id"], {"images": [], "outputs": []})
+            if entry["status"] == "success":
+                product["images"].append(entry["index"])
+                product["outputs"].append(output[0])
+
+        response["products"] = []
+        for product_id, product in products.items():
+            ocr_result, raw_ocr = format_ocr_output(*merge_ocr_outputs(product["outputs"]))
+            response["products"].append({"product_id": product_id, "images": product["images"], "ocr_result": ocr_result, "raw_ocr": raw_ocr})
+
+    return response
+
+
+@app.websocket("/ws/ocr/stream")
+async def ocr_stream(websocket: WebSocket, branches: Optional[str] = None):
+    """
+    ## 카메라 미리보기 프레임 스트리밍 OCR (정지 사진을 찍어서 올리는 대신)
+
+    클라이언트는 작은 미리보기 프레임(JPEG 등, 최대 OCR_STREAM_MAX_FRAME_KB)을 바이너리 메시지로 계속 보내고,
+    서버는 프레임마다 다음 순서로 처리함
+    1) 마지막으로 OCR한 프레임과 거의 같으면(OCR_STREAM_CHANGE_THRESHOLD) 건너뜀
+       (단, 수렴에 필요한 OCR_STREAM_MIN_VOTES + OCR_STREAM_PATIENCE 프레임을 OCR하기 전에는 건너뛰지 않음)
+    2) 품질 검사(OCR_QUALITY_GATE가 off가 아니면)를 통과하지 못하면 건너뜀 (흔들린 프레임 등)
+    3) 나머지 프레임만 YOLO + OCR하고, 결과를 항목별 신뢰도 투표로 이전 프레임들과 합침
+    OCR 중에 들어온 프레임은 가장 최근 것 하나만 남기고 버림 (느린 기기에서도 지연이 쌓이지 않도록)
+
+    ### Request
+    - 쿼리: **branches** (선택, /api/ocr과 같음)
+    - 바이너리 메시지: 프레임 이미지
+    - 텍스트 메시지: {"type": "reset"} - 다른 제품을 찍기 시작할 때 지금까지의 결과를 버림
+
+    ### Response (텍스트 메시지)
+    ```json
+    {"type": "ready", "branches": ["nutrition", "material"]}
+    {"type": "skipped", "frame": 3, "reason": "unchanged", "difference": 1.2}
+    {"type": "skipped", "frame": 4, "reason": "quality", "message": "사진이 흐립니다. ...", "quality": {...}}
+    {
+        "type": "result",
+        "frame": 5,
+        "processed": 3,
+        "ocr_result": {"nutrition": {...}, "materials": [...]},
+        "raw_ocr": {"nutrition": {...}, "materials": [...]},
+        "fields": {"나트륨": {"value": 100, "votes": 2, "frames": 3, "agreement": 0.8, "stable": true}},
+        "converged": true,
+        "elapsed_ms": 850.0
+    }
+    ```
+    - **skipped.reason**: unchanged / quality / decode / too_large / busy
+    - **converged**: 결과에 들어간 항목이 모두 확정되고 OCR_STREAM_PATIENCE 프레임 동안 바뀌지 않으면 true
+      (클라이언트는 이때 스트리밍을 끝내고 결과를 사용하면 됨)
+    """
+    await websocket.accept()
+
+    try:
+        ocr_branches = parse_ocr_branches(branches)
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "message": str(e)})
+        await websocket.close(code=1008)
+        return
+
+    if not ocr_ready:
+        await websocket.send_json({"type": "error", "reason": "not_ready", "message": ocr_not_ready_message()})
+        await websocket.close(code=1013)
+        return
+
+    detector = FrameChangeDetector(threshold=OCR_STREAM_CHANGE_THRESHOLD)
+    fusion = ResultFusion(min_votes=OCR_STREAM_MIN_VOTES, min_agreement=OCR_STREAM_MIN_AGREEMENT, patience=OCR_STREAM_PATIENCE)
+
+    latest = None  # OCR을 기다리는 가장 최근 프레임 (프레임 번호, 바이트)
+    frame_ready = asyncio.Event()
+    generation = 0  # reset할 때마다 증가 (reset 전에 시작한 OCR 결과는 버림)
+    converged = False
+
+    ocr_stream_stats.add("sessions")
+    await websocket.send_json({"type": "ready", "branches": list(ocr_branches)})
+
+    async def receive_frames():
+        nonlocal latest, generation, converged
+        frame = 0
+
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            if message.get("bytes") is not None:
+                frame += 1
+                ocr_stream_stats.add("frames")
+                if latest is not None:
+                    ocr_stream_stats.add("dropped_busy")
+                latest = (frame, message["bytes"])
+                frame_ready.set()
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(command, dict) and command.get("type") == "reset":
+                    generation += 1
+                    detector.reset()
+                    fusion.reset()
+                    converged = False
+
+    async def process_frames():
+        nonlocal latest, converged
+
+        while True:
+            await frame_ready.wait()
+            frame_ready.clear()
+            frame, image_bytes = latest
+            latest = None
+            frame_generation = generation
+
+            if len(image_bytes) > OCR_STREAM_MAX_FRAME_KB * 1024:
+                await websocket.send_json({"type": "skipped", "frame": frame, "reason": "too_large", "message": f"프레임은 {OCR_STREAM_MAX_FRAME_KB}KB 이하의 미리보기 크기로 보내주세요."})
+                continue
+
+            started = time.perf_counter()
+            ingested = image_ingest.decode(image_bytes)
+            if ingested is None:
+                await websocket.send_json({"type": "skipped", "frame": frame, "reason": "decode"})
+                continue
+
+            # 1) 변화 검출 (마지막으로 OCR한 프레임과 비교) / 2) 품질 검사
+            # (스트리밍에서는 다음 프레임이 곧 오므로 flag 모드여도 건너뜀, 건너뛰는 프레임의 버퍼는 바로 반납)
+            try:
+                changed, difference = detector.changed(ingested.detect_image)
+                # 수렴에 필요한 프레임 수를 채우기 전에는 거의 같은 프레임도 OCR
+                # (카메라를 가만히 대고 있으면 모든 프레임이 건너뛰어져서 투표가 쌓이지 않고 멈추므로)
+                changed = changed or fusion.frames < fusion.min_frames
+                report = quality_gate.check(ingested.detect_image) if changed and quality_gate is not None else None
+            except Exception:
+                image_ingest.release(ingested)
+                raise
+
+            if not changed or (report is not None and not report.ok):
+                image_ingest.release(ingested)
+
+            if not changed:
+                ocr_stream_stats.add("skipped_unchanged")
+                await websocket.send_json({"type": "skipped", "frame": frame, "reason": "unchanged", "difference": difference})
+                continue
+
+            if report is not None and not report.ok:
+                ocr_stream_stats.add("skipped_quality")
+                await websocket.send_json({"type": "skipped", "frame": frame, "reason": "quality", "message": quality_message(report.reasons), "quality": report.to_dict()})
+                continue
+
+            # 3) YOLO + OCR (버퍼는 OCR 작업이 끝난 뒤에 반납됨 - 연결이 끊겨 이 태스크가 취소되어도 작업이 끝날 때까지 유지)
+            count_ocr_request(ocr_branches)
+            try:
+                nutrition_result, material_result = await await_ocr_and_release(
+                    run_ocr(ingested.image, ingested.detect_image, ocr_branches), [ingested]
+                )
+            except OCRPoolBusyError:
+                await websocket.send_json({"type": "skipped", "frame": frame, "reason": "busy"})
+                continue
+            except Exception as e:
+                logger.error(f"❌ 스트리밍 OCR 실패 (프레임 {frame}): {e}")
+                await websocket.send_json({"type": "error", "frame": frame, "message": f"OCR 처리 중 오류가 발생했습니다: {str(e)}"})
+                continue
+
+            if frame_generation != generation:
+                continue
+
+            # 버퍼는 이미 반납되었으므로 changed()에서 만든 이 프레임의 썸네일을 비교 대상으로 등록
+            detector.accept()
+
+            ocr_stream_stats.add("processed")
+            if fusion.add(nutrition_result, material_result) and not converged:
+                converged = True
+                ocr_stream_stats.add("converged")
+                ocr_stream_stats.add("converged_frames_sum", fusion.frames)
+                logger.info(f"✅ 스트리밍 OCR 수렴: 프레임 {frame}개 중 {fusion.frames}개 OCR")
+
+            ocr_result, raw_ocr = format_ocr_output(*fusion.result())
+            await websocket.send_json({
+                "type": "result",
+                "frame": frame,
+                "processed": fusion.frames,
+                "ocr_result": ocr_result,
+                "raw_ocr": raw_ocr,
+                "fields": fusion.fields(),
+                "converged": fusion.converged,
+                "elapsed_ms": (time.perf_counter() - started) * 1000
+            })
+
+    # 수신은 OCR과 따로 돌려서 OCR 중에 들어온 프레임은 최신 것으로 덮어씀
+    receiver = asyncio.create_task(receive_frames())
+    processor = asyncio.create_task(process_frames())
+    try:
+        done, _ = await asyncio.wait([receiver, processor], return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"⚠️ 스트리밍 OCR 연결 종료: {task.exception()}")
+    finally:
+        receiver.cancel()
+        processor.cancel()
+        await asyncio.gather(receiver, processor, return_exceptions=True)
+
+
 # ============================================
 # API 2: RAG + LLM 분석 API
 # ============================================
@@ -584,10 +1623,14 @@ async def upload_image(
         # 1. YOLO + OCR 실행
         # ============================================
         image_bytes = await file.read()
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
-        if image is None:
+        # 사용자 정보로 필요한 분기만 실행 (알레르기만 있으면 원재료만, 질환만 있으면 영양성분만)
+        ocr_branches = ocr_branches_for(user_data)
+
+        logger.info(f"📷 YOLO + OCR 처리 시작: {product_name} (분기: {', '.join(ocr_branches)})")
+        ocr_output, quality = await ocr_from_bytes(image_bytes, ocr_branches)
+
+        if ocr_output is None:
             return JSONResponse(
                 status_code=400,
                 content={
@@ -602,8 +1645,7 @@ async def upload_image(
                 }
             )
 
-        logger.info(f"📷 YOLO + OCR 처리 시작: {product_name}")
-        nutrition_result, material_result = ocr_model.execute(image)
+        nutrition_result, material_result = ocr_output
         
         # ============================================
         # OCR 결과 터미널 출력
@@ -765,6 +1807,8 @@ async def upload_image(
             "nutrition": {k: v[0] for k, v in nutrition_result.items()} if nutrition_result else {},
             "materials": detected_materials
         }
+        if quality is not None:
+            analyze_result["quality"] = quality
         
         # ============================================
         # 최종 결과 요약 출력
@@ -798,6 +1842,52 @@ async def upload_image(
                 "raw_ocr": {"nutrition": {}, "materials": []}
             }
         )
+    except ImageQualityError as e:
+        return JSONResponse(
+            status_code=422,
+            content={
+                "status": "error",
+                "reason": "image_quality",
+                "quality": e.report.to_dict(),
+                "product_name": "이미지 오류",
+                "risk_level": "yellow",
+                "risk_score": 50,
+                "analysis": {"detected_ingredients": [], "allergen_warnings": [], "diet_warnings": [], "nutrition": {}},
+                "recommendation": quality_message(e.report.reasons),
+                "risk_reason": f"사진 품질 미달: {', '.join(e.report.reasons)}",
+                "raw_ocr": {"nutrition": {}, "materials": []}
+            }
+        )
+    except OCRNotReadyError as e:
+        logger.warning(f"⚠️ OCR 모델 준비 전 요청 거부: {e}")
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "error",
+                "product_name": "분석 실패",
+                "risk_level": "yellow",
+                "risk_score": 50,
+                "analysis": {"detected_ingredients": [], "allergen_warnings": [], "diet_warnings": [], "nutrition": {}},
+                "recommendation": ocr_not_ready_message(),
+                "risk_reason": "OCR 모델 로드 실패" if ocr_startup_error else "OCR 모델 준비 중",
+                "raw_ocr": {"nutrition": {}, "materials": []}
+            }
+        )
+    except OCRPoolBusyError as e:
+        logger.warning(f"⚠️ OCR 요청 거부: {e}")
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "error",
+                "product_name": "분석 실패",
+                "risk_level": "yellow",
+                "risk_score": 50,
+                "analysis": {"detected_ingredients": [], "allergen_warnings": [], "diet_warnings": [], "nutrition": {}},
+                "recommendation": "요청이 많아 잠시 후 다시 시도해주세요.",
+                "risk_reason": "OCR 대기열 초과",
+                "raw_ocr": {"nutrition": {}, "materials": []}
+            }
+        )
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -899,4 +1989,29 @@ if __name__ == "__main__":
         sys.stdout.reconfigure(encoding='utf-8')
         sys.stderr.reconfigure(encoding='utf-8')
     
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if OCR_PRELOAD_WORKERS > 0:
+        # master에서 모델을 한 번 로드하고 고정한 뒤 워커를 fork (가중치는 copy-on-write로 워커들이 공유)
+        import gc
+        import torch
+        from MaterialAndNutritionOCR.PreforkServer import PreforkServer
+
+        gc.disable()  # 로드 중 GC가 객체를 옮기지 않도록 끄고, fork 전에 gc.freeze() 후 워커에서 다시 켬
+        torch.set_num_threads(1)  # master에서 OpenMP 스레드 풀을 만들지 않아야 fork 후 워커가 멈추지 않음
+
+        ocr_model = create_ocr_model()
+        ocr_model.load_models(OCR_PARALLEL_LOAD)
+        ocr_model.warmup()  # YOLO conv+bn fuse 등 첫 추론에서 가중치가 바뀌는 작업을 fork 전에 끝냄
+        ocr_model.freeze()
+
+        def on_fork():
+            torch.set_num_threads(OCR_TORCH_THREADS or max(1, (os.cpu_count() or 1) // OCR_PRELOAD_WORKERS))
+
+        PreforkServer(
+            app,
+            workers=OCR_PRELOAD_WORKERS,
+            port=8000,
+            on_fork=on_fork,
+            report_seconds=OCR_MEMORY_REPORT_SECONDS
+        ).serve()
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)